@@ -0,0 +1,171 @@
+"""Bounded vibe state.
+
+`VibeState.emails`, `notes` and `system_config` are written by every
+mutator patch and read back into every mutator prompt, so left alone
+they make each turn of a long session slower than the last. This module
+keeps them within `VibeLimits`:
+
+  - emails and notes are ring buffers: only the newest entries stay,
+  - system_config keeps at most `max_config_keys` keys (the most
+    recently inserted) and truncates oversized values.
+
+Everything that falls out is folded into `VibeState.summary`, a small
+record of counts, recipients and the latest dropped notes with a
+rule-based `text` line. An LLM summarizer may add a rolling
+`narrative` (see `game.turn.TurnScheduler`), which compaction keeps.
+Strict state is never compacted.
+
+Compaction is pure and deterministic like `apply_patch`: it returns a
+new VibeState and never modifies its input.
+"""
+
+import json
+from collections import Counter
+from dataclasses import dataclass, replace
+from typing import Any
+
+from engine.state import GameState, VibeState
+
+
+# How much detail about dropped entries the summary keeps.
+SUMMARY_RECIPIENTS = 10
+SUMMARY_NOTES = 5
+SUMMARY_NOTE_CHARS = 120
+SUMMARY_CONFIG_KEYS = 20
+# Appended to truncated config values; such values are never cut again.
+TRUNCATED_SUFFIX = "...[truncated]"
+
+
+@dataclass(frozen=True)
+class VibeLimits:
+    """Size bounds for the free-form vibe state."""
+    max_emails: int = 50
+    max_notes: int = 50
+    max_config_keys: int = 64
+    max_config_value_chars: int = 2000
+
+
+@dataclass
+class Compaction:
+    """Result of `compact_vibe`.
+
+    Attributes:
+        vibe: The bounded vibe state (the input object if nothing changed).
+        dropped: Entries removed this time, keyed by field, for summarizers.
+    """
+    vibe: VibeState
+    dropped: dict
+
+    @property
+    def compacted(self) -> bool:
+        return bool(self.dropped)
+
+
+def _fold_emails(summary: dict, emails: list) -> None:
+    summary["emails_compacted"] = summary.get("emails_compacted", 0) + len(emails)
+    recipients = Counter(summary.get("recipients", {}))
+    for email in emails:
+        if isinstance(email, dict) and isinstance(email.get("recipient"), str):
+            recipients[email["recipient"]] += 1
+    summary["recipients"] = dict(recipients.most_common(SUMMARY_RECIPIENTS))
+
+
+def _fold_notes(summary: dict, notes: list) -> None:
+    summary["notes_compacted"] = summary.get("notes_compacted", 0) + len(notes)
+    texts = [str(n)[:SUMMARY_NOTE_CHARS] for n in notes]
+    summary["recent_notes"] = (summary.get("recent_notes", []) + texts)[-SUMMARY_NOTES:]
+
+
+def _fold_config(summary: dict, keys: list) -> None:
+    known = summary.get("config_keys_compacted", [])
+    summary["config_keys_compacted"] = (known + [k for k in keys if k not in known])[-SUMMARY_CONFIG_KEYS:]
+
+
+def summary_text(summary: dict) -> str:
+    """One-line, rule-based description of a compaction summary."""
+    parts = []
+    if summary.get("emails_compacted"):
+        recipients = ", ".join(f"{r} x{n}" for r, n in summary.get("recipients", {}).items())
+        parts.append(f"{summary['emails_compacted']} earlier emails" + (f" ({recipients})" if recipients else ""))
+    if summary.get("notes_compacted"):
+        latest = summary.get("recent_notes") or []
+        parts.append(f"{summary['notes_compacted']} earlier notes" + (f", last: {latest[-1]}" if latest else ""))
+    if summary.get("config_keys_compacted"):
+        parts.append("config keys retired: " + ", ".join(map(str, summary["config_keys_compacted"])))
+    return "; ".join(parts)
+
+
+def _bounded_value(value: Any, limit: int) -> Any:
+    """`value`, or a string of at most `limit` chars ending in `TRUNCATED_SUFFIX`.
+
+    Strings are measured by their own length and other values by their
+    JSON text, so a truncated value is within the limit on the next pass.
+    """
+    if isinstance(value, str):
+        if len(value) <= limit or value.endswith(TRUNCATED_SUFFIX):
+            return value
+        text = value
+    else:
+        try:
+            text = json.dumps(value)
+        except (TypeError, ValueError):
+            text = str(value)
+        if len(text) <= limit:
+            return value
+    return text[:max(0, limit - len(TRUNCATED_SUFFIX))] + TRUNCATED_SUFFIX
+
+
+def compact_vibe(vibe: VibeState, limits: VibeLimits) -> Compaction:
+    """Bound `vibe` to `limits`, folding overflow into its summary.
+
+    Args:
+        vibe: Current vibe state.
+        limits: Size bounds to enforce.
+
+    Returns:
+        Compaction: The bounded state and what was dropped.
+    """
+    dropped: dict = {}
+    summary = dict(vibe.summary or {})
+    emails, notes, config = vibe.emails, vibe.notes, vibe.system_config
+
+    if isinstance(emails, list) and len(emails) > limits.max_emails:
+        cut = len(emails) - limits.max_emails
+        dropped["emails"] = emails[:cut]
+        _fold_emails(summary, dropped["emails"])
+        emails = emails[cut:]
+
+    if isinstance(notes, list) and len(notes) > limits.max_notes:
+        cut = len(notes) - limits.max_notes
+        dropped["notes"] = notes[:cut]
+        _fold_notes(summary, dropped["notes"])
+        notes = notes[cut:]
+
+    if isinstance(config, dict):
+        keys = list(config)
+        if len(keys) > limits.max_config_keys:
+            cut = len(keys) - limits.max_config_keys
+            dropped["system_config"] = {k: config[k] for k in keys[:cut]}
+            _fold_config(summary, keys[:cut])
+            config = {k: config[k] for k in keys[cut:]}
+        bounded = {k: _bounded_value(v, limits.max_config_value_chars) for k, v in config.items()}
+        truncated = [k for k in bounded if bounded[k] is not config[k]]
+        if truncated:
+            dropped.setdefault("truncated_config", truncated)
+            config = bounded
+
+    if not dropped:
+        return Compaction(vibe, dropped)
+    summary["text"] = summary_text(summary)
+    return Compaction(replace(vibe, emails=emails, notes=notes, system_config=config, summary=summary), dropped)
+
+
+def compact_state(state: GameState, limits: VibeLimits) -> tuple[GameState, Compaction]:
+    """Apply `compact_vibe` to a whole state; returns the state unchanged if within limits."""
+    result = compact_vibe(state.vibe, limits)
+    if not result.compacted:
+        return state, result
+    return replace(state, vibe=result.vibe), result
+
+
+__all__ = ["TRUNCATED_SUFFIX", "VibeLimits", "Compaction", "compact_vibe", "compact_state", "summary_text"]
@@ -0,0 +1,277 @@
+"""Content-addressed hashing of game states.
+
+`state_hash` gives a stable digest of a `GameState` or of any part of
+one (`state.strict`, `state.vibe.emails`, ...). Hashes are Merkle-style:
+a dataclass hashes its class name with the hashes of its fields, a list
+the hashes of its items and a dict its sorted keys with their values'
+hashes, so equal content gives equal hashes regardless of identity or
+dict insertion order.
+
+Each dataclass instance keeps its hash once computed, in a side table
+keyed by identity and weakly referenced (not on the instance, so
+`copy_state`/`deepcopy` copies never inherit a hash they may
+invalidate), and containers directly below a sub-state are cached by
+identity. Because `apply_patch` is
+copy-on-write, hashing a patched state only rehashes the sub-states the
+patch touched; hashing an unchanged state is a lookup. Like the prompt
+serializer this assumes states are not modified in place.
+
+`SnapshotStore` uses these hashes to store snapshots content-addressed:
+a state is kept as a manifest of its sub-state hashes, so identical
+strict or vibe states are stored once however many sessions or turns
+share them.
+"""
+
+import dataclasses
+import hashlib
+import json
+import threading
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from engine.state import Clock, Email, GameState, StrictState, VibeState
+
+DIGEST_SIZE = 16
+# Containers (lists, dicts) whose hashes are kept by identity.
+MAX_CONTAINER_ENTRIES = 1024
+
+_PRIMITIVES = (str, int, float, bool)
+
+
+def _digest(*parts: bytes) -> bytes:
+    h = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    for part in parts:
+        h.update(len(part).to_bytes(4, "big"))
+        h.update(part)
+    return h.digest()
+
+
+class _ContainerCache:
+    """Identity cache of container digests; keeps the objects alive so ids stay unique."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, Tuple[Any, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, obj: Any) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(id(obj))
+            if entry is None or entry[0] is not obj:
+                return None
+            self._entries.move_to_end(id(obj))
+            return entry[1]
+
+    def put(self, obj: Any, digest: bytes) -> None:
+        with self._lock:
+            self._entries[id(obj)] = (obj, digest)
+            self._entries.move_to_end(id(obj))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_CONTAINERS = _ContainerCache(MAX_CONTAINER_ENTRIES)
+
+
+class _InstanceCache:
+    """Digests of live dataclass instances by identity; entries go away with their instance."""
+
+    def __init__(self):
+        self._entries: Dict[int, Tuple[weakref.ref, bytes]] = {}
+        # Reentrant: a weakref callback may fire (via GC) while the lock is held.
+        self._lock = threading.RLock()
+
+    def get(self, obj: Any) -> Optional[bytes]:
+        entry = self._entries.get(id(obj))
+        if entry is None or entry[0]() is not obj:
+            return None
+        return entry[1]
+
+    def put(self, obj: Any, digest: bytes) -> None:
+        key = id(obj)
+        try:
+            ref = weakref.ref(obj, lambda r, key=key: self._discard(key, r))
+        except TypeError:
+            return  # not weakly referenceable: recomputed next time
+        with self._lock:
+            self._entries[key] = (ref, digest)
+
+    def _discard(self, key: int, ref: weakref.ref) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is ref:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_INSTANCES = _InstanceCache()
+
+
+def _hash(obj: Any, cache_containers: bool) -> bytes:
+    if obj is None or isinstance(obj, _PRIMITIVES):
+        return _digest(b"v", json.dumps(obj).encode())
+
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        cached = _INSTANCES.get(obj)
+        if cached is not None:
+            return cached
+        parts = [b"d", type(obj).__name__.encode()]
+        for f in dataclasses.fields(obj):
+            parts.append(f.name.encode())
+            parts.append(_hash(getattr(obj, f.name), True))
+        digest = _digest(*parts)
+        _INSTANCES.put(obj, digest)
+        return digest
+
+    if isinstance(obj, (list, tuple, dict)):
+        if cache_containers:
+            cached = _CONTAINERS.get(obj)
+            if cached is not None:
+                return cached
+        if isinstance(obj, dict):
+            items = sorted((((k if isinstance(k, str) else json.dumps(k)), v) for k, v in obj.items()), key=lambda kv: kv[0])
+            parts = [b"m"]
+            for key, value in items:
+                parts.append(key.encode())
+                parts.append(_hash(value, False))
+        else:
+            parts = [b"l"] + [_hash(item, False) for item in obj]
+        digest = _digest(*parts)
+        if cache_containers:
+            _CONTAINERS.put(obj, digest)
+        return digest
+
+    return _digest(b"s", str(obj).encode())
+
+
+def state_hash(obj: Any) -> str:
+    """Return the hex content hash of a state or any part of one."""
+    return _hash(obj, True).hex()
+
+
+def states_equal(a: Any, b: Any) -> bool:
+    """Content equality; O(1) for states whose hashes are already known."""
+    return a is b or _hash(a, True) == _hash(b, True)
+
+
+def cache_key(*parts: Any) -> str:
+    """Combine states, sub-states and plain values into one hex cache key."""
+    return _digest(b"k", *(_hash(p, True) for p in parts)).hex()
+
+
+def clear_cache() -> None:
+    """Forget cached container hashes (dataclass instances keep theirs)."""
+    _CONTAINERS.clear()
+
+
+def _strict_from_data(data: dict) -> StrictState:
+    return StrictState(
+        clock=Clock(**data["clock"]),
+        emails=[Email(**email) for email in data.get("emails", [])],
+    )
+
+
+def _vibe_from_data(data: dict) -> VibeState:
+    return VibeState(**data)
+
+
+class SnapshotStore:
+    """Content-addressed store of game state snapshots.
+
+    A snapshot is saved as a manifest `{"strict": <hash>, "vibe": <hash>}`
+    plus one object per distinct sub-state, so identical sub-states are
+    stored once. With a `root` directory objects are written as
+    `<root>/<hash[:2]>/<hash>.json` and shared by every store (and
+    session) using that directory; without one they live in memory.
+
+    Loaded states are shared objects and must not be modified in place.
+    """
+
+    _PARTS = {"strict": _strict_from_data, "vibe": _vibe_from_data}
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root) if root is not None else None
+        self._objects: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, digest: str) -> Path:
+        return self.root / digest[:2] / f"{digest}.json"
+
+    def _put(self, digest: str, obj: Any, data: Any) -> bool:
+        """Store an object under `digest`; returns False if it was already present."""
+        with self._lock:
+            if digest in self._objects:
+                return False
+            self._objects[digest] = obj
+        if self.root is None:
+            return True
+        path = self._path(digest)
+        if path.exists():
+            return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(data, separators=(",", ":")))
+        tmp.replace(path)
+        return True
+
+    def put(self, state: GameState) -> str:
+        """Store `state` and return its hash (the snapshot id)."""
+        manifest = {}
+        for name in self._PARTS:
+            part = getattr(state, name)
+            digest = state_hash(part)
+            self._put(digest, part, dataclasses.asdict(part))
+            manifest[name] = digest
+        digest = state_hash(state)
+        self._put(digest, state, manifest)
+        return digest
+
+    def _load(self, digest: str) -> Any:
+        if self.root is None:
+            raise KeyError(digest)
+        try:
+            return json.loads(self._path(digest).read_text())
+        except FileNotFoundError:
+            raise KeyError(digest) from None
+
+    def get(self, digest: str) -> GameState:
+        """Return the snapshot stored under `digest`; raises KeyError if unknown."""
+        with self._lock:
+            state = self._objects.get(digest)
+        if isinstance(state, GameState):
+            return state
+        manifest = self._load(digest)
+        parts = {}
+        for name, build in self._PARTS.items():
+            with self._lock:
+                part = self._objects.get(manifest[name])
+            if part is None:
+                part = build(self._load(manifest[name]))
+                with self._lock:
+                    part = self._objects.setdefault(manifest[name], part)
+            parts[name] = part
+        state = GameState(**parts)
+        with self._lock:
+            return self._objects.setdefault(digest, state)
+
+    def __contains__(self, digest: str) -> bool:
+        with self._lock:
+            if digest in self._objects:
+                return True
+        return self.root is not None and self._path(digest).exists()
+
+    def __len__(self) -> int:
+        """Number of objects (manifests and sub-states) held in memory."""
+        with self._lock:
+            return len(self._objects)
+
+
+__all__ = ["SnapshotStore", "cache_key", "clear_cache", "state_hash", "states_equal"]
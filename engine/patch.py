@@ -11,11 +11,13 @@ Key design principles:
   - Patches are declarative (desired state), not imperative (instructions)
   - Validation is strict for game-critical state, permissive for narrative
   - No external side effects (no filesystem, network, clock calls)
+  - Copy-on-write: the resulting state shares every sub-object the patch
+    did not touch with the input state, so states must be treated as
+    immutable (use `engine.state.copy_state` for an independent copy)
 """
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from typing import Any, Optional
-from copy import deepcopy
 
 from engine.state import Email, GameState, StrictState, VibeState, Clock
 
@@ -145,34 +147,20 @@ def _validate_clock_change(value: Any) -> tuple[bool, Optional[str]]:
     return True, None
 
 
-def _apply_strict_patch(
-    current_strict: StrictState,
-    patch_dict: dict[str, Any]
-) -> tuple[StrictState, list[ValidationError]]:
-    """Apply and validate a strict patch.
-    
-    This function preserves the original state and only modifies what is
-    explicitly provided in the patch, after validation passes.
+def _strict_errors(patch_dict: dict[str, Any]) -> list[ValidationError]:
+    """Validate a strict patch without applying it.
     
     Args:
-        current_strict: Current strict state.
         patch_dict: Patch data for strict state.
         
     Returns:
-        Tuple of (updated_strict_state, validation_errors).
-        If any field fails validation, that field is not applied.
-        Returns original state with errors if validation fails.
+        The validation errors; empty if every field is valid.
     """
     errors: list[ValidationError] = []
     
-    # Create a working copy
-    updated = deepcopy(current_strict)
-    
-    # Validate and apply clock patch
     if "clock" in patch_dict:
         clock_patch = patch_dict["clock"]
         is_valid, error_msg = _validate_clock(clock_patch)
-        
         if not is_valid:
             errors.append(
                 ValidationError(
@@ -181,17 +169,7 @@ def _apply_strict_patch(
                     attempted_value=clock_patch
                 )
             )
-        else:
-            # Apply valid clock patch
-            current_tz = updated.clock.timezone
-            current_time = updated.clock.time
-            
-            new_tz = clock_patch.get("timezone", current_tz)
-            new_time = clock_patch.get("time", current_time)
-            
-            updated.clock = Clock(timezone=new_tz, time=new_time)
-    
-    # Validate and apply emails patch
+    
     if "emails" in patch_dict:
         emails_patch = patch_dict["emails"]
         
@@ -205,7 +183,6 @@ def _apply_strict_patch(
             )
         else:
             # Validate each event in the list
-            valid_emails = []
             for idx, email in enumerate(emails_patch):
                 
                 # Validate email event (must have recipient only)
@@ -218,13 +195,46 @@ def _apply_strict_patch(
                             attempted_value=email
                         )
                     )
-                else:
-                    event_obj = Email(recipient=email["recipient"], sent_at=email["sent_at"])
-                    valid_emails.append(event_obj)
-            
-            # Only update emails if no errors were found
-            if not errors:
-                updated.emails = valid_emails
+    
+    return errors
+
+
+def _apply_strict_patch(
+    current_strict: StrictState,
+    patch_dict: dict[str, Any]
+) -> tuple[StrictState, list[ValidationError]]:
+    """Apply and validate a strict patch.
+    
+    This function preserves the original state and only modifies what is
+    explicitly provided in the patch, after validation passes.
+    
+    Args:
+        current_strict: Current strict state.
+        patch_dict: Patch data for strict state.
+        
+    Returns:
+        Tuple of (updated_strict_state, validation_errors).
+        If any field fails validation, that field is not applied.
+        Returns original state with errors if validation fails.
+    """
+    errors = _strict_errors(patch_dict)
+    
+    # Shallow working copy; touched fields are replaced, never mutated
+    updated = replace(current_strict)
+    
+    # Apply a valid clock patch
+    if "clock" in patch_dict and not any(e.field == "clock" for e in errors):
+        clock_patch = patch_dict["clock"]
+        new_tz = clock_patch.get("timezone", updated.clock.timezone)
+        new_time = clock_patch.get("time", updated.clock.time)
+        updated.clock = Clock(timezone=new_tz, time=new_time)
+    
+    # Only update emails if no errors were found
+    if "emails" in patch_dict and not errors:
+        updated.emails = [
+            Email(recipient=email["recipient"], sent_at=email["sent_at"])
+            for email in patch_dict["emails"]
+        ]
     
     return updated, errors
 
@@ -247,8 +257,8 @@ def _apply_vibe_patch(
     """
     warnings: list[str] = []
     
-    # Create a working copy
-    updated = deepcopy(current_vibe)
+    # Shallow working copy; touched fields are replaced, never mutated
+    updated = replace(current_vibe)
     
     # Apply system_config patch
     if "system_config" in patch_dict:
@@ -277,6 +287,16 @@ def _apply_vibe_patch(
     return updated, warnings
 
 
+def validate_patch(patch: Patch) -> list[ValidationError]:
+    """Return the strict validation errors `apply_patch` would report for `patch`.
+    
+    Strict validation does not depend on the current state, so this
+    checks a patch without building a new state.
+    """
+    strict_patch = patch.get("strict") if isinstance(patch, dict) else None
+    return _strict_errors(strict_patch) if isinstance(strict_patch, dict) else []
+
+
 def apply_patch(state: GameState, patch: Patch) -> PatchResult:
     """Apply a patch to the game state.
     
@@ -308,8 +328,8 @@ def apply_patch(state: GameState, patch: Patch) -> PatchResult:
         if result.success:
             state = result.state
     """
-    # Start with a copy of the current state
-    updated_state = deepcopy(state)
+    # Start with a shallow copy; untouched sub-states are shared with `state`
+    updated_state = replace(state)
     all_errors: list[ValidationError] = []
     all_warnings: list[str] = []
     
@@ -0,0 +1,257 @@
+"""Deterministic repair of LLM-proposed patches.
+
+Runs between `llm.mutate.generate_patch` and `apply_patch` and fixes
+mistakes that would otherwise reject a patch for a trivially fixable
+reason, saving a second model round trip:
+
+  - unresolved `${intent.<field>}` placeholders are filled from the
+    intent's attributes or params,
+  - strict times are normalized to HH:MM ("9:05", "09:05:00", "9am",
+    "2024-01-01T21:30:00Z"),
+  - an unusable clock time is replaced with the time the intent asks
+    for (the current clock plus `offset_hours`), and an unresolved
+    timezone with the current one,
+  - a missing email `sent_at` is filled from the current clock and a
+    missing `recipient` from the intent params,
+  - a single email object is wrapped in a list,
+  - strict keys that are not part of the strict schema are dropped.
+
+Repairs never invent values that neither the state nor the intent
+supply; anything still invalid is left for `apply_patch` to reject.
+Every change is recorded in `RepairResult.changes`.
+"""
+
+import re
+import typing
+from dataclasses import dataclass, field, fields, is_dataclass
+from typing import Any, Optional
+
+from engine.patch import Patch
+from engine.state import StrictState
+
+
+def _strict_fields() -> dict[str, set[str]]:
+    """Allowed keys per strict field, read from the `StrictState` dataclasses."""
+    allowed = {}
+    for name, hint in typing.get_type_hints(StrictState).items():
+        item = typing.get_args(hint)[0] if typing.get_origin(hint) is list else hint
+        if is_dataclass(item):
+            allowed[name] = {f.name for f in fields(item)}
+    return allowed
+
+
+STRICT_FIELDS = _strict_fields()
+
+_PLACEHOLDER = re.compile(r"\$\{intent\.(\w+)\}")
+_TIME = re.compile(r"^(\d{1,2})(?:[:.h]?(\d{2}))?(?::\d{2}(?:\.\d+)?)?\s*([ap])?\.?\s*(?:m\.?)?$", re.IGNORECASE)
+
+
+@dataclass
+class RepairResult:
+    """A repaired patch and a description of each change made."""
+    patch: Patch
+    changes: list[str] = field(default_factory=list)
+
+    @property
+    def repaired(self) -> bool:
+        return bool(self.changes)
+
+
+def normalize_time(value: Any) -> Optional[str]:
+    """Return `value` as an HH:MM string, or None if it is not a recognizable time.
+
+    Accepts H:MM, HH:MM:SS, HHMM, 12-hour forms with am/pm and ISO
+    datetimes (the time part is used, any offset is ignored).
+    """
+    if not isinstance(value, str):
+        return None
+    text = value.strip()
+    if "T" in text and text[:1].isdigit():
+        text = text.split("T", 1)[1]
+        text = re.split(r"[Z+-]", text, maxsplit=1)[0]
+    match = _TIME.match(text)
+    if not match:
+        return None
+    hour = int(match.group(1))
+    minute = int(match.group(2) or 0)
+    meridiem = (match.group(3) or "").lower()
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem == "p" else 0)
+    if not (0 <= hour <= 23 and 0 <= minute <= 59):
+        return None
+    return f"{hour:02d}:{minute:02d}"
+
+
+def _intent_value(intent: Any, name: str) -> Any:
+    """Look up `name` on the intent, then in its params; None if absent."""
+    if intent is None:
+        return None
+    value = getattr(intent, name, None)
+    if value is None:
+        params = getattr(intent, "params", None) or {}
+        value = params.get(name) if isinstance(params, dict) else None
+    if hasattr(value, "name") and not isinstance(value, str):
+        value = value.name  # enum members such as IntentType
+    return value
+
+
+def _resolve_placeholders(value: Any, intent: Any, path: str, changes: list[str]) -> Any:
+    if isinstance(value, str):
+        whole = _PLACEHOLDER.fullmatch(value)
+        if whole:
+            resolved = _intent_value(intent, whole.group(1))
+            if resolved is not None:
+                changes.append(f"{path}: resolved {value} -> {resolved!r}")
+                return resolved
+            return value
+        if "${intent." in value:
+            def sub(m: re.Match) -> str:
+                resolved = _intent_value(intent, m.group(1))
+                return m.group(0) if resolved is None else str(resolved)
+            new = _PLACEHOLDER.sub(sub, value)
+            if new != value:
+                changes.append(f"{path}: resolved placeholders -> {new!r}")
+            return new
+        return value
+    if isinstance(value, dict):
+        return {k: _resolve_placeholders(v, intent, f"{path}.{k}", changes) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_resolve_placeholders(v, intent, f"{path}[{i}]", changes) for i, v in enumerate(value)]
+    return value
+
+
+def _is_unresolved(value: Any) -> bool:
+    return isinstance(value, str) and "${intent." in value
+
+
+def _current_time(state: Any, strict_patch: dict) -> Optional[str]:
+    """The clock time after this patch: the patched time if any, else the state's."""
+    clock = strict_patch.get("clock")
+    if isinstance(clock, dict) and normalize_time(clock.get("time")):
+        return clock["time"]
+    return getattr(_state_clock(state), "time", None)
+
+
+def _repair_time(obj: dict, key: str, path: str, fallback: Optional[str], changes: list[str]) -> None:
+    """Normalize `obj[key]` in place, replacing it with `fallback` if unusable."""
+    value = obj.get(key)
+    normalized = normalize_time(value)
+    if normalized is not None:
+        if normalized != value:
+            obj[key] = normalized
+            changes.append(f"{path}.{key}: normalized {value!r} -> {normalized!r}")
+        return
+    fallback = normalize_time(fallback)
+    if fallback is not None and (value is None or isinstance(value, str)):
+        obj[key] = fallback
+        changes.append(f"{path}.{key}: {'filled' if value is None else f'replaced {value!r}'} with {fallback!r}")
+
+
+def _drop_unknown(obj: dict, allowed: set, path: str, changes: list[str]) -> dict:
+    unknown = [k for k in obj if k not in allowed]
+    for k in unknown:
+        changes.append(f"{path}.{k}: dropped unknown key")
+    return {k: v for k, v in obj.items() if k in allowed}
+
+
+def _state_clock(state: Any) -> Any:
+    return getattr(getattr(state, "strict", None), "clock", None)
+
+
+def _intended_time(state: Any, intent: Any) -> Optional[str]:
+    """The time the intent sets: its `time`, else the current clock plus `offset_hours`."""
+    explicit = _intent_value(intent, "time")
+    if explicit is not None:
+        return explicit
+    offset = _intent_value(intent, "offset_hours")
+    current = normalize_time(getattr(_state_clock(state), "time", None))
+    if offset is None or current is None:
+        return None
+    try:
+        hour = (int(current[:2]) + int(offset)) % 24
+    except (TypeError, ValueError):
+        return None
+    return f"{hour:02d}{current[2:]}"
+
+
+def _repair_clock(clock: Any, state: Any, intent: Any, changes: list[str]) -> Any:
+    if not isinstance(clock, dict):
+        return clock
+    clock = _drop_unknown(clock, STRICT_FIELDS["clock"], "strict.clock", changes)
+    if "time" in clock:
+        _repair_time(clock, "time", "strict.clock", _intended_time(state, intent), changes)
+    timezone = clock.get("timezone")
+    if "timezone" in clock and (not isinstance(timezone, str) or _is_unresolved(timezone)):
+        current = getattr(_state_clock(state), "timezone", None)
+        if isinstance(current, str):
+            clock["timezone"] = current
+            changes.append(f"strict.clock.timezone: replaced {timezone!r} with {current!r}")
+        else:
+            changes.append("strict.clock.timezone: dropped unresolved value")
+            del clock["timezone"]
+    return clock
+
+
+def _repair_emails(emails: Any, now: Optional[str], intent: Any, changes: list[str]) -> Any:
+    if isinstance(emails, dict):
+        changes.append("strict.emails: wrapped single email in a list")
+        emails = [emails]
+    if not isinstance(emails, list):
+        return emails
+    repaired = []
+    for i, email in enumerate(emails):
+        path = f"strict.emails[{i}]"
+        if isinstance(email, str):
+            changes.append(f"{path}: expanded recipient string to an email object")
+            email = {"recipient": email}
+        if not isinstance(email, dict):
+            repaired.append(email)
+            continue
+        email = _drop_unknown(email, STRICT_FIELDS["emails"], path, changes)
+        if not isinstance(email.get("recipient"), str) or _is_unresolved(email.get("recipient")):
+            recipient = _intent_value(intent, "recipient")
+            if isinstance(recipient, str):
+                changes.append(f"{path}.recipient: filled from intent ({recipient!r})")
+                email["recipient"] = recipient
+        _repair_time(email, "sent_at", path, now, changes)
+        repaired.append(email)
+    return repaired
+
+
+def repair_patch(patch: Patch, state: Any = None, intent: Any = None) -> RepairResult:
+    """Return a repaired copy of `patch`; the input is not modified.
+
+    Args:
+        patch: Patch dict with "strict" and/or "vibe" keys.
+        state: Current game state, used for defaults such as the clock time.
+        intent: The intent the patch answers, used for its params.
+
+    Returns:
+        RepairResult: The repaired patch and the list of changes made.
+    """
+    changes: list[str] = []
+    if not isinstance(patch, dict):
+        return RepairResult(patch, changes)
+
+    repaired: Patch = {}
+    for key, value in patch.items():
+        if key not in ("strict", "vibe"):
+            changes.append(f"{key}: dropped unknown top-level key")
+            continue
+        repaired[key] = _resolve_placeholders(value, intent, key, changes)
+
+    strict = repaired.get("strict")
+    if isinstance(strict, dict):
+        strict = _drop_unknown(strict, set(STRICT_FIELDS), "strict", changes)
+        if "clock" in strict:
+            strict["clock"] = _repair_clock(strict["clock"], state, intent, changes)
+        if "emails" in strict:
+            strict["emails"] = _repair_emails(strict["emails"], _current_time(state, strict), intent, changes)
+        repaired["strict"] = strict
+
+    return RepairResult(repaired, changes)
+
+
+__all__ = ["RepairResult", "normalize_time", "repair_patch"]
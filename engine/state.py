@@ -1,34 +1,42 @@
-"""State model and helpers."""
+"""State model and helpers.
+
+The strict classes are plain dataclasses; `dataclasses_jsonschema` is
+only imported when `strict_state_schema()` is first called, so importing
+the state model stays cheap.
+"""
 import json
-from dataclasses import dataclass, field, asdict
-from typing import Optional, Union
+import typing
+from dataclasses import MISSING, dataclass, field, fields, asdict, is_dataclass, make_dataclass
+from functools import lru_cache
+from typing import ClassVar, Optional, Union
 from copy import deepcopy
 
-from dataclasses_jsonschema import JsonSchemaMixin
-
 
 
 @dataclass
-class Clock(JsonSchemaMixin):
+class Clock:
     """Clock state: timezone and current time."""
+    _omit_none: ClassVar[bool] = True  # serialized without None fields, like the JSON schema mixin
     timezone: str
     time: str  # HH:MM format
 
 
 @dataclass
-class Email(JsonSchemaMixin):
+class Email:
     """Email with recipient field."""
+    _omit_none: ClassVar[bool] = True
     recipient: str
     sent_at: Optional[str] = None  # Optional sent_at time in HH:MM
 
 
 @dataclass
-class StrictState(JsonSchemaMixin):
+class StrictState:
     """
     Closed-schema state used for win conditions and validation.
     
     No dynamic keys allowed. Structure is fixed and enforced.
     """
+    _omit_none: ClassVar[bool] = True
     clock: Clock
     emails: list[Email] = field(default_factory=list)
 
@@ -44,6 +52,7 @@ class VibeState:
     system_config: dict = field(default_factory=dict)
     emails: list = field(default_factory=list)
     notes: list = field(default_factory=list)
+    summary: dict = field(default_factory=dict)  # compacted overflow, see engine.compact
 
 
 @dataclass
@@ -126,15 +135,51 @@ def state_from_json(json_str: str) -> GameState:
     vibe = VibeState(
         system_config=data["vibe"]["system_config"],
         emails=data["vibe"]["emails"],
-        notes=data["vibe"]["notes"]
+        notes=data["vibe"]["notes"],
+        summary=data["vibe"].get("summary", {})
     )
     
     return GameState(strict=strict, vibe=vibe)
 
 
+def _schema_type(tp, base: type, memo: dict):
+    if is_dataclass(tp):
+        return _schema_class(tp, base, memo)
+    args = typing.get_args(tp)
+    if not args:
+        return tp
+    mapped = tuple(_schema_type(a, base, memo) for a in args)
+    origin = typing.get_origin(tp)
+    if origin is Union:
+        return Union[mapped]
+    return origin[mapped if len(mapped) > 1 else mapped[0]]
+
+
+def _schema_class(cls: type, base: type, memo: dict) -> type:
+    """Mirror dataclass `cls` (and the dataclasses it references) with `base` mixed in."""
+    if cls not in memo:
+        hints = typing.get_type_hints(cls)
+        specs = []
+        for f in fields(cls):
+            kwargs = {}
+            if f.default is not MISSING:
+                kwargs["default"] = f.default
+            if f.default_factory is not MISSING:
+                kwargs["default_factory"] = f.default_factory
+            specs.append((f.name, _schema_type(hints[f.name], base, memo), field(**kwargs)))
+        memo[cls] = make_dataclass(cls.__name__, specs, bases=(base,), namespace={"__doc__": cls.__doc__})
+    return memo[cls]
+
+
+@lru_cache(maxsize=1)
+def _strict_schema_class() -> type:
+    from dataclasses_jsonschema import JsonSchemaMixin
+    return _schema_class(StrictState, JsonSchemaMixin, {})
+
+
 def strict_state_schema() -> dict:
     """
     Return a JSON schema for StrictState.
     Useful for LLM prompt context and validation.
     """
-    return StrictState.json_schema()
\ No newline at end of file
+    return _strict_schema_class().json_schema()
\ No newline at end of file
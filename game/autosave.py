@@ -0,0 +1,210 @@
+"""Background session autosave with crash recovery.
+
+The turn path only calls `Autosaver.mark_dirty(session_id, state)`,
+which records the latest state of a session and returns at once. A
+writer thread wakes every `interval` seconds (or when `flush` asks it
+to) and writes every dirty session:
+
+  - sessions marked several times between writes are coalesced: only
+    their latest state is written,
+  - each session is written to a temp file and renamed over
+    `<directory>/<session>.json`, so a crash leaves either the old or
+    the new snapshot, never a torn one,
+  - fsyncs are batched: all temp files of a batch are written first,
+    then synced, renamed, and the directory is synced once,
+  - a batch that fails to write is marked dirty again (unless the
+    session was marked with a newer state meanwhile) and retried on
+    the next pass.
+
+`recover(directory)` loads the latest snapshot of every session found
+there and removes temp files left by an interrupted write.
+
+Since states are never modified in place (see `engine.patch`), the
+writer can serialize a marked state while the game plays on.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from engine.state import GameState, state_from_json, state_to_json
+from telemetry import metrics
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 1.0
+SUFFIX = ".json"
+TMP_SUFFIX = ".tmp"
+
+
+def session_key(session_id: str) -> str:
+	"""The session id with characters unsafe in file names replaced; keys `recover` results."""
+	return re.sub(r"[^\w.-]", "_", session_id)
+
+
+def session_filename(session_id: str) -> str:
+	"""File name for a session's snapshot."""
+	return session_key(session_id) + SUFFIX
+
+
+def _fsync_dir(directory: Path) -> None:
+	try:
+		fd = os.open(directory, os.O_RDONLY)
+	except OSError:
+		return  # not supported on this platform
+	try:
+		os.fsync(fd)
+	except OSError:
+		pass
+	finally:
+		os.close(fd)
+
+
+class Autosaver:
+	"""Coalescing background writer of session snapshots.
+
+	Args:
+		directory: Where snapshots are written (created if missing).
+		interval: Seconds between background write passes.
+		fsync: Sync files and directory to disk after each batch.
+	"""
+
+	def __init__(self, directory: Path, interval: float = DEFAULT_INTERVAL, fsync: bool = True):
+		self.directory = Path(directory)
+		self.directory.mkdir(parents=True, exist_ok=True)
+		self.interval = interval
+		self.fsync = fsync
+		self._dirty: Dict[str, GameState] = {}
+		self._lock = threading.Lock()
+		self._wake = threading.Event()
+		self._idle = threading.Condition(self._lock)
+		self._writing = False
+		self._passes = 0
+		self._failed_pass = 0
+		self._closed = False
+		self._thread = threading.Thread(target=self._loop, name="autosave", daemon=True)
+		self._thread.start()
+
+	def mark_dirty(self, session_id: str, state: GameState) -> None:
+		"""Record `state` as the latest state of `session_id`; it is written in the background."""
+		with self._lock:
+			if self._closed:
+				raise RuntimeError("Autosaver is closed")
+			if session_id in self._dirty:
+				metrics.incr("autosave.coalesced")
+			self._dirty[session_id] = state
+
+	def flush(self, timeout: Optional[float] = None) -> bool:
+		"""Write all pending sessions now.
+
+		Returns False if `timeout` expired first or a write failed; failed
+		sessions stay pending and are retried on the next pass.
+		"""
+		with self._idle:
+			start = self._passes
+			self._wake.set()
+			self._idle.wait_for(lambda: (not self._dirty and not self._writing) or self._failed_pass > start, timeout)
+			return not self._dirty and not self._writing
+
+	def close(self, timeout: Optional[float] = None) -> None:
+		"""Write pending sessions and stop the writer thread."""
+		with self._lock:
+			if self._closed:
+				return
+			self._closed = True
+		self._wake.set()
+		self._thread.join(timeout)
+
+	def __enter__(self) -> "Autosaver":
+		return self
+
+	def __exit__(self, *exc) -> None:
+		self.close()
+
+	def _loop(self) -> None:
+		while True:
+			self._wake.wait(self.interval)
+			self._wake.clear()
+			with self._lock:
+				batch, self._dirty = self._dirty, {}
+				self._writing = bool(batch)
+				closed = self._closed
+			failed = False
+			if batch:
+				try:
+					self._write_batch(batch)
+				except Exception:
+					LOG.warning("Autosave failed for %s; retrying", sorted(batch), exc_info=True)
+					metrics.incr("autosave.errors")
+					self._requeue(batch)
+					failed = True
+			with self._idle:
+				self._writing = False
+				self._passes += 1
+				if failed:
+					self._failed_pass = self._passes
+				self._idle.notify_all()
+			if closed:
+				return
+
+	def _requeue(self, batch: Dict[str, GameState]) -> None:
+		"""Mark the sessions of a failed batch dirty again, keeping newer marks."""
+		with self._lock:
+			for session_id, state in batch.items():
+				self._dirty.setdefault(session_id, state)
+			if self._closed:
+				LOG.error("Autosaver closed with unsaved sessions %s", sorted(self._dirty))
+
+	def _write_batch(self, batch: Dict[str, GameState]) -> None:
+		with metrics.timer("autosave.write"):
+			pending = []
+			try:
+				for session_id, state in batch.items():
+					path = self.directory / session_filename(session_id)
+					tmp = path.with_name(path.name + TMP_SUFFIX)
+					fh = open(tmp, "w")
+					pending.append((fh, tmp, path))
+					fh.write(state_to_json(state))
+					fh.flush()
+				for fh, tmp, path in pending:
+					if self.fsync:
+						os.fsync(fh.fileno())
+					fh.close()
+					os.replace(tmp, path)
+			finally:
+				for fh, tmp, _ in pending:
+					if not fh.closed:
+						fh.close()
+						tmp.unlink(missing_ok=True)
+			if self.fsync:
+				_fsync_dir(self.directory)
+		metrics.incr("autosave.sessions_written", len(batch))
+
+
+def recover(directory: Path) -> Dict[str, GameState]:
+	"""Load the latest snapshot of each session in `directory`, keyed by `session_key`.
+
+	Leftover temp files from interrupted writes are removed and
+	unreadable snapshots are skipped with a warning.
+	"""
+	directory = Path(directory)
+	states: Dict[str, GameState] = {}
+	if not directory.is_dir():
+		return states
+	for tmp in directory.glob("*" + SUFFIX + TMP_SUFFIX):
+		LOG.info("Removing interrupted autosave %s", tmp)
+		tmp.unlink(missing_ok=True)
+	for path in sorted(directory.glob("*" + SUFFIX)):
+		try:
+			states[path.name[:-len(SUFFIX)]] = state_from_json(path.read_text())
+		except (OSError, ValueError, KeyError, TypeError):
+			LOG.warning("Skipping unreadable autosave %s", path, exc_info=True)
+	return states
+
+
+__all__ = ["Autosaver", "recover", "session_filename", "session_key"]
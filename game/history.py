@@ -0,0 +1,151 @@
+"""Per-session turn history with constant-time rewind.
+
+`SessionHistory` keeps the state after each turn. Since `apply_patch`
+is copy-on-write, consecutive states share every sub-object a turn did
+not touch, so retaining a turn costs only what that turn changed rather
+than a full `copy_state` deep copy. A no-op turn (SHOW_CONFIG,
+READ_EMAIL) costs one history entry.
+
+States are indexed by turn number, so `state_at` and `rewind` are O(1)
+lookups; rewinding discards the later turns so play continues from the
+restored state. Only the last `depth` turns are retained.
+
+`memory()` reports the bytes each retained turn adds on top of the ones
+before it, next to the size a deep copy of the state would take.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from engine.state import GameState
+
+DEFAULT_DEPTH = 50
+
+
+@dataclass(frozen=True)
+class HistoryEntry:
+	turn: int
+	state: GameState
+	command: Optional[str] = None
+
+
+def _children(obj: Any) -> List[Any]:
+	if isinstance(obj, dict):
+		return list(obj.keys()) + list(obj.values())
+	if isinstance(obj, (list, tuple)):
+		return list(obj)
+	if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+		return [getattr(obj, f.name) for f in dataclasses.fields(obj)]
+	return []
+
+
+def _new_bytes(root: Any, seen: set) -> int:
+	"""Size of the objects reachable from `root` that are not in `seen` (which is updated)."""
+	total = 0
+	stack = [root]
+	while stack:
+		obj = stack.pop()
+		if id(obj) in seen:
+			continue
+		seen.add(id(obj))
+		total += sys.getsizeof(obj)
+		if hasattr(obj, "__dict__") and not isinstance(obj, type):
+			total += sys.getsizeof(vars(obj))
+		stack.extend(_children(obj))
+	return total
+
+
+class SessionHistory:
+	"""Retained per-turn states of one session.
+
+	Args:
+		depth: Number of most recent turns kept (turn 0 counts too).
+	"""
+
+	def __init__(self, depth: int = DEFAULT_DEPTH):
+		if depth < 1:
+			raise ValueError("depth must be at least 1")
+		self.depth = depth
+		self._entries: Dict[int, HistoryEntry] = {}
+		self._first = 0
+		self._last = -1
+		self._lock = threading.Lock()
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+	@property
+	def current_turn(self) -> int:
+		"""Turn number of the latest state (-1 if empty)."""
+		return self._last
+
+	@property
+	def oldest_turn(self) -> Optional[int]:
+		return self._first if self._entries else None
+
+	def record(self, state: GameState, command: Optional[str] = None) -> int:
+		"""Append the state after a turn; returns its turn number."""
+		with self._lock:
+			self._last += 1
+			self._entries[self._last] = HistoryEntry(self._last, state, command)
+			while len(self._entries) > self.depth:
+				del self._entries[self._first]
+				self._first += 1
+			return self._last
+
+	def state_at(self, turn: int) -> GameState:
+		"""Return the state after `turn`; raises KeyError if it is not retained."""
+		with self._lock:
+			return self._entries[turn].state
+
+	def entry(self, turn: int) -> HistoryEntry:
+		with self._lock:
+			return self._entries[turn]
+
+	def rewind(self, turn: int) -> GameState:
+		"""Make `turn` the latest turn again and return its state.
+
+		Later turns are discarded. Raises KeyError if `turn` is not retained.
+		"""
+		with self._lock:
+			state = self._entries[turn].state
+			for later in range(turn + 1, self._last + 1):
+				del self._entries[later]
+			self._last = turn
+			return state
+
+	def undo(self, steps: int = 1) -> GameState:
+		"""Rewind `steps` turns back from the latest one."""
+		return self.rewind(self._last - steps)
+
+	def entries(self) -> List[HistoryEntry]:
+		with self._lock:
+			return [self._entries[t] for t in range(self._first, self._last + 1)]
+
+	def memory(self) -> Dict[str, Any]:
+		"""Account for the memory held by the retained turns.
+
+		Returns a dict with `per_turn` (turn -> bytes not shared with
+		earlier retained turns), `total_bytes`, `mean_bytes_per_turn` and
+		`full_copy_bytes` (the size of the latest state on its own, i.e.
+		what each turn would cost as a deep copy).
+		"""
+		entries = self.entries()
+		seen: set = set()
+		per_turn = {e.turn: _new_bytes(e.state, seen) for e in entries}
+		total = sum(per_turn.values())
+		return {
+			"turns": len(entries),
+			"per_turn": per_turn,
+			"total_bytes": total,
+			"mean_bytes_per_turn": total / len(entries) if entries else 0.0,
+			"full_copy_bytes": _new_bytes(entries[-1].state, set()) if entries else 0,
+		}
+
+
+__all__ = ["HistoryEntry", "SessionHistory"]
@@ -5,33 +5,30 @@
 Orchestrates: terminal input -> intent -> patch generator (stub or LLM) -> apply_patch -> render
 
 The patch generator can be configured at runtime via mutator_type ("stub" or "llm").
+Each turn runs through `game.turn.TurnScheduler`, which overlaps narration
+with the mutator.
 """
 from __future__ import annotations
 
 import json
 import logging
 import os
-from dataclasses import asdict
+import re
+import time
+from dataclasses import asdict, replace
 from typing import Optional
 
 from engine import state as state_mod
-from engine.patch import apply_patch, PatchResult
-from dataclasses import dataclass
-
-from game.narrate import narrate
-
-
-@dataclass
-class Outcome:
-	intent_type: str
-	intent_confidence: float
-	patch: dict | None
-	success: bool
-	errors: list[str]
-
+from engine.compact import VibeLimits
+from engine.patch import PatchResult
 
+from game.autosave import Autosaver, recover, session_key
 from game.commands import parse_intent
+from game.history import DEFAULT_DEPTH, SessionHistory
+from game.transcript import TranscriptWriter, turn_record
 from game.mutate import get_mutator
+from game.turn import TurnScheduler
+from telemetry import debug, metrics
 
 LOG = logging.getLogger(__name__)
 
@@ -79,29 +76,32 @@ def check_win_condition(state: state_mod.GameState) -> bool:
 
 
 def render_patch_result(result: PatchResult) -> None:
-	"""Print patch application results: success, errors, warnings."""
+	"""Log patch application results (success, errors, warnings) at DEBUG; free when DEBUG is off."""
+	if not LOG.isEnabledFor(logging.DEBUG):
+		return
 	LOG.debug("Patch apply result:")
-	LOG.debug(f"  success: {result.success}")
+	LOG.debug("  success: %s", result.success)
 	if result.strict_errors:
 		LOG.debug("  strict errors:")
 		for err in result.strict_errors:
-			LOG.debug(f"    - {err.field}: {err.reason} (value={err.attempted_value})")
+			LOG.debug("    - %s: %s (value=%r)", err.field, err.reason, err.attempted_value)
 	if result.warnings:
 		LOG.debug("  warnings:")
 		for w in result.warnings:
-			LOG.debug(f"    - {w}")
+			LOG.debug("    - %s", w)
 
 
 def render_strict_state(state: state_mod.GameState) -> None:
-    """Print the strict state for debugging."""
+    """Log the strict state at DEBUG; the state is only serialized when DEBUG is on."""
+    if not LOG.isEnabledFor(logging.DEBUG):
+        return
     try:
         strict_dict = asdict(state.strict)
     except Exception:
         # Fallback: serialize via state_to_json and extract 'strict'
         doc = json.loads(state_mod.state_to_json(state))
         strict_dict = doc.get('strict', {})
-    LOG.debug("Current strict state:")
-    LOG.debug(json.dumps(strict_dict, indent=2))
+    LOG.debug("Current strict state:\n%s", debug.lazy_json(strict_dict))
 
 
 def main(mutator_type: str = "llm") -> None:
@@ -113,8 +113,184 @@ def main(mutator_type: str = "llm") -> None:
 
 	LOG.info("Starting game loop with mutator_type=%s", mutator_type)
 	mutator = get_mutator(mutator_type)
-	state = state_mod.create_initial_state()
-
+	warmup = _start_warmup(mutator_type)
+	autosaver = _autosaver()
+	state = _recover_state(autosaver) or state_mod.create_initial_state()
+	_start_metrics_endpoint()
+
+	transcript = _transcript_writer()
+	_report_warmup(warmup)
+
+	try:
+		with TurnScheduler(mutator, turn_deadline=_turn_deadline(), vibe_limits=_vibe_limits(), summarizer=_vibe_summarizer()) as scheduler:
+			_run_turns(scheduler, state, autosaver, transcript)
+	finally:
+		if autosaver is not None:
+			autosaver.close()
+		if transcript is not None:
+			transcript.close()
+		_export_metrics()
+
+
+def _start_warmup(mutator_type: str):
+	"""Preload the configured models in the background (`llm.warmup`); off with SPARROW_WARMUP=0."""
+	if mutator_type != "llm" or os.getenv("SPARROW_WARMUP", "1").lower() in ("0", "false", "no"):
+		return None
+	from llm.warmup import Warmup
+	try:
+		return Warmup.from_config().start()
+	except Exception:
+		LOG.warning("Model warmup could not start", exc_info=True)
+		return None
+
+
+def _report_warmup(warmup) -> None:
+	"""Wait up to SPARROW_WARMUP_WAIT seconds (default 0) for warmup, then log readiness."""
+	if warmup is None:
+		return
+	value = os.getenv("SPARROW_WARMUP_WAIT")
+	try:
+		wait = float(value) if value else 0.0
+	except ValueError:
+		LOG.warning("Ignoring invalid SPARROW_WARMUP_WAIT=%r", value)
+		wait = 0.0
+	warmup.wait(wait)
+	for model, status in warmup.status().items():
+		LOG.info("Model %s (%s): %s", model, status["role"], status["state"])
+
+
+def _transcript_writer() -> Optional[TranscriptWriter]:
+	"""Columnar transcript sink at SPARROW_TRANSCRIPT, if set (see `game.transcript`)."""
+	path = os.getenv("SPARROW_TRANSCRIPT")
+	return TranscriptWriter(path) if path else None
+
+
+def _autosaver() -> Optional[Autosaver]:
+	"""Background autosave to SPARROW_AUTOSAVE_DIR, if set (SPARROW_AUTOSAVE_INTERVAL seconds, default 1)."""
+	directory = os.getenv("SPARROW_AUTOSAVE_DIR")
+	if not directory:
+		return None
+	value = os.getenv("SPARROW_AUTOSAVE_INTERVAL")
+	try:
+		interval = float(value) if value else 1.0
+	except ValueError:
+		LOG.warning("Ignoring invalid SPARROW_AUTOSAVE_INTERVAL=%r", value)
+		interval = 1.0
+	return Autosaver(directory, interval=interval)
+
+
+def _recover_state(autosaver: Optional[Autosaver], session_id: str = "default") -> Optional[state_mod.GameState]:
+	"""The autosaved state of `session_id` from a previous run, if any."""
+	if autosaver is None:
+		return None
+	state = recover(autosaver.directory).get(session_key(session_id))
+	if state is not None:
+		LOG.info("Recovered autosaved session %r from %s", session_id, autosaver.directory)
+		print("Resuming your saved session.")
+	return state
+
+
+def _turn_deadline() -> Optional[float]:
+	"""Per-turn LLM budget in seconds from SPARROW_TURN_DEADLINE, if set."""
+	value = os.getenv("SPARROW_TURN_DEADLINE")
+	try:
+		return float(value) if value else None
+	except ValueError:
+		LOG.warning("Ignoring invalid SPARROW_TURN_DEADLINE=%r", value)
+		return None
+
+
+def _vibe_limits() -> VibeLimits:
+	"""Vibe state bounds, overridable with SPARROW_VIBE_MAX_EMAILS / _NOTES / _CONFIG_KEYS."""
+	overrides = {}
+	for field_name, env in (("max_emails", "SPARROW_VIBE_MAX_EMAILS"), ("max_notes", "SPARROW_VIBE_MAX_NOTES"), ("max_config_keys", "SPARROW_VIBE_MAX_CONFIG_KEYS")):
+		value = os.getenv(env)
+		if not value:
+			continue
+		try:
+			overrides[field_name] = int(value)
+		except ValueError:
+			LOG.warning("Ignoring invalid %s=%r", env, value)
+	return replace(VibeLimits(), **overrides)
+
+
+def _history_depth() -> int:
+	"""Turns kept for undo/rewind, from SPARROW_HISTORY_DEPTH."""
+	value = os.getenv("SPARROW_HISTORY_DEPTH")
+	try:
+		return max(1, int(value)) if value else DEFAULT_DEPTH
+	except ValueError:
+		LOG.warning("Ignoring invalid SPARROW_HISTORY_DEPTH=%r", value)
+		return DEFAULT_DEPTH
+
+
+_HISTORY_COMMAND = re.compile(r"^\s*(undo|rewind)(?:\s+(?:to\s+)?(?:turn\s+)?(\d+))?\s*$", re.IGNORECASE)
+
+
+def handle_history_command(text: str, history: SessionHistory) -> Optional[state_mod.GameState]:
+	"""Handle "undo [N]" and "rewind [to turn] N"; returns the restored state, or None if `text` is not one."""
+	m = _HISTORY_COMMAND.match(text)
+	if not m:
+		return None
+	verb, number = m.group(1).lower(), m.group(2)
+	try:
+		if verb == "undo":
+			state = history.undo(int(number) if number else 1)
+		else:
+			state = history.rewind(int(number) if number else history.current_turn - 1)
+	except KeyError:
+		print(f"Cannot {verb}: only turns {history.oldest_turn}-{history.current_turn} are retained.")
+		return history.state_at(history.current_turn)
+	print(f"Rewound to turn {history.current_turn}.")
+	return state
+
+
+def _vibe_summarizer():
+	"""The background LLM summarizer when SPARROW_VIBE_SUMMARIZER=llm, else None (rule-based only)."""
+	if os.getenv("SPARROW_VIBE_SUMMARIZER", "").lower() != "llm":
+		return None
+	from llm.summarize import summarize_vibe
+	return summarize_vibe
+
+
+def _start_metrics_endpoint() -> None:
+	"""Serve metrics locally when SPARROW_METRICS_PORT is set."""
+	port = os.getenv("SPARROW_METRICS_PORT")
+	if not port:
+		return
+	metrics.enable()
+	try:
+		metrics.serve(int(port))
+	except (OSError, ValueError):
+		LOG.warning("Could not serve metrics on port %r", port, exc_info=True)
+
+
+def _export_metrics() -> None:
+	"""Write collected metrics to SPARROW_METRICS_FILE, if configured."""
+	path = os.getenv("SPARROW_METRICS_FILE")
+	if path and metrics.enabled():
+		metrics.write(path)
+		LOG.info("Wrote turn metrics to %s", path)
+
+
+def _turn_debug(turn) -> dict:
+	"""Structured detail of a turn for the debug channel (built only when it is on)."""
+	result = turn.result
+	return {
+		"intent": {"type": turn.intent.type.name, "params": turn.intent.params, "confidence": turn.intent.confidence},
+		"patch": turn.patch,
+		"success": turn.outcome.success,
+		"errors": turn.outcome.errors,
+		"warnings": list(result.warnings) if result is not None else [],
+		"timings": turn.timings,
+		"strict": asdict(turn.state.strict),
+		"narration": turn.narration.text,
+	}
+
+
+def _run_turns(scheduler: TurnScheduler, state: state_mod.GameState, autosaver: Optional[Autosaver] = None, transcript: Optional[TranscriptWriter] = None) -> None:
+	history = SessionHistory(_history_depth())
+	history.record(state)
 	while True:
 		try:
 			user_input = input('> ')
@@ -122,32 +298,37 @@ def main(mutator_type: str = "llm") -> None:
 			LOG.debug('Exiting.')
 			break
 
-		intent = parse_intent(user_input)
-		LOG.debug(f"Intent: {intent.type.name} (confidence={intent.confidence})")
-
-		# Use the selected mutator to generate the patch
-		patch = mutator(intent, state, level_context=None)
-
-		result = None
-		if patch:
-			LOG.debug("Proposed patch:")
-			LOG.debug(json.dumps(patch, indent=2))
-			result = apply_patch(state, patch)
-			render_patch_result(result)
-			if result and result.success:
-				state = result.state
-
-		outcome = Outcome(
-			intent_type=intent.type.name,
-			intent_confidence=float(intent.confidence),
-			patch=patch if patch else None,
-			success=bool(result.success) if result else False,
-			errors=[f"{e.field}: {e.reason} (value={e.attempted_value})" for e in (result.strict_errors if result and result.strict_errors else [])]
-		)
-		narration = narrate(outcome)
-		print(narration.text)
-
-		render_strict_state(state)
+		restored = handle_history_command(user_input, history)
+		if restored is not None:
+			state = restored
+			if autosaver is not None:
+				autosaver.mark_dirty(scheduler.session_id, state)
+			render_strict_state(state)
+			continue
+
+		turn_start = time.perf_counter()
+		metrics.incr("turns")
+		with metrics.timer("parse"):
+			intent = parse_intent(user_input)
+		LOG.debug("Intent: %s (confidence=%s)", intent.type.name, intent.confidence)
+
+		turn = scheduler.run(intent, state, level_context=None)
+		if turn.patch:
+			LOG.debug("Proposed patch:\n%s", debug.lazy_json(turn.patch))
+			render_patch_result(turn.result)
+		state = turn.state
+		history.record(state, user_input)
+		if autosaver is not None:
+			autosaver.mark_dirty(scheduler.session_id, state)
+
+		with metrics.timer("render"):
+			print(turn.narration.text)
+			render_strict_state(state)
+		turn_seconds = time.perf_counter() - turn_start
+		metrics.observe("turn", turn_seconds)
+		debug.event("turn", lambda: _turn_debug(turn), session=scheduler.session_id, turn=history.current_turn, seconds=turn_seconds)
+		if transcript is not None:
+			transcript.append(turn_record(turn, user_input, scheduler.session_id, history.current_turn, turn_seconds))
 
 		if check_win_condition(state):
 			print("WIN CONDITION MET — Level complete.")
@@ -155,4 +336,8 @@ def main(mutator_type: str = "llm") -> None:
 
 
 if __name__ == '__main__':
+    import sys
+    if "--profile-startup" in sys.argv[1:]:
+        from telemetry import startup
+        raise SystemExit(startup.main([__spec__.name if __spec__ else "game.loop"]))
     main()
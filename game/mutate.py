@@ -6,10 +6,31 @@ import logging
 from typing import Any, Dict, Optional
 
 from engine.state import GameState
+from telemetry import metrics
 
 LOG = logging.getLogger(__name__)
 
 
+def with_stub_fallback(mutator):
+	"""Wrap an LLM mutator so shed or degraded LLM calls fall back to the stub.
+
+	Only `llm.tools.LLMUnavailable` triggers the fallback; other client
+	errors still propagate so misconfiguration is visible.
+	"""
+	from game.mutate_stub import generate_patch as stub_gen
+	from llm.tools import LLMUnavailable
+
+	def generate(intent: Any, state: GameState, level_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+		try:
+			return mutator(intent, state, level_context)
+		except LLMUnavailable as exc:
+			LOG.warning("LLM mutator unavailable (%s); using stub mutator", exc)
+			metrics.incr("mutate.degraded")
+			return stub_gen(intent, state, level_context)
+
+	return generate
+
+
 def get_mutator(mutator_type: str = "llm"):
 	"""Return the appropriate patch generator function based on type.
 
@@ -29,7 +50,7 @@ def get_mutator(mutator_type: str = "llm"):
 	elif mutator_type == "llm":
 		from llm.mutate import generate_patch as llm_gen
 		LOG.info("Using LLM mutator")
-		return llm_gen
+		return with_stub_fallback(llm_gen)
 	else:
 		raise ValueError(f"Unknown mutator_type: {mutator_type}")
 
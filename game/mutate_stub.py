@@ -29,8 +29,7 @@ def generate_patch(intent: Any, state: GameState, level_context: Optional[Dict[s
 	if itype in (IntentType.SHOW_CONFIG, IntentType.READ_EMAIL):
 		return {}
 
-	# SET_CLOCK: expect 'offset_hours' param; update strict.clock.time and append
-	# a player_changed_clock event to strict.events to record the change.
+	# SET_CLOCK: expect 'offset_hours' param; update strict.clock.time.
 	if itype is IntentType.SET_CLOCK:
 		offset = intent.params.get('offset_hours')
 		if offset is None:
@@ -46,20 +45,9 @@ def generate_patch(intent: Any, state: GameState, level_context: Optional[Dict[s
 		new_h = (hh + int(offset)) % 24
 		new_time = f"{new_h:02d}:{mm:02d}"
 
-		# Build events patch by preserving existing events and appending
-		existing_events = []
-		for e in state.strict.events:
-			if e.type == "player_changed_clock":
-				existing_events.append({'type': 'player_changed_clock', 'changed_at': e.changed_at})
-			elif e.type == "player_sent_email":
-				existing_events.append({'type': 'player_sent_email', 'recipient': e.recipient, 'sent_at': e.sent_at})
+		return {'strict': {'clock': {'time': new_time}}}
 
-		clock_event = {'type': 'player_changed_clock', 'changed_at': new_time}
-		events_patch = existing_events + [clock_event]
-
-		return {'strict': {'clock': {'time': new_time}, 'events': events_patch}}
-
-	# SEND_EMAIL: update vibe.emails (append) and record a strict player_sent_email event
+	# SEND_EMAIL: append to vibe.emails and record the sent email in strict.emails
 	if itype is IntentType.SEND_EMAIL:
 		recipient = intent.params.get('recipient', '')
 		body = intent.params.get('body', '')
@@ -71,18 +59,11 @@ def generate_patch(intent: Any, state: GameState, level_context: Optional[Dict[s
 		new_vibe_email = {'recipient': recipient, 'body': body, 'sent_at': sent_at}
 		vibe_patch = {'emails': existing_vibe + [new_vibe_email]}
 
-		# Strict events: append a player_sent_email event
-		existing_events = []
-		for e in state.strict.events:
-			if e.type == "player_changed_clock":
-				existing_events.append({'type': 'player_changed_clock', 'changed_at': e.changed_at})
-			elif e.type == "player_sent_email":
-				existing_events.append({'type': 'player_sent_email', 'recipient': e.recipient, 'sent_at': e.sent_at})
-
-		email_event = {'type': 'player_sent_email', 'recipient': recipient, 'sent_at': sent_at}
-		events_patch = existing_events + [email_event]
+		# Strict emails: preserve existing entries and append the new one
+		existing_emails = [{'recipient': e.recipient, 'sent_at': e.sent_at} for e in state.strict.emails]
+		emails_patch = existing_emails + [{'recipient': recipient, 'sent_at': sent_at}]
 
-		return {'vibe': vibe_patch, 'strict': {'events': events_patch}}
+		return {'vibe': vibe_patch, 'strict': {'emails': emails_patch}}
 
 	# Unknown or unhandled intents produce no patch
 	return {}
@@ -1,5 +1,6 @@
+import logging
 from dataclasses import dataclass
-from typing import Literal
+from typing import Literal, Optional
 
 @dataclass
 class NarrationResult:
@@ -7,19 +8,63 @@ class NarrationResult:
 	source: Literal["rules", "llm"]
 
 from llm.narrate import NarrationInput, generate_narration
+from llm.tools import LLMUnavailable
+from telemetry import metrics
 
-def narrate(outcome) -> NarrationResult:
-    """Narrator: rules for unknown command, LLM for all else."""
-    # Rule 1: Unknown command
-    if outcome.intent_type == "UNKNOWN":
-        return NarrationResult(text="command not found", source="rules")
+LOG = logging.getLogger(__name__)
 
-    # For all other cases, invoke the LLM narrator
-    input_obj = NarrationInput(
+def narration_input(outcome) -> Optional[NarrationInput]:
+    """Return the narrator LLM input for an outcome, or None if rules handle it.
+
+    Two outcomes with equal narration inputs narrate identically, which is
+    what the turn scheduler relies on to reuse speculative narrations.
+    """
+    if outcome.intent_type == "UNKNOWN":
+        return None
+    return NarrationInput(
         intent_type=outcome.intent_type,
         success=outcome.success,
         errors=[],
         patch=getattr(outcome, "patch", None) if outcome.success else None,
     )
-    narration = generate_narration(input_obj)
-    return NarrationResult(text=narration, source="llm")
\ No newline at end of file
+
+
+def rule_narration(outcome) -> str:
+    """Deterministic terminal text for an outcome, used when the LLM is unavailable."""
+    patch = getattr(outcome, "patch", None) or {}
+    strict = patch.get("strict") if isinstance(patch.get("strict"), dict) else {}
+    if outcome.intent_type == "UNKNOWN":
+        return "command not found"
+    if outcome.intent_type == "SHOW_CONFIG":
+        return "config: no pending changes"
+    if outcome.intent_type == "READ_EMAIL":
+        return "inbox: no new messages"
+    if not outcome.success:
+        errors = getattr(outcome, "errors", None) or []
+        return "\n".join([f"{outcome.intent_type.lower()}: operation failed"] + [f"error: {e}" for e in errors])
+    if outcome.intent_type == "SET_CLOCK" and isinstance(strict.get("clock"), dict):
+        return f"clock: time set to {strict['clock'].get('time', '??:??')}"
+    if outcome.intent_type == "SEND_EMAIL" and strict.get("emails"):
+        last = strict["emails"][-1]
+        if isinstance(last, dict):
+            return f"mail: message sent to {last.get('recipient', 'unknown')}"
+    return f"{outcome.intent_type.lower()}: ok"
+
+
+def narrate(outcome) -> NarrationResult:
+    """Narrator: rules for unknown command, LLM for all else."""
+    input_obj = narration_input(outcome)
+
+    # Rule 1: Unknown command
+    if input_obj is None:
+        return NarrationResult(text="command not found", source="rules")
+
+    # For all other cases, invoke the LLM narrator, degrading to rules
+    # when it is overloaded or otherwise unavailable.
+    try:
+        narration = generate_narration(input_obj)
+    except LLMUnavailable as exc:
+        LOG.warning("Narrator unavailable (%s); using rule-based narration", exc)
+        metrics.incr("narrate.degraded")
+        return NarrationResult(text=rule_narration(outcome), source="rules")
+    return NarrationResult(text=narration, source="llm")
@@ -0,0 +1,427 @@
+"""Disk-backed session store for many more sessions than fit in memory.
+
+`SessionStore` keeps the most recently used `capacity` states in memory
+and pages the rest to disk:
+
+  - `segment.dat` is an append-only log of snapshot records
+    (`<u32 key length><u32 payload length><key><JSON state>`); writing a
+    session again appends a new record and supersedes the old one, and
+    deleting it appends a tombstone (a record with an empty payload),
+  - `index.dat` is a memory-mapped open-addressing hash table of
+    (64-bit key hash, record offset) slots with linear probing, so
+    finding a session's latest record is O(1) without loading any
+    index into Python objects.
+
+Records are sliced straight out of a memory map of the segment, so a
+cold load costs a page-in plus JSON decoding, with no seek/read calls
+or file buffering.
+
+`compact()` rewrites the segment with only the live records and
+reclaims superseded ones and tombstones; it runs automatically when more than
+`compact_ratio` of the segment is garbage.
+
+States are written when they fall out of the LRU (or on `flush`), so
+`put` costs no I/O. A record is flushed to the segment file before the
+index slot pointing at it is published. The index header records the
+segment length and a clean flag, cleared by the first change after a
+flush and set again by `flush`/`close`. If `index.dat` is missing,
+unclean (the process died without flushing) or disagrees with the
+segment's length, it is rebuilt by scanning the segment, the last record
+of a key winning (a tombstone deletes it); a torn tail record is cut off.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from engine.state import GameState, state_from_json
+from telemetry import metrics
+
+LOG = logging.getLogger(__name__)
+
+SEGMENT = "segment.dat"
+INDEX = "index.dat"
+DEFAULT_CAPACITY = 1024
+DEFAULT_COMPACT_RATIO = 0.5
+INITIAL_SLOTS = 1 << 12
+MAX_LOAD = 0.5
+
+_RECORD = struct.Struct("<II")
+_SLOT = struct.Struct("<QQ")
+_HEADER = struct.Struct("<8sQQQQQ")  # magic, slots, live keys, garbage bytes, segment bytes, clean
+_MAGIC = b"SPRWIDX2"
+_EMPTY = 0
+_DELETED = (1 << 64) - 1
+
+
+def _key_hash(key: bytes) -> int:
+	value = int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+	return value or 1
+
+
+def _encode(state: GameState) -> bytes:
+	return json.dumps(asdict(state), separators=(",", ":")).encode()
+
+
+class _Index:
+	"""Memory-mapped hash table from key hash to record offset (+1, so 0 means empty)."""
+
+	def __init__(self, path: Path, slots: int = INITIAL_SLOTS):
+		self.path = path
+		if not path.exists() or path.stat().st_size < _HEADER.size:
+			self._create(path, slots)
+		self._fh = open(path, "r+b")
+		self._map = mmap.mmap(self._fh.fileno(), 0)
+		magic, self.slots, self.count, self.garbage, self.segment_bytes, self.clean = _HEADER.unpack_from(self._map, 0)
+		if magic != _MAGIC:
+			self._map.close()
+			self._fh.close()
+			raise RuntimeError(f"{path} is not a session index")
+
+	@staticmethod
+	def _create(path: Path, slots: int, segment_bytes: int = 0) -> None:
+		with open(path, "wb") as fh:
+			fh.write(_HEADER.pack(_MAGIC, slots, 0, 0, segment_bytes, 1))
+			fh.truncate(_HEADER.size + slots * _SLOT.size)
+
+	def _slot(self, i: int) -> Tuple[int, int]:
+		return _SLOT.unpack_from(self._map, _HEADER.size + i * _SLOT.size)
+
+	def _set(self, i: int, key_hash: int, offset: int) -> None:
+		_SLOT.pack_into(self._map, _HEADER.size + i * _SLOT.size, key_hash, offset)
+
+	def save_header(self) -> None:
+		_HEADER.pack_into(self._map, 0, _MAGIC, self.slots, self.count, self.garbage, self.segment_bytes, self.clean)
+
+	def mark_dirty(self) -> None:
+		"""Record that slots may change before the next clean `save_header`."""
+		if self.clean:
+			self.clean = 0
+			self.save_header()
+
+	def probe(self, key_hash: int) -> Iterator[Tuple[int, int, int]]:
+		"""Yield (slot, hash, offset+1) along the probe sequence up to the first empty slot."""
+		mask = self.slots - 1
+		i = key_hash & mask
+		for _ in range(self.slots):
+			h, off = self._slot(i)
+			yield i, h, off
+			if off == _EMPTY:
+				return
+			i = (i + 1) & mask
+
+	def items(self) -> Iterator[Tuple[int, int]]:
+		for i in range(self.slots):
+			h, off = self._slot(i)
+			if off not in (_EMPTY, _DELETED):
+				yield h, off - 1
+
+	def close(self) -> None:
+		self.save_header()
+		self._map.flush()
+		self._map.close()
+		self._fh.close()
+
+
+class SessionStore:
+	"""LRU of in-memory states over an on-disk snapshot segment.
+
+	Args:
+		directory: Where `segment.dat` and `index.dat` live.
+		capacity: States kept in memory; the least recently used are written out and dropped.
+		compact_ratio: Compact when superseded records exceed this share of the segment.
+	"""
+
+	def __init__(self, directory: Path, capacity: int = DEFAULT_CAPACITY, compact_ratio: float = DEFAULT_COMPACT_RATIO):
+		self.directory = Path(directory)
+		self.directory.mkdir(parents=True, exist_ok=True)
+		self.capacity = max(1, capacity)
+		self.compact_ratio = compact_ratio
+		self._lock = threading.RLock()
+		self._cache: "OrderedDict[str, GameState]" = OrderedDict()
+		self._dirty: set = set()
+		self._open()
+
+	# -- files -----------------------------------------------------------
+
+	def _open(self) -> None:
+		segment = self.directory / SEGMENT
+		segment.touch()
+		self._segment = open(segment, "a+b")
+		self._size = self._segment.seek(0, os.SEEK_END)
+		self._map: Optional[mmap.mmap] = None
+		path = self.directory / INDEX
+		reason = None if path.exists() else "missing"
+		try:
+			self._index = _Index(path)
+		except RuntimeError:
+			reason = "not a session index"
+		else:
+			if reason is None and not self._index.clean:
+				reason = "not cleanly closed"
+			elif reason is None and self._index.segment_bytes != self._size:
+				reason = f"covers {self._index.segment_bytes} segment bytes, found {self._size}"
+		if reason is not None:
+			self._rebuild_index(reason)
+
+	def _view(self, end: int) -> mmap.mmap:
+		"""A memory map of the segment covering at least `end` bytes."""
+		if self._map is None or len(self._map) < end:
+			if self._map is not None:
+				self._map.close()
+			self._segment.flush()
+			self._map = mmap.mmap(self._segment.fileno(), 0, access=mmap.ACCESS_READ)
+		return self._map
+
+	def _read(self, offset: int) -> Tuple[bytes, bytes, int]:
+		"""Return (key, payload, record size) of the record at `offset`."""
+		view = self._view(offset + _RECORD.size)
+		key_len, payload_len = _RECORD.unpack_from(view, offset)
+		start = offset + _RECORD.size
+		end = start + key_len + payload_len
+		view = self._view(end)
+		return view[start:start + key_len], view[start + key_len:end], end - offset
+
+	def _append(self, key: bytes, payload: bytes) -> int:
+		offset = self._size
+		self._segment.write(_RECORD.pack(len(key), len(payload)) + key + payload)
+		# The record must reach the file before an index slot points at it.
+		self._segment.flush()
+		self._size += _RECORD.size + len(key) + len(payload)
+		return offset
+
+	# -- index -----------------------------------------------------------
+
+	def _find(self, key: bytes) -> Tuple[Optional[int], Optional[int]]:
+		"""Return (slot, record offset) of `key`, or (first free slot, None)."""
+		key_hash = _key_hash(key)
+		free = None
+		for i, h, off in self._index.probe(key_hash):
+			if off == _EMPTY:
+				return (free if free is not None else i), None
+			if off == _DELETED:
+				if free is None:
+					free = i
+				continue
+			if h == key_hash and self._read(off - 1)[0] == key:
+				return i, off - 1
+		return free, None
+
+	def _index_put(self, key: bytes, offset: int) -> None:
+		if (self._index.count + 1) > self._index.slots * MAX_LOAD:
+			self._grow_index()
+		self._index.mark_dirty()
+		slot, old = self._find(key)
+		if old is not None:
+			self._index.garbage += self._read(old)[2]
+		else:
+			self._index.count += 1
+		self._index._set(slot, _key_hash(key), offset + 1)
+
+	def _index_delete(self, key: bytes, tombstone: int) -> bool:
+		"""Drop `key` from the index after its `tombstone`-byte record was appended."""
+		self._index.mark_dirty()
+		self._index.garbage += tombstone
+		slot, offset = self._find(key)
+		if offset is None:
+			return False
+		self._index.garbage += self._read(offset)[2]
+		self._index.count -= 1
+		self._index._set(slot, 0, _DELETED)
+		return True
+
+	def _grow_index(self) -> None:
+		entries = list(self._index.items())
+		self._index.close()
+		path = self.directory / INDEX
+		tmp = path.with_suffix(".tmp")
+		_Index._create(tmp, self._index.slots * 2)
+		new = _Index(tmp)
+		for key_hash, offset in entries:
+			for i, _, off in new.probe(key_hash):
+				if off == _EMPTY:
+					new._set(i, key_hash, offset + 1)
+					break
+		new.count, new.garbage = self._index.count, self._index.garbage
+		new.segment_bytes, new.clean = self._index.segment_bytes, self._index.clean
+		new.close()
+		os.replace(tmp, path)
+		self._index = _Index(path)
+
+	def _rebuild_index(self, reason: str) -> None:
+		"""Recreate the index by scanning the segment; later records supersede earlier ones."""
+		path = self.directory / INDEX
+		LOG.info("Rebuilding session index %s (%s)", path, reason)
+		if getattr(self, "_index", None) is not None:
+			self._index.close()
+		path.unlink(missing_ok=True)
+		self._index = _Index(path)
+		offset = 0
+		while offset + _RECORD.size <= self._size:
+			key, payload, size = self._read(offset)
+			if offset + size > self._size:
+				break  # torn tail record
+			if payload:
+				self._index_put(key, offset)
+			else:
+				self._index_delete(key, size)
+			offset += size
+		if offset < self._size:
+			LOG.warning("Dropping %d bytes of torn record at the end of %s", self._size - offset, self.directory / SEGMENT)
+			if self._map is not None:
+				self._map.close()
+				self._map = None
+			self._segment.truncate(offset)
+			self._size = offset
+		self._save_clean()
+		metrics.incr("sessions.index_rebuilds")
+
+	def _save_clean(self) -> None:
+		"""Persist the index header as consistent with the current segment."""
+		self._index.segment_bytes = self._size
+		self._index.clean = 1
+		self._index.save_header()
+		self._index._map.flush()
+
+	# -- public API ------------------------------------------------------
+
+	def __len__(self) -> int:
+		"""Number of distinct sessions (in memory or on disk)."""
+		with self._lock:
+			unwritten = sum(1 for s in self._dirty if self._find(s.encode())[1] is None)
+			return self._index.count + unwritten
+
+	def __contains__(self, session_id: str) -> bool:
+		with self._lock:
+			return session_id in self._cache or self._find(session_id.encode())[1] is not None
+
+	def put(self, session_id: str, state: GameState) -> None:
+		"""Store the latest state of a session (written to disk when evicted or flushed)."""
+		with self._lock:
+			self._cache[session_id] = state
+			self._cache.move_to_end(session_id)
+			self._dirty.add(session_id)
+			self._evict()
+
+	def get(self, session_id: str) -> Optional[GameState]:
+		"""Return a session's state, paging it in from disk if needed; None if unknown."""
+		with self._lock:
+			state = self._cache.get(session_id)
+			if state is not None:
+				self._cache.move_to_end(session_id)
+				metrics.incr("sessions.hits")
+				return state
+			_, offset = self._find(session_id.encode())
+			if offset is None:
+				return None
+			with metrics.timer("sessions.load"):
+				state = state_from_json(self._read(offset)[1])
+			metrics.incr("sessions.loads")
+			self._cache[session_id] = state
+			self._evict()
+			return state
+
+	def delete(self, session_id: str) -> bool:
+		with self._lock:
+			self._cache.pop(session_id, None)
+			self._dirty.discard(session_id)
+			key = session_id.encode()
+			if self._find(key)[1] is None:
+				return False
+			# A tombstone keeps the session deleted when the index is rebuilt.
+			offset = self._append(key, b"")
+			return self._index_delete(key, self._size - offset)
+
+	def _write(self, session_id: str, state: GameState) -> None:
+		key = session_id.encode()
+		self._index_put(key, self._append(key, _encode(state)))
+
+	def _evict(self) -> None:
+		while len(self._cache) > self.capacity:
+			session_id, state = self._cache.popitem(last=False)
+			if session_id in self._dirty:
+				self._dirty.discard(session_id)
+				self._write(session_id, state)
+			metrics.incr("sessions.evictions")
+		self._maybe_compact()
+
+	def flush(self) -> None:
+		"""Write every dirty in-memory session to disk."""
+		with self._lock:
+			for session_id in list(self._dirty):
+				self._write(session_id, self._cache[session_id])
+			self._dirty.clear()
+			self._segment.flush()
+			self._save_clean()
+
+	def stats(self) -> Dict[str, int]:
+		with self._lock:
+			return {
+				"in_memory": len(self._cache),
+				"dirty": len(self._dirty),
+				"on_disk": self._index.count,
+				"segment_bytes": self._size,
+				"garbage_bytes": self._index.garbage,
+				"index_bytes": _HEADER.size + self._index.slots * _SLOT.size,
+			}
+
+	def _maybe_compact(self) -> None:
+		if self._size and self._index.garbage > self._size * self.compact_ratio:
+			self.compact()
+
+	def compact(self) -> int:
+		"""Rewrite the segment with only live records; returns the bytes reclaimed."""
+		with self._lock, metrics.timer("sessions.compact"):
+			before = self._size
+			path = self.directory / SEGMENT
+			tmp = path.with_suffix(".tmp")
+			live = sorted(offset for _, offset in self._index.items())
+			with open(tmp, "wb") as out:
+				for offset in live:
+					key, payload, _ = self._read(offset)
+					out.write(_RECORD.pack(len(key), len(payload)))
+					out.write(key)
+					out.write(payload)
+				out.flush()
+				os.fsync(out.fileno())
+			self._close_files()
+			os.replace(tmp, path)
+			(self.directory / INDEX).unlink()
+			self._index = None
+			self._open()  # rebuilds the index from the compacted segment
+			reclaimed = before - self._size
+			metrics.incr("sessions.compactions")
+			LOG.debug("Compacted session segment: %d -> %d bytes", before, self._size)
+			return reclaimed
+
+	def _close_files(self) -> None:
+		if self._map is not None:
+			self._map.close()
+			self._map = None
+		self._segment.close()
+		self._index.close()
+
+	def close(self) -> None:
+		"""Flush and close the files; the store cannot be used afterwards."""
+		with self._lock:
+			self.flush()
+			self._close_files()
+
+	def __enter__(self) -> "SessionStore":
+		return self
+
+	def __exit__(self, *exc) -> None:
+		self.close()
+
+
+__all__ = ["SessionStore"]
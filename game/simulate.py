@@ -0,0 +1,227 @@
+"""Headless batch simulation of scripted playthroughs.
+
+Runs command scripts through the same turn pipeline as `game.loop.main`
+(parse_intent -> TurnScheduler -> win check) without `input()` or
+printing, so levels can be validated in bulk:
+
+    python -m game.simulate scripts/*.txt --workers 4
+    python -m game.simulate --generate 1000 --length 6 --seed 1 --workers 8
+
+Script files hold one command per line (`#` starts a comment) or, for
+`.json`, a list of commands or `{"name": ..., "commands": [...]}`.
+Playthroughs are spread over a process pool; the report lists each
+script's outcome, the win rate and throughput in turns/sec.
+
+Mutators are selected by name ("stub", "llm") or by a
+"package.module:function" path to any mutator callable.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import logging
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+from engine.state import create_initial_state
+from game.commands import parse_intent
+from game.narrate import NarrationResult, narrate, rule_narration
+
+LOG = logging.getLogger(__name__)
+
+# Vocabulary for generated scripts; covers every intent type.
+GENERATED_COMMANDS = [
+	"show config",
+	"read email",
+	"open inbox",
+	"set clock +{n}",
+	"set clock -{n}",
+	"send email to ops@corp: status report",
+	"send email to admin@example.com: please advise",
+	"dance wildly",
+]
+
+
+@dataclass
+class Playthrough:
+	name: str
+	commands: List[str]
+
+
+@dataclass
+class PlaythroughResult:
+	name: str
+	won: bool
+	turns: int
+	won_at_turn: Optional[int] = None
+	rejected_patches: int = 0
+	duration: float = 0.0
+	error: Optional[str] = None
+
+
+@dataclass
+class BatchReport:
+	results: List[PlaythroughResult] = field(default_factory=list)
+	wall_time: float = 0.0
+
+	@property
+	def total_turns(self) -> int:
+		return sum(r.turns for r in self.results)
+
+	@property
+	def win_rate(self) -> float:
+		return sum(1 for r in self.results if r.won) / len(self.results) if self.results else 0.0
+
+	@property
+	def turns_per_sec(self) -> float:
+		return self.total_turns / self.wall_time if self.wall_time > 0 else 0.0
+
+	def to_dict(self) -> dict:
+		return {
+			"playthroughs": len(self.results),
+			"win_rate": self.win_rate,
+			"total_turns": self.total_turns,
+			"wall_time": self.wall_time,
+			"turns_per_sec": self.turns_per_sec,
+			"errors": sum(1 for r in self.results if r.error),
+			"results": [asdict(r) for r in self.results],
+		}
+
+
+def load_scripts(paths: Iterable[Path]) -> List[Playthrough]:
+	"""Load playthrough scripts from text or JSON files."""
+	scripts = []
+	for path in map(Path, paths):
+		if path.suffix == ".json":
+			data = json.loads(path.read_text())
+			if isinstance(data, dict):
+				scripts.append(Playthrough(data.get("name", path.stem), list(data["commands"])))
+			else:
+				scripts.append(Playthrough(path.stem, list(data)))
+		else:
+			lines = [line.strip() for line in path.read_text().splitlines()]
+			scripts.append(Playthrough(path.stem, [line for line in lines if line and not line.startswith("#")]))
+	return scripts
+
+
+def generate_scripts(count: int, length: int = 6, seed: Optional[int] = None) -> List[Playthrough]:
+	"""Generate `count` random playthroughs of `length` commands."""
+	rng = random.Random(seed)
+	scripts = []
+	for i in range(count):
+		commands = [rng.choice(GENERATED_COMMANDS).format(n=rng.randint(1, 12)) for _ in range(length)]
+		scripts.append(Playthrough(f"generated-{i:05d}", commands))
+	return scripts
+
+
+def resolve_mutator(mutator: str) -> Callable[..., dict]:
+	"""Return a mutator by name ("stub", "llm") or "module:function" path."""
+	if ":" in mutator:
+		module_name, func_name = mutator.split(":", 1)
+		return getattr(importlib.import_module(module_name), func_name)
+	from game.mutate import get_mutator
+	return get_mutator(mutator)
+
+
+def _narrator(kind: str) -> Callable:
+	if kind == "none":
+		return lambda outcome: NarrationResult(text="", source="rules")
+	if kind == "rules":
+		return lambda outcome: NarrationResult(text=rule_narration(outcome), source="rules")
+	if kind == "llm":
+		return narrate
+	raise ValueError(f"Unknown narrator: {kind}")
+
+
+def play(playthrough: Playthrough, mutator: str = "stub", narrator: str = "none", stop_on_win: bool = True) -> PlaythroughResult:
+	"""Play one script headlessly and report its outcome."""
+	from game.loop import check_win_condition
+	from game.turn import TurnScheduler
+
+	result = PlaythroughResult(name=playthrough.name, won=False, turns=0)
+	start = time.perf_counter()
+	state = create_initial_state()
+	try:
+		with TurnScheduler(resolve_mutator(mutator), narrator=_narrator(narrator), speculate=narrator == "llm", session_id=playthrough.name) as scheduler:
+			for command in playthrough.commands:
+				turn = scheduler.run(parse_intent(command), state)
+				state = turn.state
+				result.turns += 1
+				if turn.result is not None and not turn.result.success:
+					result.rejected_patches += 1
+				if check_win_condition(state):
+					result.won = True
+					result.won_at_turn = result.won_at_turn or result.turns
+					if stop_on_win:
+						break
+	except Exception as exc:
+		LOG.debug("Playthrough %s failed", playthrough.name, exc_info=True)
+		result.error = f"{type(exc).__name__}: {exc}"
+	result.duration = time.perf_counter() - start
+	return result
+
+
+def _play_args(args: tuple) -> PlaythroughResult:
+	return play(*args)
+
+
+def run_batch(playthroughs: List[Playthrough], mutator: str = "stub", narrator: str = "none", workers: int = 1, stop_on_win: bool = True) -> BatchReport:
+	"""Play all scripts, in a process pool when `workers` > 1."""
+	jobs = [(p, mutator, narrator, stop_on_win) for p in playthroughs]
+	start = time.perf_counter()
+	if workers <= 1:
+		results = [_play_args(job) for job in jobs]
+	else:
+		chunksize = max(1, len(jobs) // (workers * 4))
+		with ProcessPoolExecutor(max_workers=workers) as pool:
+			results = list(pool.map(_play_args, jobs, chunksize=chunksize))
+	return BatchReport(results=results, wall_time=time.perf_counter() - start)
+
+
+def print_report(report: BatchReport, limit: int = 20) -> None:
+	print("\nSimulation Summary")
+	print("------------------")
+	for r in report.results[:limit]:
+		status = "ERROR " + r.error if r.error else ("won at turn %d" % r.won_at_turn if r.won else "not won")
+		print(f"{r.name}: {status} ({r.turns} turns, {r.rejected_patches} rejected, {r.duration * 1000:.1f}ms)")
+	if len(report.results) > limit:
+		print(f"... {len(report.results) - limit} more")
+	summary = report.to_dict()
+	print(f"Playthroughs: {summary['playthroughs']}")
+	print(f"Win rate: {report.win_rate * 100:.1f}%")
+	print(f"Errors: {summary['errors']}")
+	print(f"Turns: {report.total_turns} in {report.wall_time:.2f}s ({report.turns_per_sec:.1f} turns/sec)")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+	p = argparse.ArgumentParser(description="Headless batch playthrough simulator")
+	p.add_argument("scripts", nargs="*", type=Path, help="command script files (.txt or .json)")
+	p.add_argument("--generate", type=int, default=0, help="number of random scripts to generate")
+	p.add_argument("--length", type=int, default=6, help="commands per generated script")
+	p.add_argument("--seed", type=int, default=None)
+	p.add_argument("--mutator", default="stub", help='"stub", "llm" or "module:function"')
+	p.add_argument("--narrator", choices=["none", "rules", "llm"], default="none")
+	p.add_argument("--workers", type=int, default=1)
+	p.add_argument("--play-all", action="store_true", help="keep playing after the win condition is met")
+	p.add_argument("--json", type=Path, default=None, help="write the full report as JSON")
+	args = p.parse_args(argv)
+
+	playthroughs = load_scripts(args.scripts) + generate_scripts(args.generate, args.length, args.seed)
+	if not playthroughs:
+		p.error("no scripts given; pass script files or --generate N")
+
+	report = run_batch(playthroughs, args.mutator, args.narrator, args.workers, stop_on_win=not args.play_all)
+	print_report(report)
+	if args.json:
+		args.json.write_text(json.dumps(report.to_dict(), indent=2))
+		print(f"Report written to {args.json}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,271 @@
+"""Compressed, columnar transcripts of played turns.
+
+`TranscriptWriter` buffers one record per turn (raw input, intent,
+patch, patch result, narration, stage timings) and writes them in
+blocks of `batch_size` rows. Within a block every column is stored and
+compressed on its own:
+
+  - numeric columns as packed machine arrays (`f64`, `i64`, `bool`),
+  - string columns as a dictionary of distinct values plus packed codes
+    (`dict`), which suits intent types and narration sources,
+  - anything else as a JSON array (`json`),
+
+each compressed with zlib. A file is a magic line followed by blocks:
+
+    <u32 header length><JSON header><column blob>...
+
+where the header gives the row count and, per column, its encoding and
+compressed length. `TranscriptReader` streams blocks back one at a time
+and only decompresses the columns asked for, skipping the rest, so an
+offline job scanning millions of turns for two columns touches little
+more than those columns. A torn last block (a crash mid-write) is
+ignored by the reader, and cut off by the writer when it reopens the
+file, so blocks appended after a crash stay readable.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import struct
+import threading
+import time
+import zlib
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+LOG = logging.getLogger(__name__)
+
+MAGIC = b"SPRWTRN1\n"
+DEFAULT_BATCH_SIZE = 256
+COMPRESS_LEVEL = 6
+
+_LEN = struct.Struct("<I")
+
+# Column name -> encoding. Columns not listed are stored as JSON.
+COLUMNS: Dict[str, str] = {
+	"session": "dict",
+	"turn": "i64",
+	"ts": "f64",
+	"raw_input": "dict",
+	"intent_type": "dict",
+	"intent_params": "json",
+	"confidence": "f64",
+	"patch": "json",
+	"success": "bool",
+	"errors": "json",
+	"warnings": "json",
+	"narration": "dict",
+	"narration_source": "dict",
+	"mutate_s": "f64",
+	"apply_patch_s": "f64",
+	"narrate_s": "f64",
+	"turn_s": "f64",
+}
+
+
+def turn_record(turn: Any, raw_input: str, session: str = "default", turn_number: int = 0, turn_seconds: Optional[float] = None) -> Dict[str, Any]:
+	"""Flatten a `game.turn.TurnResult` into a transcript record."""
+	result = turn.result
+	timings = getattr(turn, "timings", {}) or {}
+	return {
+		"session": session,
+		"turn": turn_number,
+		"ts": time.time(),
+		"raw_input": raw_input,
+		"intent_type": turn.intent.type.name,
+		"intent_params": turn.intent.params,
+		"confidence": float(turn.intent.confidence),
+		"patch": turn.patch,
+		"success": turn.outcome.success,
+		"errors": turn.outcome.errors,
+		"warnings": list(result.warnings) if result is not None else [],
+		"narration": turn.narration.text,
+		"narration_source": turn.narration.source,
+		"mutate_s": timings.get("mutate", 0.0),
+		"apply_patch_s": timings.get("apply_patch", 0.0),
+		"narrate_s": timings.get("narrate", 0.0),
+		"turn_s": turn_seconds if turn_seconds is not None else sum(timings.values()),
+	}
+
+
+def _encode_column(values: List[Any], encoding: str) -> bytes:
+	if encoding == "f64":
+		raw = array("d", (float(v or 0.0) for v in values)).tobytes()
+	elif encoding == "i64":
+		raw = array("q", (int(v or 0) for v in values)).tobytes()
+	elif encoding == "bool":
+		raw = bytes(1 if v else 0 for v in values)
+	elif encoding == "dict":
+		lookup: Dict[str, int] = {}
+		codes = array("I", (lookup.setdefault("" if v is None else str(v), len(lookup)) for v in values))
+		table = json.dumps(list(lookup), separators=(",", ":")).encode()
+		raw = _LEN.pack(len(table)) + table + codes.tobytes()
+	else:
+		raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+	return zlib.compress(raw, COMPRESS_LEVEL)
+
+
+def _decode_column(blob: bytes, encoding: str) -> List[Any]:
+	raw = zlib.decompress(blob)
+	if encoding == "f64":
+		return array("d", raw).tolist()
+	if encoding == "i64":
+		return array("q", raw).tolist()
+	if encoding == "bool":
+		return [b == 1 for b in raw]
+	if encoding == "dict":
+		(size,) = _LEN.unpack_from(raw, 0)
+		table = json.loads(raw[_LEN.size:_LEN.size + size])
+		codes = array("I", raw[_LEN.size + size:])
+		return [table[c] for c in codes]
+	return json.loads(raw)
+
+
+def _complete_length(fh, size: int, path: Path) -> int:
+	"""Offset just past the last complete block of an open transcript file."""
+	fh.seek(0)
+	if fh.read(len(MAGIC)) != MAGIC:
+		raise RuntimeError(f"{path} is not a transcript")
+	end = fh.tell()
+	while True:
+		prefix = fh.read(_LEN.size)
+		if len(prefix) < _LEN.size:
+			return end
+		(length,) = _LEN.unpack(prefix)
+		raw = fh.read(length)
+		try:
+			header = json.loads(raw)
+			body = sum(n for _, n in header["columns"].values())
+		except (ValueError, KeyError, TypeError, AttributeError):
+			return end
+		if fh.tell() + body > size:
+			return end
+		end = fh.seek(body, 1)
+
+
+class TranscriptWriter:
+	"""Append turn records to a transcript file in compressed columnar blocks.
+
+	Args:
+		path: Transcript file; appended to if it exists.
+		batch_size: Rows buffered before a block is written.
+	"""
+
+	def __init__(self, path: Path, batch_size: int = DEFAULT_BATCH_SIZE):
+		self.path = Path(path)
+		self.batch_size = max(1, batch_size)
+		self._rows: List[Dict[str, Any]] = []
+		self._lock = threading.Lock()
+		self.path.parent.mkdir(parents=True, exist_ok=True)
+		new = not self.path.exists() or self.path.stat().st_size == 0
+		if not new:
+			self._truncate_torn_tail()
+		self._fh = open(self.path, "ab")
+		if new:
+			self._fh.write(MAGIC)
+
+	def _truncate_torn_tail(self) -> None:
+		"""Cut the file back to its last complete block."""
+		with open(self.path, "r+b") as fh:
+			size = fh.seek(0, 2)
+			end = _complete_length(fh, size, self.path)
+			if end < size:
+				LOG.warning("Truncating torn transcript block in %s (%d bytes)", self.path, size - end)
+				fh.truncate(end)
+
+	def append(self, record: Dict[str, Any]) -> None:
+		with self._lock:
+			self._rows.append(record)
+			if len(self._rows) >= self.batch_size:
+				self._write_block()
+
+	def flush(self) -> None:
+		with self._lock:
+			if self._rows:
+				self._write_block()
+			self._fh.flush()
+
+	def close(self) -> None:
+		self.flush()
+		with self._lock:
+			self._fh.close()
+
+	def __enter__(self) -> "TranscriptWriter":
+		return self
+
+	def __exit__(self, *exc) -> None:
+		self.close()
+
+	def _write_block(self) -> None:
+		rows, self._rows = self._rows, []
+		names = list(COLUMNS) + sorted({k for r in rows for k in r} - set(COLUMNS))
+		blobs = []
+		columns = {}
+		for name in names:
+			encoding = COLUMNS.get(name, "json")
+			blob = _encode_column([r.get(name) for r in rows], encoding)
+			blobs.append(blob)
+			columns[name] = [encoding, len(blob)]
+		header = json.dumps({"rows": len(rows), "columns": columns}, separators=(",", ":")).encode()
+		self._fh.write(_LEN.pack(len(header)) + header + b"".join(blobs))
+		self._fh.flush()
+
+
+class TranscriptReader:
+	"""Stream records or columns back from a transcript file."""
+
+	def __init__(self, path: Path):
+		self.path = Path(path)
+
+	def _blocks(self, columns: Optional[Sequence[str]]) -> Iterator[tuple[int, Dict[str, List[Any]]]]:
+		wanted = set(columns) if columns is not None else None
+		size_on_disk = self.path.stat().st_size
+		with open(self.path, "rb") as fh:
+			if fh.read(len(MAGIC)) != MAGIC:
+				raise RuntimeError(f"{self.path} is not a transcript")
+			while True:
+				prefix = fh.read(_LEN.size)
+				if len(prefix) < _LEN.size:
+					return
+				(size,) = _LEN.unpack(prefix)
+				raw = fh.read(size)
+				try:
+					header = json.loads(raw)
+				except ValueError:
+					header = None
+				if header is None or fh.tell() + sum(length for _, length in header["columns"].values()) > size_on_disk:
+					LOG.warning("Ignoring torn transcript block in %s", self.path)
+					return
+				block: Dict[str, List[Any]] = {}
+				for name, (encoding, length) in header["columns"].items():
+					if wanted is not None and name not in wanted:
+						fh.seek(length, 1)
+						continue
+					block[name] = _decode_column(fh.read(length), encoding)
+				rows = header["rows"]
+				for name in wanted or ():
+					block.setdefault(name, [None] * rows)
+				yield rows, block
+
+	def blocks(self, columns: Optional[Sequence[str]] = None) -> Iterator[Dict[str, List[Any]]]:
+		"""Yield one dict of column lists per block, decoding only `columns` (default: all)."""
+		return (block for _, block in self._blocks(columns))
+
+	def records(self, columns: Optional[Sequence[str]] = None) -> Iterator[Dict[str, Any]]:
+		"""Yield one dict per turn, with only `columns` if given."""
+		for _, block in self._blocks(columns):
+			names = list(block)
+			for values in zip(*(block[n] for n in names)):
+				yield dict(zip(names, values))
+
+	def __iter__(self) -> Iterator[Dict[str, Any]]:
+		return self.records()
+
+	def count(self) -> int:
+		"""Number of turns, reading only block headers."""
+		return sum(rows for rows, _ in self._blocks(()))
+
+
+__all__ = ["COLUMNS", "TranscriptReader", "TranscriptWriter", "turn_record"]
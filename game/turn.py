@@ -0,0 +1,239 @@
+"""Turn scheduler: overlaps mutator and narrator work within a turn.
+
+A turn runs intent -> mutator -> apply_patch -> narrate. Narration used to
+start only after the mutator finished, so a turn cost the sum of both LLM
+calls. The scheduler starts narration as soon as its input is known:
+
+- Intents without strict targets (SHOW_CONFIG, READ_EMAIL, UNKNOWN) are
+  narrated speculatively for the outcome of no patch, which is what the
+  stub mutator returns for them.
+- Patch-dependent intents are narrated speculatively for the outcome the
+  deterministic stub mutator predicts.
+
+Either way, if the real outcome narrates differently (for example the
+LLM mutator returned a vibe patch for SHOW_CONFIG that applied), the
+speculative narration is discarded and the real one is generated.
+
+Either way a turn's wall-clock latency approaches max(mutate, narrate)
+when the prediction holds.
+
+After a patch is applied the vibe state is bounded to `vibe_limits`
+(`engine.compact`), so per-turn prompt and copy costs stay flat over
+long sessions. With a `summarizer` the compacted entries are also
+summarized by a background job whose text is merged into the state's
+vibe summary as `narrative` at the start of a later turn.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Optional
+
+from engine.compact import Compaction, VibeLimits, compact_state
+from engine.patch import PatchResult, apply_patch
+from engine.state import GameState
+from game.commands import Intent
+from game.narrate import NarrationResult, narrate, narration_input
+from llm.resilience import deadline_scope
+from llm.scheduler import session_scope
+from llm.tools import LLMUnavailable
+from telemetry import metrics
+
+LOG = logging.getLogger(__name__)
+
+
+@dataclass
+class Outcome:
+	intent_type: str
+	intent_confidence: float
+	patch: dict | None
+	success: bool
+	errors: list[str]
+
+
+@dataclass
+class TurnResult:
+	"""Everything a single turn produced."""
+	intent: Intent
+	patch: Optional[dict]
+	result: Optional[PatchResult]
+	outcome: Outcome
+	narration: NarrationResult
+	state: GameState
+	timings: dict = field(default_factory=dict)  # seconds per stage: mutate, apply_patch, narrate
+
+
+def build_outcome(intent: Intent, patch: Optional[dict], result: Optional[PatchResult]) -> Outcome:
+	"""Summarize a mutator patch and its application for the narrator."""
+	return Outcome(
+		intent_type=intent.type.name,
+		intent_confidence=float(intent.confidence),
+		patch=patch if patch else None,
+		success=bool(result.success) if result else False,
+		errors=[f"{e.field}: {e.reason} (value={e.attempted_value})" for e in (result.strict_errors if result and result.strict_errors else [])]
+	)
+
+
+def predict_outcome(intent: Intent, state: GameState) -> Optional[Outcome]:
+	"""Predict the outcome of a patch-dependent intent using the stub mutator.
+
+	Returns None if no prediction can be made.
+	"""
+	from game.mutate_stub import generate_patch as stub_gen
+	try:
+		patch = stub_gen(intent, state)
+		result = apply_patch(state, patch) if patch else None
+	except Exception:
+		LOG.debug("Outcome prediction failed for %s", intent.type.name, exc_info=True)
+		return None
+	return build_outcome(intent, patch, result)
+
+
+class TurnScheduler:
+	"""Run turns with narration overlapped against the mutator.
+
+	Args:
+		mutator: Patch generator with signature (intent, state, level_context) -> dict.
+		narrator: Callable turning an Outcome into a NarrationResult.
+		speculate: Start narration for predicted outcomes of patch-dependent intents.
+		session_id: Session LLM calls are attributed to for fair scheduling.
+		turn_deadline: Optional budget in seconds shared by all LLM calls of a turn.
+		vibe_limits: Bounds for the vibe state; None disables compaction.
+		summarizer: Optional (summary, dropped) -> text job run in the background after compaction.
+	"""
+
+	def __init__(self, mutator: Callable[..., dict], narrator: Callable[[Outcome], NarrationResult] = narrate, speculate: bool = True, session_id: str = "default", turn_deadline: Optional[float] = None, vibe_limits: Optional[VibeLimits] = VibeLimits(), summarizer: Optional[Callable[[dict, dict], str]] = None):
+		self.mutator = mutator
+		self.narrator = narrator
+		self.speculate = speculate
+		self.session_id = session_id
+		self.turn_deadline = turn_deadline
+		self.vibe_limits = vibe_limits
+		self.summarizer = summarizer
+		self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="narrate")
+		self._background: Optional[ThreadPoolExecutor] = None
+		self._summary_job: Optional[Future] = None
+
+	def close(self) -> None:
+		self._executor.shutdown(wait=False, cancel_futures=True)
+		if self._background is not None:
+			self._background.shutdown(wait=False, cancel_futures=True)
+
+	def __enter__(self) -> "TurnScheduler":
+		return self
+
+	def __exit__(self, *exc: Any) -> None:
+		self.close()
+
+	def _narrate(self, outcome: Outcome) -> NarrationResult:
+		with metrics.timer("narrate"):
+			return self.narrator(outcome)
+
+	def _submit(self, outcome: Outcome) -> Future:
+		# Run in a copy of the caller's context so the session scope carries over.
+		ctx = contextvars.copy_context()
+		return self._executor.submit(ctx.run, self._narrate, outcome)
+
+	def _summarize(self, summary: dict, dropped: dict) -> Optional[str]:
+		try:
+			return self.summarizer(summary, dropped)
+		except LLMUnavailable:
+			metrics.incr("summarize.degraded")
+		except Exception:
+			LOG.warning("Vibe summarizer failed", exc_info=True)
+		return None
+
+	def _start_summary(self, compaction: Compaction) -> None:
+		"""Summarize compacted entries in the background (one job at a time)."""
+		if self.summarizer is None or (self._summary_job is not None and not self._summary_job.done()):
+			return
+		if self._background is None:
+			self._background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="summarize")
+		ctx = contextvars.copy_context()
+		self._summary_job = self._background.submit(ctx.run, self._summarize, dict(compaction.vibe.summary), compaction.dropped)
+
+	def _merge_summary(self, state: GameState) -> GameState:
+		"""Fold a finished background summary into the state's vibe summary."""
+		job = self._summary_job
+		if job is None or not job.done():
+			return state
+		self._summary_job = None
+		text = None if job.cancelled() else job.result()
+		if not text:
+			return state
+		summary = {**state.vibe.summary, "narrative": text}
+		return replace(state, vibe=replace(state.vibe, summary=summary))
+
+	def _start_narration(self, intent: Intent, state: GameState) -> tuple[Optional[Future], Optional[Outcome]]:
+		"""Start a speculative narration early if possible.
+
+		Returns (future, outcome narrated); the caller checks the outcome
+		against the real one before using the narration.
+		"""
+		if not intent.strict_targets:
+			# No strict mutation possible: most likely no patch applies.
+			outcome = build_outcome(intent, None, None)
+			return self._submit(outcome), outcome
+		if self.speculate:
+			predicted = predict_outcome(intent, state)
+			if predicted is not None:
+				return self._submit(predicted), predicted
+		return None, None
+
+	def run(self, intent: Intent, state: GameState, level_context: Optional[dict] = None) -> TurnResult:
+		"""Run one turn for `intent` against `state` and return its result."""
+		with session_scope(self.session_id), deadline_scope(self.turn_deadline):
+			return self._run(intent, state, level_context)
+
+	def _run(self, intent: Intent, state: GameState, level_context: Optional[dict]) -> TurnResult:
+		state = self._merge_summary(state)
+		future, early_outcome = self._start_narration(intent, state)
+
+		timings = {}
+		start = time.perf_counter()
+		with metrics.timer("mutate"):
+			patch = self.mutator(intent, state, level_context=level_context)
+		timings["mutate"] = time.perf_counter() - start
+
+		result = None
+		new_state = state
+		if patch:
+			start = time.perf_counter()
+			with metrics.timer("apply_patch"):
+				result = apply_patch(state, patch)
+			timings["apply_patch"] = time.perf_counter() - start
+			if result.success:
+				new_state = result.state
+				if self.vibe_limits is not None:
+					with metrics.timer("compact"):
+						new_state, compaction = compact_state(new_state, self.vibe_limits)
+					if compaction.compacted:
+						metrics.incr("vibe.compactions")
+						self._start_summary(compaction)
+			else:
+				metrics.incr("patch_rejected")
+		outcome = build_outcome(intent, patch, result)
+
+		start = time.perf_counter()
+		narration = None
+		if future is not None:
+			if narration_input(outcome) == narration_input(early_outcome):
+				with metrics.timer("narrate.wait"):
+					narration = future.result()
+				metrics.incr("speculation.hit")
+			else:
+				LOG.debug("Discarding speculative narration for %s", intent.type.name)
+				metrics.incr("speculation.miss")
+				future.cancel()
+		if narration is None:
+			narration = self._narrate(outcome)
+		timings["narrate"] = time.perf_counter() - start  # time the turn waited for narration
+
+		return TurnResult(intent=intent, patch=patch, result=result, outcome=outcome, narration=narration, state=new_state, timings=timings)
+
+
+__all__ = ["Outcome", "TurnResult", "TurnScheduler", "build_outcome", "predict_outcome"]
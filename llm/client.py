@@ -4,23 +4,125 @@ This targeted implementation mirrors `test_llama.py` usage: it builds a
 LangChain `ChatPromptTemplate` and `ChatOllama` model, invokes the
 chain, and returns the string output. It raises `RuntimeError` if the
 required packages are not installed or the invocation fails.
+
+Model configs with `transport: http` skip LangChain and call the Ollama
+REST API (`/api/chat`) at `base_url` directly with the standard library.
+That path honours per-call timeouts exactly and is what the local fake
+server in `llm.fake_server` speaks.
+
+A `format` entry in the model config (`"json"` or a JSON schema dict) is
+passed to Ollama's structured-output option on both paths, constraining
+decoding so the reply parses as JSON matching the schema.
+
+`keep_alive` (e.g. `"30m"`, or `-1` for forever) tells Ollama how long to
+keep the model loaded after the call, and `num_predict` caps the number
+of generated tokens; both are passed through on both paths.
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict
+import json
+import urllib.error
+import urllib.request
+from typing import Any, Dict, Iterator, Optional
+
+SYSTEM_PROMPT = "You are a helpful assistant."
+DEFAULT_BASE_URL = "http://localhost:11434"
+# Counters Ollama reports on its final response; durations are in nanoseconds.
+EVAL_STATS = ("total_duration", "load_duration", "prompt_eval_count", "prompt_eval_duration", "eval_count", "eval_duration")
+
+
+def _model_name(model_cfg: Dict[str, Any]) -> Optional[str]:
+    if isinstance(model_cfg, dict):
+        return model_cfg.get("model") or model_cfg.get("name")
+    return None
+
+
+def _chat_kwargs(model_cfg: Dict[str, Any], timeout: Optional[float]) -> Dict[str, Any]:
+    """Keyword arguments for LangChain's `ChatOllama`."""
+    kwargs: Dict[str, Any] = {}
+    model = _model_name(model_cfg)
+    if model:
+        kwargs["model"] = model
+    if timeout is not None:
+        kwargs["client_kwargs"] = {"timeout": timeout}
+    if isinstance(model_cfg, dict):
+        if model_cfg.get("format"):
+            kwargs["format"] = model_cfg["format"]
+        for key in ("keep_alive", "num_predict"):
+            if model_cfg.get(key) is not None:
+                kwargs[key] = model_cfg[key]
+    return kwargs
+
+
+def _chat_request(prompt: str, model_cfg: Dict[str, Any], stream: bool) -> urllib.request.Request:
+    """Build a request for Ollama's `/api/chat` endpoint."""
+    url = (model_cfg.get("base_url") or DEFAULT_BASE_URL).rstrip("/") + "/api/chat"
+    body: Dict[str, Any] = {
+        "model": _model_name(model_cfg),
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ],
+        "stream": stream,
+    }
+    options = {k: model_cfg[k] for k in ("temperature", "num_predict") if model_cfg.get(k) is not None}
+    if options:
+        body["options"] = options
+    if model_cfg.get("keep_alive") is not None:
+        body["keep_alive"] = model_cfg["keep_alive"]
+    if model_cfg.get("format"):
+        body["format"] = model_cfg["format"]
+    return urllib.request.Request(
+        url,
+        data=json.dumps(body).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
 
 
-def generate(prompt: str, model_cfg: Dict[str, Any]) -> str:
+def _generate_http(prompt: str, model_cfg: Dict[str, Any], timeout: Optional[float]) -> str:
+    """Call Ollama's `/api/chat` endpoint without streaming."""
+    try:
+        with urllib.request.urlopen(_chat_request(prompt, model_cfg, stream=False), timeout=timeout) as resp:
+            data = json.loads(resp.read())
+        return data["message"]["content"]
+    except (urllib.error.URLError, OSError, ValueError, KeyError) as exc:
+        raise RuntimeError("LLM invocation failed") from exc
+
+
+def _stream_http(prompt: str, model_cfg: Dict[str, Any], timeout: Optional[float], stats: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+    """Stream message chunks from Ollama's `/api/chat` (one JSON object per line)."""
+    try:
+        with urllib.request.urlopen(_chat_request(prompt, model_cfg, stream=True), timeout=timeout) as resp:
+            for line in resp:
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                chunk = (data.get("message") or {}).get("content")
+                if chunk:
+                    yield chunk
+                if data.get("done"):
+                    if stats is not None:
+                        stats.update({k: data[k] for k in EVAL_STATS if k in data})
+                    return
+    except (urllib.error.URLError, OSError, ValueError) as exc:
+        raise RuntimeError("LLM invocation failed") from exc
+
+
+def generate(prompt: str, model_cfg: Dict[str, Any], timeout: Optional[float] = None) -> str:
     """Invoke LangChain Ollama and return the string output.
 
     Args:
         prompt: The user-level prompt string to feed to the chain.
         model_cfg: Optional dict with keys like `model`.
+        timeout: Optional request timeout in seconds.
 
     Raises:
         RuntimeError: If langchain_ollama/langchain_core are missing or invocation fails.
     """
+    if isinstance(model_cfg, dict) and model_cfg.get("transport") == "http":
+        return _generate_http(prompt, model_cfg, timeout)
+
     try:
         from langchain_ollama import ChatOllama  # type: ignore
         from langchain_core.prompts import ChatPromptTemplate  # type: ignore
@@ -28,16 +130,12 @@ def generate(prompt: str, model_cfg: Dict[str, Any]) -> str:
     except Exception as exc:
         raise RuntimeError("langchain_ollama or langchain_core not available") from exc
 
-    model = None
-    if isinstance(model_cfg, dict):
-        model = model_cfg.get("model") or model_cfg.get("name")
-
     prompt_tpl = ChatPromptTemplate.from_messages([
-        ("system", "You are a helpful assistant."),
+        ("system", SYSTEM_PROMPT),
         ("user", "{input}"),
     ])
 
-    llm = ChatOllama(model=model) if model else ChatOllama()
+    llm = ChatOllama(**_chat_kwargs(model_cfg, timeout))
     chain = prompt_tpl | llm | StrOutputParser()
 
     try:
@@ -46,6 +144,39 @@ def generate(prompt: str, model_cfg: Dict[str, Any]) -> str:
         raise RuntimeError("LLM invocation failed") from exc
 
 
+def stream(prompt: str, model_cfg: Dict[str, Any], timeout: Optional[float] = None, stats: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+    """Like `generate`, but yield the output in chunks as the model produces them.
+
+    Ollama emits roughly one token per chunk. With `transport: http`, a
+    `stats` dict is filled with the server's final counters (`EVAL_STATS`:
+    token counts and durations in nanoseconds) once the stream ends.
+
+    Raises:
+        RuntimeError: If langchain_ollama/langchain_core are missing or invocation fails.
+    """
+    if isinstance(model_cfg, dict) and model_cfg.get("transport") == "http":
+        yield from _stream_http(prompt, model_cfg, timeout, stats)
+        return
+
+    try:
+        from langchain_ollama import ChatOllama  # type: ignore
+        from langchain_core.prompts import ChatPromptTemplate  # type: ignore
+        from langchain_core.output_parsers import StrOutputParser  # type: ignore
+    except Exception as exc:
+        raise RuntimeError("langchain_ollama or langchain_core not available") from exc
+
+    prompt_tpl = ChatPromptTemplate.from_messages([
+        ("system", SYSTEM_PROMPT),
+        ("user", "{input}"),
+    ])
+    chain = prompt_tpl | ChatOllama(**_chat_kwargs(model_cfg, timeout)) | StrOutputParser()
+
+    try:
+        yield from chain.stream({"input": prompt})
+    except Exception as exc:
+        raise RuntimeError("LLM invocation failed") from exc
+
+
 def call(prompt: str, model_cfg: Dict[str, Any]) -> str:
     return generate(prompt, model_cfg)
 
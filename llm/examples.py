@@ -0,0 +1,186 @@
+"""Few-shot example store for the mutator prompt.
+
+Examples are successful (intent, state, patch) triples kept in a JSON
+lines file, indexed by intent type. `select` returns only examples for
+the intent's own type, preferring those whose params have the same
+shape (same keys) and, among equals, the most recent, and stops once
+the rendered examples would exceed a token budget. A SET_CLOCK prompt
+therefore no longer pays for SEND_EMAIL examples.
+
+The store is seeded from the tracked `llm/prompts/mutate_examples.jsonl`
+(`SEED_PATH`), which is never written to. With `examples_record: true`
+in the mutator config, patches that pass `apply_patch` are appended as
+they are generated to `RECORDED_PATH`, an untracked file next to it that
+is loaded on top of the seeds; `import_bench_dump` adds the valid runs
+of a `scripts/bench_mutator.py --dump` file.
+
+Mutator config keys: `examples_file` (one file both read and appended
+to, instead of the two above; relative paths fall back to the
+repository root), `examples_k` (default 2) and `examples_budget`
+(approximate tokens, default 400).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from .tools import PROMPTS_DIR, resolve_path
+
+LOG = logging.getLogger(__name__)
+
+SEED_PATH = PROMPTS_DIR / "mutate_examples.jsonl"
+RECORDED_PATH = PROMPTS_DIR / "mutate_examples.recorded.jsonl"
+DEFAULT_K = 2
+DEFAULT_BUDGET = 400
+# Examples kept in memory per intent type; the newest win.
+MAX_PER_TYPE = 50
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return len(text) // 4 + 1
+
+
+def intent_type_name(intent: Any) -> str:
+    t = getattr(intent, "type", None)
+    return getattr(t, "name", str(t) if t is not None else "")
+
+
+def _params(intent: Any) -> Dict[str, Any]:
+    params = getattr(intent, "params", None)
+    return params if isinstance(params, dict) else {}
+
+
+def make_example(intent: Any, state: Any, patch: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a store entry; only the strict part of the state is kept."""
+    from llm.mutate import _serialize_state
+
+    return {
+        "intent_type": intent_type_name(intent),
+        "params": _params(intent),
+        "strict_targets": list(getattr(intent, "strict_targets", []) or []),
+        "state": _serialize_state(getattr(state, "strict", None)),
+        "output": patch,
+    }
+
+
+def render_example(example: Dict[str, Any]) -> str:
+    intent = {"type": example["intent_type"], "params": example.get("params", {})}
+    return "\n".join([
+        f"intent: {json.dumps(intent)}",
+        f"state: {json.dumps(example.get('state', {}))}",
+        f"strict_targets: {json.dumps(example.get('strict_targets', []))}",
+        f"output: {json.dumps(example['output'])}",
+    ])
+
+
+class ExampleStore:
+    """JSON-lines backed examples, indexed by intent type.
+
+    Args:
+        path: File loaded and appended to by `add` (None: memory only).
+        max_per_type: Examples kept per intent type; the newest win.
+        seeds: Read-only files loaded before `path`.
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_per_type: int = MAX_PER_TYPE, seeds: Sequence[Path] = ()):
+        self.path = Path(path) if path is not None else None
+        self.max_per_type = max_per_type
+        self._by_type: Dict[str, List[Dict[str, Any]]] = {}
+        self._seen: set = set()
+        self._lock = threading.Lock()
+        for source in [*seeds, self.path]:
+            if source is not None and Path(source).exists():
+                with Path(source).open() as fh:
+                    for line in fh:
+                        if line.strip():
+                            self._index(json.loads(line))
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._by_type.values())
+
+    def _index(self, example: Dict[str, Any]) -> bool:
+        key = json.dumps([example["intent_type"], example.get("params"), example["output"]], sort_keys=True)
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        entries = self._by_type.setdefault(example["intent_type"], [])
+        entries.append(example)
+        del entries[:-self.max_per_type]
+        return True
+
+    def add(self, intent: Any, state: Any, patch: Dict[str, Any]) -> bool:
+        """Store a successful patch; returns False for duplicates."""
+        example = make_example(intent, state, patch)
+        with self._lock:
+            if not self._index(example):
+                return False
+            if self.path is not None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with self.path.open("a") as fh:
+                    fh.write(json.dumps(example, separators=(",", ":")) + "\n")
+        return True
+
+    def select(self, intent: Any, k: int = DEFAULT_K, budget: int = DEFAULT_BUDGET) -> List[Dict[str, Any]]:
+        """Return up to `k` examples for the intent's type within `budget` tokens."""
+        shape = set(_params(intent))
+        with self._lock:
+            candidates = list(self._by_type.get(intent_type_name(intent), []))
+
+        def score(item):
+            index, example = item
+            keys = set(example.get("params") or {})
+            union = shape | keys
+            return (len(shape & keys) / len(union) if union else 1.0, index)
+
+        chosen: List[Dict[str, Any]] = []
+        used = 0
+        for _, example in sorted(enumerate(candidates), key=score, reverse=True):
+            if len(chosen) >= k:
+                break
+            cost = estimate_tokens(render_example(example))
+            if used + cost > budget:
+                continue
+            chosen.append(example)
+            used += cost
+        return chosen
+
+    def render(self, intent: Any, k: int = DEFAULT_K, budget: int = DEFAULT_BUDGET) -> str:
+        """Selected examples as prompt text ("" if none fit)."""
+        return "\n\n".join(render_example(e) for e in self.select(intent, k, budget))
+
+
+def import_bench_dump(dump: Path, intent: Any, store: "ExampleStore", state: Any = None) -> int:
+    """Add the valid, successfully applied runs of a bench dump; returns how many were new."""
+    added = 0
+    for run in json.loads(Path(dump).read_text()):
+        if run.get("raw_patch") and (run.get("apply_result") or {}).get("success") and not run.get("error"):
+            added += store.add(intent, state, run["raw_patch"])
+    return added
+
+
+_STORES: Dict[Path, ExampleStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_store(path: Optional[Path] = None) -> ExampleStore:
+    """Return the shared store for `path`.
+
+    The default store reads the seed examples and records to `RECORDED_PATH`.
+    """
+    path = resolve_path(path) if path is not None else None
+    with _STORES_LOCK:
+        store = _STORES.get(path)
+        if store is None:
+            store = _STORES[path] = ExampleStore(path) if path is not None else ExampleStore(RECORDED_PATH, seeds=(SEED_PATH,))
+        return store
+
+
+__all__ = [
+    "RECORDED_PATH", "SEED_PATH", "ExampleStore", "estimate_tokens", "get_store", "import_bench_dump",
+    "make_example", "render_example",
+]
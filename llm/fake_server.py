@@ -0,0 +1,179 @@
+"""Local fake Ollama server for latency and failure testing.
+
+Speaks enough of the Ollama REST API (`POST /api/chat`) for
+`llm.client` with `transport: http`, and lets tests or benchmarks inject
+delays and failures without a real model:
+
+    with FakeOllama(response='{"strict": {}, "vibe": {}}', delay=0.5) as server:
+        cfg = {"model": "fake", "transport": "http", "base_url": server.url}
+        call_llm(prompt, cfg)
+
+`delay` and `response` may be callables receiving the 1-based request
+number, e.g. `delay=lambda n: 2.0 if n == 1 else 0.0` stalls only the
+first request. Streaming requests get the response word by word, with
+`token_delay` seconds between chunks, and end with Ollama's
+`eval_count`/`eval_duration` counters (each chunk counts as a token and
+the first is charged one `token_delay` too). Run standalone with
+`python -m llm.fake_server`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Union
+
+LOG = logging.getLogger(__name__)
+
+Delay = Union[float, Callable[[int], float]]
+Response = Union[str, Callable[[int], str]]
+
+
+class FakeOllama:
+    """Threaded fake model server with injectable delay and failure rate.
+
+    Args:
+        response: Text returned as the assistant message.
+        delay: Seconds to wait before answering.
+        fail_every: If set, every Nth request answers HTTP 500.
+        token_delay: Seconds between chunks of a streamed response.
+        host: Interface to bind.
+        port: Port to bind; 0 picks a free one.
+    """
+
+    def __init__(self, response: Response = "{}", delay: Delay = 0.0, fail_every: Optional[int] = None, token_delay: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.response = response
+        self.delay = delay
+        self.fail_every = fail_every
+        self.token_delay = token_delay
+        self.requests: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _next(self, body: Dict[str, Any]) -> int:
+        with self._lock:
+            self.requests.append(body)
+            return len(self.requests)
+
+    def _resolve(self, value: Any, n: int) -> Any:
+        return value(n) if callable(value) else value
+
+    def _handler(self):
+        fake = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_POST(self):  # noqa: N802 - http.server naming
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self.send_error(400)
+                    return
+                n = fake._next(body)
+                time.sleep(fake._resolve(fake.delay, n))
+                if fake.fail_every and n % fake.fail_every == 0:
+                    self.send_error(500, "injected failure")
+                    return
+                if self.path != "/api/chat":
+                    self.send_error(404)
+                    return
+                content = fake._resolve(fake.response, n)
+                if body.get("stream"):
+                    self._send_stream(body.get("model"), content)
+                    return
+                payload = {
+                    "model": body.get("model"),
+                    "message": {"role": "assistant", "content": content},
+                    "done": True,
+                }
+                self._send_json(payload)
+
+            def _send_stream(self, model: Optional[str], content: str) -> None:
+                words = content.split(" ")
+                chunks = [w + " " for w in words[:-1]] + words[-1:]
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.end_headers()
+                    start = time.perf_counter()
+                    for i, chunk in enumerate(chunks):
+                        if i:
+                            time.sleep(fake.token_delay)
+                        line = {"model": model, "message": {"role": "assistant", "content": chunk}, "done": False}
+                        self.wfile.write((json.dumps(line) + "\n").encode("utf-8"))
+                        self.wfile.flush()
+                    eval_duration = time.perf_counter() - start + fake.token_delay
+                    done = {
+                        "model": model, "message": {"role": "assistant", "content": ""}, "done": True,
+                        "eval_count": len(chunks), "eval_duration": int(eval_duration * 1e9),
+                    }
+                    self.wfile.write((json.dumps(done) + "\n").encode("utf-8"))
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def _send_json(self, payload: Dict[str, Any]) -> None:
+                data = json.dumps(payload).encode("utf-8")
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client gave up (timeout or hedged duplicate won).
+                    pass
+
+            def log_message(self, fmt, *args):
+                LOG.debug("fake ollama: " + fmt, *args)
+
+        return _Handler
+
+    def start(self) -> "FakeOllama":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-ollama", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeOllama":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+def main():
+    p = argparse.ArgumentParser(description="Fake Ollama server with injected latency")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=11434)
+    p.add_argument("--delay", type=float, default=0.0, help="seconds to wait before each response")
+    p.add_argument("--fail-every", type=int, default=None, help="answer HTTP 500 to every Nth request")
+    p.add_argument("--token-delay", type=float, default=0.0, help="seconds between streamed chunks")
+    p.add_argument("--response", default='{"strict": {}, "vibe": {}}')
+    args = p.parse_args()
+
+    server = FakeOllama(response=args.response, delay=args.delay, fail_every=args.fail_every, token_delay=args.token_delay, host=args.host, port=args.port)
+    print(f"Fake Ollama listening on {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
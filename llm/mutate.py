@@ -12,10 +12,11 @@ The implementation is defensive: failures, invalid LLM output, timeouts
 or missing client implementations will return an empty patch (`{}`).
 Raw LLM outputs are logged at DEBUG level for troubleshooting.
 
-The module attempts to load the mutator model config from
-`config/models.dev.yaml` under the `mutator` key and a prompt template
-from `llm/prompts/mutate.yaml`. If those are missing, sensible
-fallbacks are used.
+The module loads the mutator model config from `config/models.dev.yaml`
+under the `mutator` key and a prompt template from
+`llm/prompts/mutate.txt` through `llm.registry` (both relative to the
+repository root), picking up edits to either file without a restart.
+If the config is missing, an empty config is used.
 """
 
 from __future__ import annotations
@@ -23,30 +24,66 @@ from __future__ import annotations
 import json
 import logging
 import re
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional
-
-from .tools import call_llm, load_model_config, load_prompt
+from typing import Any, Dict, Optional, Tuple
+
+from .examples import get_store
+from .registry import compile_template, get_registry
+from .routing import router_for
+from .serialize import state_json as _state_json, to_data
+from .tools import LLMUnavailable, call_llm
+from engine.patch import validate_patch
+from engine.repair import repair_patch
 from engine.state import strict_state_schema
+from telemetry import metrics
 
 LOG = logging.getLogger(__name__)
 
 
-# Initialize model config and prompt at import time so `generate_patch`
-# remains focused and deterministic during calls. Tests can override
-# these with `set_mutator`.
-MODEL_CFG: Dict[str, Any] = load_model_config()
-PROMPT_TPL: str = load_prompt("mutate")
+# The mutator's model config and prompt come from `llm.registry`
+# snapshots, so edits to the config file or `llm/prompts/mutate.txt` apply
+# without a restart and importing this module reads no files. `MODEL_CFG`
+# and `PROMPT_TPL` stay readable as module attributes (the current
+# snapshot's values). Assigning one pins it, which tests use;
+# `set_mutator` installs a registry override instead.
+_SNAPSHOT_ATTRS = {
+	"MODEL_CFG": lambda snap: snap.model("mutator"),
+	"PROMPT_TPL": lambda snap: snap.prompt("mutate").text,
+}
+
+
+def __getattr__(name: str) -> Any:
+	getter = _SNAPSHOT_ATTRS.get(name)
+	if getter is None:
+		raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+	return getter(get_registry().snapshot())
+
+
+def _config() -> Tuple[Dict[str, Any], Any]:
+	"""The model config and prompt template for one call, taken from one snapshot."""
+	g = globals()
+	snap = None if "MODEL_CFG" in g and "PROMPT_TPL" in g else get_registry().snapshot()
+	model_cfg = g["MODEL_CFG"] if "MODEL_CFG" in g else snap.model("mutator")
+	prompt_tpl = g["PROMPT_TPL"] if "PROMPT_TPL" in g else snap.prompt("mutate")
+	return model_cfg, prompt_tpl
+
+
+def _model_cfg() -> Dict[str, Any]:
+	return globals()["MODEL_CFG"] if "MODEL_CFG" in globals() else get_registry().snapshot().model("mutator")
 
 
 def set_mutator(model_cfg: Dict[str, Any], prompt_tpl: str) -> None:
 	"""Override the mutator configuration and prompt (useful for tests).
 
-	Both arguments may be empty-ish; function is defensive.
+	Both arguments may be empty-ish; an empty prompt keeps the current
+	one. The override is published as a new registry snapshot, so calls
+	already in flight finish with the config they started with.
 	"""
-	global MODEL_CFG, PROMPT_TPL
-	MODEL_CFG = model_cfg or {}
-	PROMPT_TPL = prompt_tpl or PROMPT_TPL
+	for name in _SNAPSHOT_ATTRS:
+		globals().pop(name, None)
+	get_registry().override("mutator", model_cfg or {}, "mutate" if prompt_tpl else None, prompt_tpl or None)
 
 
 def resolve_intent_placeholders(patch: Dict[str, Any], intent: Any) -> Dict[str, Any]:
@@ -119,35 +156,31 @@ def _extract_json(text: str) -> Optional[str]:
 	return None
 
 
+def _parse_llm_output(raw: Optional[str]) -> Any:
+	"""Parse raw LLM text as JSON, falling back to extracting an embedded object."""
+	try:
+		return json.loads(raw)
+	except Exception:
+		# try to extract JSON substring
+		jtxt = _extract_json(raw or "")
+		if jtxt:
+			try:
+				return json.loads(jtxt)
+			except Exception:
+				LOG.debug("Failed to parse extracted JSON", exc_info=True)
+	return None
+
+
 def _serialize_state(state: Any) -> Dict[str, Any]:
 	"""Return a deeply JSON-serializable representation of state.
 
-	Recursively converts nested objects to dicts to ensure JSON compatibility.
+	Dataclasses are walked by cached field plans, anything else by
+	reflection (see `llm.serialize.to_data`).
 	"""
-	def _to_dict(obj: Any) -> Any:
-		if obj is None or isinstance(obj, (str, int, float, bool)):
-			return obj
-		if isinstance(obj, dict):
-			return {k: _to_dict(v) for k, v in obj.items()}
-		if isinstance(obj, (list, tuple)):
-			return [_to_dict(item) for item in obj]
-		if hasattr(obj, "to_dict") and callable(obj.to_dict):
-			try:
-				return _to_dict(obj.to_dict())
-			except Exception:
-				pass
-		if hasattr(obj, "__dict__"):
-			try:
-				return {k: _to_dict(v) for k, v in vars(obj).items() if not k.startswith("_")}
-			except Exception:
-				pass
-		# Fallback for non-serializable objects
-		return str(obj)
-
 	try:
 		if state is None:
 			return {}
-		return _to_dict(state) or {}
+		return to_data(state) or {}
 	except Exception:
 		LOG.debug("Error serializing state", exc_info=True)
 	return {"repr": str(state)}
@@ -170,75 +203,231 @@ def _filter_strict_patch(patch: Dict[str, Any], intent: Any) -> Dict[str, Any]:
         patch["strict"] = {}
     return patch
 
-def generate_patch(intent: Any, state: Any, level_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-	"""Generate a patch dict from `intent` and `state` using an LLM.
 
-	This function is defensive about LLM output (malformed JSON etc.)
-	but it does NOT swallow client-configuration errors. If the LLM
-	client is not installed or misconfigured, callers will get an
-	exception so they can fix their environment.
+def _inline_refs(node: Any, definitions: Dict[str, Any]) -> Any:
+	"""Replace `#/definitions/...` references with the definitions themselves."""
+	if isinstance(node, list):
+		return [_inline_refs(v, definitions) for v in node]
+	if not isinstance(node, dict):
+		return node
+	ref = node.get("$ref")
+	if isinstance(ref, str) and ref.startswith("#/definitions/"):
+		return _inline_refs(definitions[ref.rsplit("/", 1)[1]], definitions)
+	out: Dict[str, Any] = {}
+	for k, v in node.items():
+		if k in ("description", "default"):
+			continue  # prose and defaults only cost grammar states
+		if k == "properties" and isinstance(v, dict):
+			out[k] = {name: _inline_refs(sub, definitions) for name, sub in v.items()}
+		else:
+			out[k] = _inline_refs(v, definitions)
+	return out
+
+
+@lru_cache(maxsize=None)
+def _patch_schema(strict_targets: tuple) -> Dict[str, Any]:
+	schema = strict_state_schema()
+	definitions = schema.get("definitions", {})
+	properties = schema.get("properties", {})
+	strict = {
+		"type": "object",
+		"properties": {k: _inline_refs(properties[k], definitions) for k in strict_targets if k in properties},
+		"additionalProperties": False,
+	}
+	return {
+		"type": "object",
+		"properties": {"strict": strict, "vibe": {"type": "object"}},
+		"required": ["strict", "vibe"],
+		"additionalProperties": False,
+	}
+
+
+def patch_schema(strict_targets: Any) -> Dict[str, Any]:
+	"""Return the JSON schema of a patch for an intent with `strict_targets`.
+
+	`strict` is `strict_state_schema()` restricted to the targets (with
+	references inlined, so grammar-based decoders can use it directly);
+	`vibe` is a free-form object. The result is cached and shared, so
+	callers must not modify it.
 	"""
-	level_context = level_context or {}
+	return _patch_schema(tuple(strict_targets or ()))
+
+
+def _example_store(model_cfg: Dict[str, Any]):
+	return get_store(model_cfg.get("examples_file"))
+
+
+def select_examples(intent: Any, model_cfg: Optional[Dict[str, Any]] = None) -> str:
+	"""Render the few-shot examples for `intent` (see `llm.examples`)."""
+	model_cfg = _model_cfg() if model_cfg is None else model_cfg
+	try:
+		store = _example_store(model_cfg)
+	except Exception:
+		LOG.debug("Failed to load example store", exc_info=True)
+		return ""
+	return store.render(intent, k=model_cfg.get("examples_k", 2), budget=model_cfg.get("examples_budget", 400))
+
+
+def record_example(intent: Any, state: Any, patch: Dict[str, Any], model_cfg: Optional[Dict[str, Any]] = None) -> None:
+	"""Add a validated patch to the example store when `examples_record` is set."""
+	model_cfg = _model_cfg() if model_cfg is None else model_cfg
+	if not model_cfg.get("examples_record"):
+		return
+	try:
+		if _example_store(model_cfg).add(intent, state, patch):
+			metrics.incr("mutate.examples_recorded")
+	except Exception:
+		LOG.debug("Failed to record example", exc_info=True)
+
+
+@lru_cache(maxsize=1)
+def _strict_schema_json() -> str:
+	"""The strict state schema as prompt text; the schema is fixed per process."""
+	return json.dumps(strict_state_schema(), indent=2)
+
+
+def build_prompt(intent: Any, state: Any, level_context: Optional[Dict[str, Any]] = None, prompt_tpl: Optional[Any] = None, examples: Optional[str] = None, model_cfg: Optional[Dict[str, Any]] = None) -> str:
+	"""Render the mutator prompt for `intent` and `state`.
 
-	# Use module-level config/prompt (can be overridden in tests)
-	model_cfg = MODEL_CFG
-	prompt_tpl = PROMPT_TPL
+	Uses the current mutator prompt unless `prompt_tpl` (a string or a
+	`llm.registry.Template`) is given, and the examples picked by
+	`select_examples` for `model_cfg` unless `examples` is given.
+	"""
+	level_context = level_context or {}
+	if prompt_tpl is None:
+		model_cfg, prompt_tpl = _config()
+	template = compile_template(prompt_tpl) if isinstance(prompt_tpl, str) else prompt_tpl
+	if examples is None:
+		examples = select_examples(intent, model_cfg) if "examples" in template.placeholders else ""
 
 	# Prepare minimal serializations
 	ser_intent = intent.to_dict() if hasattr(intent, "to_dict") else (intent if isinstance(intent, dict) else {"repr": str(intent)})
-	ser_state = _serialize_state(state)
 	strict_targets = getattr(intent, "strict_targets", [])
-	strict_schema = strict_state_schema()
 
-	# Substitute placeholders directly instead of using .format() to avoid 
-	# interpreting literal braces in the prompt template
+	# Placeholders are substituted by the precompiled template rather than
+	# .format(), so literal braces in the prompt are left alone.
 	intent_json = json.dumps(ser_intent)
-	state_json = json.dumps(ser_state)
+	try:
+		state_json = _state_json(state)
+	except Exception:
+		LOG.debug("Cached state serialization failed", exc_info=True)
+		state_json = json.dumps(_serialize_state(state))
 	context_json = json.dumps(level_context)
 	strict_targets_json = json.dumps(strict_targets)
-	strict_schema_json = json.dumps(strict_schema, indent=2)
+	strict_schema_json = _strict_schema_json()
 
 	# log intent before prompt
 	LOG.debug("Generating patch for intent: %s", intent_json)
-	prompt = prompt_tpl.replace("{intent}", intent_json)\
-		.replace("{state}", state_json)\
-		.replace("{level_context}", context_json)\
-		.replace("{strict_targets}", strict_targets_json)\
-		.replace("{strict_schema}", strict_schema_json)
+	return template.render(
+		intent=intent_json,
+		state=state_json,
+		level_context=context_json,
+		strict_targets=strict_targets_json,
+		strict_schema=strict_schema_json,
+		examples=examples,
+	)
+
+
+def _patch_from_llm(prompt: str, intent: Any, state: Any, model_cfg: Dict[str, Any]) -> Dict[str, Any]:
+	"""Call the model and turn its output into a filtered, repaired patch ({} if unparseable)."""
+	if model_cfg.get("structured"):
+		# Constrain decoding to the patch schema; the reply is then plain JSON.
+		model_cfg = {**model_cfg, "format": patch_schema(getattr(intent, "strict_targets", []))}
 
 	# Call the LLM (may raise if client not available)
-	raw = call_llm(prompt, model_cfg)
+	with metrics.timer("mutate.llm"):
+		raw = call_llm(prompt, model_cfg)
 
 	LOG.debug("Raw mutator LLM output: %s", raw)
 
-	# Parse JSON defensively
-	parsed = None
-	try:
-		parsed = json.loads(raw)
-	except Exception:
-		# try to extract JSON substring
-		jtxt = _extract_json(raw or "")
-		if jtxt:
-			try:
-				parsed = json.loads(jtxt)
-			except Exception:
-				LOG.debug("Failed to parse extracted JSON", exc_info=True)
+	with metrics.timer("mutate.extract"):
+		parsed = _parse_llm_output(raw)
 
 	if not isinstance(parsed, dict):
 		LOG.debug("Parsed LLM output is not an object/dict")
+		metrics.incr("mutate.parse_failures")
 		return {}
 
-	# Filter to allowed top-level keys and ensure values are dicts
-	patch: Dict[str, Any] = {}
-	for k in ("strict", "vibe"):
-		if k in parsed and isinstance(parsed[k], dict):
-			patch[k] = parsed[k]
+	with metrics.timer("mutate.filter"):
+		# Filter to allowed top-level keys and ensure values are dicts
+		patch: Dict[str, Any] = {}
+		for k in ("strict", "vibe"):
+			if k in parsed and isinstance(parsed[k], dict):
+				patch[k] = parsed[k]
+
+		# Resolve ${intent.<field>} placeholders before returning
+		patch = resolve_intent_placeholders(patch, intent)
 
-	# Resolve ${intent.<field>} placeholders before returning
-	patch = resolve_intent_placeholders(patch, intent)
+		# Filter strict patch to only allowed keys
+		patch = _filter_strict_patch(patch, intent)
 
-	# Filter strict patch to only allowed keys
-	patch = _filter_strict_patch(patch, intent)
+	# Fix trivially broken fields locally rather than spending another LLM call
+	with metrics.timer("mutate.repair"):
+		repaired = repair_patch(patch, state, intent)
+	if repaired.changes:
+		LOG.debug("Repaired patch: %s", "; ".join(repaired.changes))
+		metrics.incr("mutate.repairs")
+	return repaired.patch
 
+
+def _routed_patch(router: Any, prompt: str, intent: Any, state: Any) -> Dict[str, Any]:
+	"""Try models cheapest-first, escalating while patches fail `validate_patch`."""
+	intent_type = getattr(getattr(intent, "type", None), "name", str(getattr(intent, "type", "")))
+	plan = router.plan(intent_type)
+	patch: Dict[str, Any] = {}
+	for i, cfg in enumerate(plan):
+		last = i == len(plan) - 1
+		model = cfg.get("model") or ""
+		start = time.perf_counter()
+		try:
+			patch = _patch_from_llm(prompt, intent, state, cfg)
+		except LLMUnavailable:
+			router.record(intent_type, model, False, time.perf_counter() - start)
+			if last:
+				raise
+			metrics.incr("mutate.escalations")
+			continue
+		ok = bool(patch) and not validate_patch(patch)
+		router.record(intent_type, model, ok, time.perf_counter() - start)
+		metrics.incr(f"mutate.routed.{model}")
+		if ok:
+			record_example(intent, state, patch)
+		if ok or last:
+			return patch
+		LOG.debug("Patch from %s failed validation for %s; escalating", model, intent_type)
+		metrics.incr("mutate.escalations")
 	return patch
 
+
+def generate_patch(intent: Any, state: Any, level_context: Optional[Dict[str, Any]] = None, model_cfg: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+	"""Generate a patch dict from `intent` and `state` using an LLM.
+
+	This function is defensive about LLM output (malformed JSON etc.)
+	but it does NOT swallow client-configuration errors. If the LLM
+	client is not installed or misconfigured, callers will get an
+	exception so they can fix their environment.
+
+	With `structured: true` in the model config the model server is
+	given `patch_schema(intent.strict_targets)` as its output format.
+	Patches pass through `engine.repair.repair_patch` before being
+	returned. `model_cfg` overrides the mutator config for this call.
+	The config and prompt are read from a single registry snapshot, so a
+	concurrent reload never mixes old and new values in one call.
+	When the module config lists `candidates`, the call is routed
+	through `llm.routing` (cheapest adequate model first, escalating
+	when a patch fails `engine.patch.validate_patch`). Validation only
+	checks the strict fields; applying the patch is left to the caller.
+	"""
+	cfg, prompt_tpl = _config()
+	router = router_for(cfg) if model_cfg is None else None
+	model_cfg = cfg if model_cfg is None else model_cfg
+
+	with metrics.timer("mutate.prompt"):
+		prompt = build_prompt(intent, state, level_context, prompt_tpl, model_cfg=cfg)
+
+	if router is not None:
+		return _routed_patch(router, prompt, intent, state)
+	patch = _patch_from_llm(prompt, intent, state, model_cfg)
+	if patch and model_cfg.get("examples_record") and not validate_patch(patch):
+		record_example(intent, state, patch, model_cfg)
+	return patch
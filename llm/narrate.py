@@ -6,7 +6,10 @@ Produces terse, in-universe terminal text for player-facing output.
 from dataclasses import dataclass
 from typing import List, Optional, Dict, Any
 import logging
-from .tools import call_llm, load_model_config, load_prompt
+from .registry import get_registry
+from .scheduler import Priority
+from .tools import LLMUnavailable, call_llm
+from telemetry import metrics
 
 # TODO: Prompt tuning per level
 # TODO: Injecting story context later
@@ -20,8 +23,24 @@ class NarrationInput:
 
 LOG = logging.getLogger(__name__)
 
-MODEL_CFG: Dict[str, Any] = load_model_config(key="narrator")
-PROMPT_TPL: str = load_prompt("narrate")
+# `MODEL_CFG` and `PROMPT_TPL` read the current `llm.registry` snapshot
+# on access (see `__getattr__`), so importing the narrator reads no files
+# and config edits apply without a restart. Assigning them pins a value.
+_SNAPSHOT_ATTRS = {
+    "MODEL_CFG": lambda snap: snap.model("narrator"),
+    "PROMPT_TPL": lambda snap: snap.prompt("narrate").text,
+}
+
+
+def __getattr__(name: str) -> Any:
+    getter = _SNAPSHOT_ATTRS.get(name)
+    if getter is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getter(get_registry().snapshot())
+
+
+def _model_cfg() -> Dict[str, Any]:
+    return globals()["MODEL_CFG"] if "MODEL_CFG" in globals() else get_registry().snapshot().model("narrator")
 
 def build_narration_prompt(input: NarrationInput) -> str:
     """
@@ -42,23 +61,34 @@ def build_narration_prompt(input: NarrationInput) -> str:
     lines.append("Generate the terminal response.")
     return "\n".join(lines)
 
+def clean_narration(raw: Optional[str]) -> str:
+    """Strip whitespace, Markdown code fences and surrounding quotes from model output."""
+    text = (raw or "").strip()
+    # Remove Markdown code block markers and surrounding quotes
+    if text.startswith("```") and text.endswith("```"):
+        text = text[3:-3].strip()
+    for q in ("'''", '"""', "'", '"'):
+        if text.startswith(q) and text.endswith(q):
+            text = text[len(q):-len(q)].strip()
+    return text
+
 def generate_narration(input: NarrationInput) -> str:
     """
     Generate a terse, in-universe terminal response for the player using LLM.
     Output is plain text, no meta commentary, no emojis, no explanations.
+
+    Narration runs at BACKGROUND priority. `LLMUnavailable` propagates so
+    callers can fall back to rule-based narration.
     """
     prompt = build_narration_prompt(input)
     try:
-        raw = call_llm(prompt, MODEL_CFG)
-        text = (raw or "").strip()
-        # Remove Markdown code block markers and surrounding quotes
-        if text.startswith("```") and text.endswith("```"):
-            text = text[3:-3].strip()
-        for q in ("'''", '"""', "'", '"'):
-            if text.startswith(q) and text.endswith(q):
-                text = text[len(q):-len(q)].strip()
-        return text
+        with metrics.timer("narrate.llm"):
+            raw = call_llm(prompt, _model_cfg(), priority=Priority.BACKGROUND)
+        return clean_narration(raw)
+    except LLMUnavailable:
+        raise
     except Exception as exc:
         LOG.error("Narrator LLM failed: %s", exc)
+        metrics.incr("narrate.failures")
         # Fallback: minimal error message
         return "[narration unavailable]"
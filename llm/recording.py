@@ -0,0 +1,189 @@
+"""Record/replay transport for LLM calls.
+
+Sits directly under `llm.tools.call_llm`, below admission control,
+deadlines and hedging, in place of the `llm.client.generate` call:
+
+- record: forward to the client and append `prompt hash -> response`
+  plus the measured latency to a tape (JSON lines).
+- replay: serve responses from the tape without touching the model
+  server. With `impose_latency` the recorded latency is slept first,
+  so full game-loop runs reproduce real timing; without it a run
+  measures only our own overhead.
+
+Enable with environment variables:
+
+    SPARROW_LLM_MODE=record|replay
+    SPARROW_LLM_TAPE=tapes/session.jsonl
+    SPARROW_LLM_REPLAY_LATENCY=1
+
+or programmatically with `use_tape(path, mode)`. A key recorded several
+times replays its responses in recorded order, then wraps around.
+`import_bench_results` turns `--dump` files from `scripts/bench_mutator.py`
+(such as `bench_results.json`) into tapes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from llm.tools import LLMUnavailable
+
+LOG = logging.getLogger(__name__)
+
+RECORD = "record"
+REPLAY = "replay"
+
+
+class ReplayMiss(LLMUnavailable):
+    """Replay mode found no recording for a prompt.
+
+    Callers degrade (stub mutator, rule narration) or escalate to the
+    next routed model just as when a live model is unavailable.
+    """
+
+
+def prompt_key(prompt: str, model_cfg: Optional[Dict[str, Any]] = None) -> str:
+    """Stable hash identifying a (model, prompt) pair."""
+    model = (model_cfg or {}).get("model") or ""
+    digest = hashlib.sha256(f"{model}\0{prompt}".encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+class Tape:
+    """Append-only JSON-lines store of recorded LLM responses."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursor: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            with self.path.open() as fh:
+                for line in fh:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries.setdefault(entry["key"], []).append(entry)
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._entries.values())
+
+    def record(self, key: str, model: str, response: str, latency: float) -> None:
+        entry = {"key": key, "model": model, "response": response, "latency": round(latency, 4)}
+        with self._lock:
+            self._entries.setdefault(key, []).append(entry)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a") as fh:
+                fh.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the next recorded entry for `key`, cycling through repeats."""
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                return None
+            i = self._cursor.get(key, 0)
+            self._cursor[key] = i + 1
+            return entries[i % len(entries)]
+
+
+class _Transport:
+    def __init__(self, tape: Tape, mode: str, impose_latency: bool):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown recording mode: {mode}")
+        self.tape = tape
+        self.mode = mode
+        self.impose_latency = impose_latency
+
+
+_ACTIVE: Optional[_Transport] = None
+_ENV_CHECKED = False
+_ENV_LOCK = threading.Lock()
+
+
+def use_tape(path: Path, mode: str, impose_latency: bool = False) -> Tape:
+    """Route LLM calls through a tape in `mode` ("record" or "replay")."""
+    global _ACTIVE, _ENV_CHECKED
+    tape = Tape(path)
+    _ACTIVE = _Transport(tape, mode, impose_latency)
+    _ENV_CHECKED = True
+    LOG.info("LLM %s mode using tape %s (%d entries)", mode, path, len(tape))
+    return tape
+
+
+def disable() -> None:
+    global _ACTIVE, _ENV_CHECKED
+    _ACTIVE = None
+    _ENV_CHECKED = True
+
+
+def active() -> Optional[_Transport]:
+    """Return the active transport, configuring it from the environment once."""
+    global _ENV_CHECKED
+    if not _ENV_CHECKED:
+        with _ENV_LOCK:
+            if not _ENV_CHECKED:
+                mode = os.getenv("SPARROW_LLM_MODE", "").lower()
+                if mode:
+                    path = os.getenv("SPARROW_LLM_TAPE", "llm_tape.jsonl")
+                    impose = os.getenv("SPARROW_LLM_REPLAY_LATENCY", "").lower() in ("1", "true", "yes")
+                    use_tape(Path(path), mode, impose)
+                _ENV_CHECKED = True
+    return _ACTIVE
+
+
+def transport(generate: Callable[..., str], prompt: str, model_cfg: Dict[str, Any], timeout: Optional[float]) -> str:
+    """Call `generate` directly or through the active record/replay tape."""
+    tr = active()
+    if tr is None:
+        if timeout is None:
+            return generate(prompt, model_cfg)
+        return generate(prompt, model_cfg, timeout=timeout)
+
+    key = prompt_key(prompt, model_cfg)
+    if tr.mode == REPLAY:
+        entry = tr.tape.lookup(key)
+        if entry is None:
+            raise ReplayMiss(f"No recorded response for prompt {key}")
+        if tr.impose_latency:
+            time.sleep(entry.get("latency", 0.0) if timeout is None else min(entry.get("latency", 0.0), timeout))
+        return entry["response"]
+
+    start = time.perf_counter()
+    response = generate(prompt, model_cfg) if timeout is None else generate(prompt, model_cfg, timeout=timeout)
+    tr.tape.record(key, (model_cfg or {}).get("model") or "", response, time.perf_counter() - start)
+    return response
+
+
+def import_bench_results(dump: Path, prompt: str, model_cfg: Dict[str, Any], tape_path: Path) -> int:
+    """Append runs from a `bench_mutator.py --dump` file to a tape.
+
+    Bench dumps keep the parsed patch and duration but not the prompt,
+    so the caller supplies the prompt the runs answered, and `model_cfg`
+    names the model replay will ask (with routing, the first candidate
+    tried). Returns the number of entries imported.
+    """
+    runs = json.loads(Path(dump).read_text())
+    tape = Tape(tape_path)
+    key = prompt_key(prompt, model_cfg)
+    model = (model_cfg or {}).get("model") or ""
+    count = 0
+    for run in runs:
+        if run.get("raw_patch") is None or run.get("error"):
+            continue
+        tape.record(key, model, json.dumps(run["raw_patch"]), float(run.get("duration") or 0.0))
+        count += 1
+    return count
+
+
+__all__ = [
+    "RECORD", "REPLAY", "ReplayMiss", "Tape",
+    "prompt_key", "use_tape", "disable", "active", "transport",
+    "import_bench_results",
+]
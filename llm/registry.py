@@ -0,0 +1,313 @@
+"""In-memory registry of model configs and prompt templates, hot-reloaded.
+
+`load_model_config`/`load_prompt` return one file's worth of data;
+callers used to freeze the results into module globals (`MODEL_CFG`,
+`PROMPT_TPL`), so editing a prompt needed a restart and `set_mutator`
+rewrote those globals under running sessions. The registry replaces
+that with immutable snapshots:
+
+- `Snapshot` holds every role of the model config as a `FrozenConfig`
+  (a read-only dict) and every `llm/prompts/*.txt` as a precompiled
+  `Template`. A snapshot never changes, so a turn or session that holds
+  one sees a consistent config and prompt pair however many reloads
+  happen meanwhile.
+- `Registry.snapshot()` is the hot path: a plain attribute read, plus an
+  mtime check of the files at most every `check_interval` seconds. A
+  changed file builds a new snapshot, which is published with a single
+  reference swap; readers never take a lock. Roles whose config did not
+  change keep their `FrozenConfig` object, so per-config caches (such as
+  `llm.routing.router_for`) hit on an identity check.
+- `Registry.override(role, model_cfg, prompt_name, template)` pins
+  values on top of the files (tests, `llm.mutate.set_mutator`). The
+  overrides survive reloads, and `clear_overrides()` removes them.
+
+Usage:
+    snap = get_registry().snapshot()
+    cfg = snap.model("mutator")
+    prompt = snap.prompt("mutate").render(intent=..., state=...)
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Mapping, Optional, Tuple
+
+from .tools import DEFAULT_CONFIG, PROMPTS_DIR, _parse_yaml, resolve_path
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_CHECK_INTERVAL = 1.0
+
+_PLACEHOLDER = re.compile(r"\{([a-z_]+)\}")
+
+
+class FrozenConfig(dict):
+    """A read-only dict. It stays JSON-serializable and `{**cfg}` makes a mutable copy."""
+
+    def _readonly(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("model configs from the registry are read-only; copy with dict(cfg)")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (FrozenConfig, (dict(self),))
+
+    def __copy__(self) -> "FrozenConfig":
+        return self
+
+
+def freeze(value: Any) -> Any:
+    """Recursively turn dicts into `FrozenConfig` and lists into tuples."""
+    if isinstance(value, FrozenConfig):
+        return value
+    if isinstance(value, dict):
+        return FrozenConfig((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+class Template:
+    """A prompt template split once into literal text and `{name}` placeholders.
+
+    `render(**values)` fills placeholders in a single pass. Placeholders
+    without a value are left as written, and so is any other brace in the
+    text (JSON examples in prompts).
+    """
+
+    __slots__ = ("text", "_parts", "placeholders")
+
+    def __init__(self, text: str):
+        self.text = text
+        parts: list = []
+        names = set()
+        pos = 0
+        for m in _PLACEHOLDER.finditer(text):
+            parts.append(text[pos:m.start()])
+            parts.append(m.group(1))
+            names.add(m.group(1))
+            pos = m.end()
+        parts.append(text[pos:])
+        # Even indexes are literals, odd indexes placeholder names.
+        self._parts: Tuple[str, ...] = tuple(parts)
+        self.placeholders: FrozenSet[str] = frozenset(names)
+
+    @property
+    def prefix(self) -> str:
+        """The static text before the first placeholder."""
+        return self._parts[0].rstrip()
+
+    def render(self, **values: str) -> str:
+        parts = self._parts
+        out = [parts[0]]
+        for i in range(1, len(parts), 2):
+            name = parts[i]
+            value = values.get(name)
+            out.append("{" + name + "}" if value is None else value)
+            out.append(parts[i + 1])
+        return "".join(out)
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __repr__(self) -> str:
+        return f"Template({sorted(self.placeholders)})"
+
+
+@lru_cache(maxsize=64)
+def compile_template(text: str) -> Template:
+    """A `Template` for `text`, compiled once per distinct text."""
+    return Template(text)
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """One consistent, immutable view of the model configs and prompts."""
+
+    version: int
+    models: Mapping[str, FrozenConfig] = field(default_factory=dict)
+    prompts: Mapping[str, Template] = field(default_factory=dict)
+
+    def model(self, role: str = "mutator") -> FrozenConfig:
+        """The config of `role` ({} if not configured)."""
+        return self.models.get(role) or _EMPTY
+
+    def prompt(self, name: str) -> Template:
+        try:
+            return self.prompts[name]
+        except KeyError:
+            raise RuntimeError(f"Prompt template not found for '{name}'") from None
+
+
+_EMPTY = FrozenConfig()
+
+
+class Registry:
+    """Model configs and prompt templates from disk, reloaded when they change.
+
+    Args:
+        config_file: Model config YAML (relative paths fall back to the repo root).
+        prompts_dir: Directory of `<name>.txt` prompt templates.
+        check_interval: Minimum seconds between file mtime checks.
+    """
+
+    def __init__(self, config_file: Path = DEFAULT_CONFIG, prompts_dir: Path = PROMPTS_DIR, check_interval: float = DEFAULT_CHECK_INTERVAL):
+        self.config_file = resolve_path(config_file)
+        self.prompts_dir = Path(prompts_dir)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._model_overrides: Dict[str, FrozenConfig] = {}
+        self._prompt_overrides: Dict[str, Template] = {}
+        self._mtimes: Dict[Path, float] = {}
+        self._file_models: Dict[str, FrozenConfig] = {}
+        self._file_prompts: Dict[str, Template] = {}
+        self._snapshot: Optional[Snapshot] = None
+        self._next_check = 0.0
+
+    def snapshot(self) -> Snapshot:
+        """The current snapshot; checks file mtimes at most every `check_interval`."""
+        snap = self._snapshot
+        if snap is None or time.monotonic() >= self._next_check:
+            snap = self._refresh(blocking=snap is None)
+        return snap
+
+    def reload(self) -> Snapshot:
+        """Re-read changed files now."""
+        with self._lock:
+            self._reload_locked()
+            return self._snapshot
+
+    def override(self, role: Optional[str] = None, model_cfg: Optional[Dict[str, Any]] = None, prompt_name: Optional[str] = None, template: Optional[str] = None) -> Snapshot:
+        """Pin `role`'s config and/or the `prompt_name` template over the files."""
+        with self._lock:
+            if role is not None and model_cfg is not None:
+                self._model_overrides[role] = freeze(model_cfg)
+            if prompt_name is not None and template is not None:
+                self._prompt_overrides[prompt_name] = compile_template(str(template))
+            if self._snapshot is None:
+                self._reload_locked()
+            else:
+                self._publish_locked()
+            return self._snapshot
+
+    def clear_overrides(self) -> None:
+        with self._lock:
+            self._model_overrides.clear()
+            self._prompt_overrides.clear()
+            if self._snapshot is not None:
+                self._publish_locked()
+
+    def _refresh(self, blocking: bool) -> Snapshot:
+        # Only one thread checks at a time; the others keep reading the
+        # snapshot they have.
+        if not self._lock.acquire(blocking=blocking):
+            return self._snapshot
+        try:
+            if self._snapshot is None or time.monotonic() >= self._next_check:
+                self._reload_locked()
+            return self._snapshot
+        finally:
+            self._lock.release()
+
+    def _reload_locked(self) -> None:
+        self._next_check = time.monotonic() + self.check_interval
+        files = self._watched_files()
+        mtimes = {}
+        for path in files:
+            try:
+                mtimes[path] = path.stat().st_mtime
+            except OSError:
+                continue
+        if self._snapshot is not None and mtimes == self._mtimes:
+            return
+        changed = {p for p in set(mtimes) | set(self._mtimes) if mtimes.get(p) != self._mtimes.get(p)}
+        if self._snapshot is None or self.config_file in changed:
+            self._file_models = self._read_models()
+        if self._snapshot is None or any(p != self.config_file for p in changed):
+            self._file_prompts = self._read_prompts()
+        self._mtimes = mtimes
+        if self._snapshot is not None:
+            LOG.info("Reloaded model config/prompts: %s", ", ".join(sorted(p.name for p in changed)))
+        self._publish_locked()
+
+    def _watched_files(self) -> list:
+        files = [self.config_file]
+        try:
+            files.extend(sorted(self.prompts_dir.glob("*.txt")))
+        except OSError:
+            pass
+        return files
+
+    def _read_models(self) -> Dict[str, FrozenConfig]:
+        try:
+            data = _parse_yaml(self.config_file.read_text()) if self.config_file.exists() else {}
+        except ImportError:
+            LOG.debug("PyYAML not installed, skipping config parse")
+            data = {}
+        except Exception:
+            LOG.warning("Failed to load model config %s; keeping the previous one", self.config_file, exc_info=True)
+            return self._file_models
+        models = {}
+        for role, cfg in (data if isinstance(data, dict) else {}).items():
+            if not isinstance(cfg, dict):
+                continue
+            frozen = freeze(cfg)
+            previous = self._file_models.get(role)
+            # Keep the old object for an unchanged role (cheap identity checks).
+            models[role] = previous if previous == frozen else frozen
+        return models
+
+    def _read_prompts(self) -> Dict[str, Template]:
+        prompts = {}
+        for path in self._watched_files()[1:]:
+            try:
+                prompts[path.stem] = compile_template(path.read_text().strip())
+            except OSError:
+                LOG.debug("Failed to read prompt %s", path, exc_info=True)
+        return prompts
+
+    def _publish_locked(self) -> None:
+        version = 1 if self._snapshot is None else self._snapshot.version + 1
+        self._snapshot = Snapshot(
+            version=version,
+            models={**self._file_models, **self._model_overrides},
+            prompts={**self._file_prompts, **self._prompt_overrides},
+        )
+
+
+_REGISTRY: Optional[Registry] = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_registry() -> Registry:
+    """The process-wide registry for the default config and prompts."""
+    global _REGISTRY
+    if _REGISTRY is None:
+        with _REGISTRY_LOCK:
+            if _REGISTRY is None:
+                _REGISTRY = Registry()
+    return _REGISTRY
+
+
+def snapshot() -> Snapshot:
+    """Shorthand for `get_registry().snapshot()`."""
+    return get_registry().snapshot()
+
+
+__all__ = [
+    "FrozenConfig",
+    "Registry",
+    "Snapshot",
+    "Template",
+    "compile_template",
+    "freeze",
+    "get_registry",
+    "snapshot",
+]
@@ -0,0 +1,356 @@
+"""Deadlines, hedged requests and circuit breaking for LLM calls.
+
+`llm.tools.call_llm` uses these helpers so a slow or stalled model
+server cannot hang a turn:
+
+- Deadline budgets: `deadline_scope(seconds)` sets a per-turn budget in
+  a context variable. Every LLM call inside it gets the remaining budget
+  as its timeout and raises `DeadlineExceeded` once the budget is spent.
+  Every call is also capped by the model config's `timeout_s`
+  (`DEFAULT_TIMEOUT_S` when unset; `timeout_s: null` removes the cap).
+- Hedging: with `hedge: true` in the model config, a duplicate request
+  is sent once the first has been outstanding for the model's observed
+  p95 latency (or `hedge_after_s` until enough samples exist). The first
+  answer wins and the other request is cancelled if it has not started.
+  A duplicate needs its own scheduler slot and is skipped when none is
+  free, and every request keeps its slot until it returns, even after
+  the caller gave up on it, so `max_concurrency` holds while a model is
+  stalled.
+- Circuit breaking: each model has a `CircuitBreaker` tracking recent
+  errors and slow calls. When either rate crosses its threshold the
+  circuit opens and calls fail fast with `CircuitOpen` for a cooldown,
+  after which a single probe call decides whether to close it again.
+
+All three raise subclasses of `llm.tools.LLMUnavailable`, so callers
+degrade to `game.mutate_stub` and rule-based narration.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from llm.tools import LLMUnavailable
+from telemetry import metrics
+
+LOG = logging.getLogger(__name__)
+
+# Samples needed before hedging trusts the observed p95 over `hedge_after_s`.
+HEDGE_MIN_SAMPLES = 20
+DEFAULT_HEDGE_AFTER = 2.0
+# Per-call ceiling for models whose config sets no `timeout_s`. Generous
+# enough for a cold model load, but a stalled server can no longer hang
+# a call forever.
+DEFAULT_TIMEOUT_S = 60.0
+
+
+class DeadlineExceeded(LLMUnavailable):
+    """The call's deadline budget ran out."""
+
+
+class CircuitOpen(LLMUnavailable):
+    """The model's circuit breaker is open; the call was not attempted."""
+
+
+@dataclass(frozen=True)
+class Deadline:
+    """An absolute point in `time.monotonic()` time."""
+    expires_at: float
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        return cls(time.monotonic() + seconds)
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+
+_DEADLINE: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar("llm_deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[Optional[Deadline]]:
+    """Bound LLM calls in this context to `seconds` in total.
+
+    Nested scopes never extend an outer deadline. `None` leaves the
+    current deadline unchanged.
+    """
+    current = _DEADLINE.get()
+    if seconds is None:
+        yield current
+        return
+    deadline = Deadline.after(seconds)
+    if current is not None and current.expires_at < deadline.expires_at:
+        deadline = current
+    token = _DEADLINE.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _DEADLINE.reset(token)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _DEADLINE.get()
+
+
+def call_timeout(model_cfg: Dict[str, Any], timeout: Optional[float] = None) -> Optional[float]:
+    """Combine an explicit timeout, the model's `timeout_s` and the context deadline.
+
+    A config without `timeout_s` gets `DEFAULT_TIMEOUT_S`.
+
+    Raises:
+        DeadlineExceeded: If the context deadline has already passed.
+    """
+    candidates = [t for t in (timeout, (model_cfg or {}).get("timeout_s", DEFAULT_TIMEOUT_S)) if t is not None]
+    deadline = _DEADLINE.get()
+    if deadline is not None:
+        remaining = deadline.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded("turn deadline exhausted before LLM call")
+        candidates.append(remaining)
+    return min(candidates) if candidates else None
+
+
+class CircuitBreaker:
+    """Rolling-window breaker over call errors and slow calls.
+
+    Args:
+        window: Number of recent calls considered.
+        min_calls: Calls required in the window before the circuit may open.
+        error_rate: Fraction of failed calls that opens the circuit.
+        slow_call_s: Latency above which a successful call counts as slow.
+        slow_rate: Fraction of slow calls that opens the circuit.
+        cooldown: Seconds the circuit stays open before allowing a probe.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, window: int = 20, min_calls: int = 5, error_rate: float = 0.5, slow_call_s: Optional[float] = None, slow_rate: float = 0.8, cooldown: float = 30.0):
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_s = slow_call_s
+        self.slow_rate = slow_rate
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self._calls: deque[tuple[bool, bool]] = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def check(self) -> None:
+        """Raise `CircuitOpen` if a call would be refused now, without claiming the probe."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                return
+            if self.state == self.HALF_OPEN and not self._probing:
+                return
+            raise CircuitOpen("circuit open; LLM calls are degraded")
+
+    def allow(self) -> bool:
+        """Raise `CircuitOpen` unless a call may proceed now.
+
+        Returns True if this call took the half-open probe; the caller must
+        then `record` its outcome or `release` the probe unused.
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return False
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            raise CircuitOpen("circuit open; LLM calls are degraded")
+
+    def release(self) -> None:
+        """Give back a probe taken by `allow` whose call never reached the model."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probing = False
+
+    def record(self, ok: bool, latency: float) -> None:
+        slow = ok and self.slow_call_s is not None and latency > self.slow_call_s
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                if ok and not slow:
+                    LOG.info("Circuit closed after successful probe")
+                    self.state = self.CLOSED
+                    self._calls.clear()
+                else:
+                    self._open()
+                return
+            self._calls.append((ok, slow))
+            if len(self._calls) < self.min_calls:
+                return
+            errors = sum(1 for c_ok, _ in self._calls if not c_ok) / len(self._calls)
+            slows = sum(1 for _, c_slow in self._calls if c_slow) / len(self._calls)
+            if errors >= self.error_rate or slows >= self.slow_rate:
+                self._open()
+
+    def _open(self) -> None:
+        if self.state != self.OPEN:
+            LOG.warning("Circuit opened; degrading LLM calls for %.0fs", self.cooldown)
+            metrics.incr("llm.circuit_open")
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._probing = False
+
+
+class _ModelHealth:
+    def __init__(self, breaker: CircuitBreaker):
+        self.breaker = breaker
+        self.latency = metrics.Histogram(size=512)
+
+
+_HEALTH: Dict[str, _ModelHealth] = {}
+_HEALTH_LOCK = threading.Lock()
+_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-call")
+
+
+def _health(model_cfg: Dict[str, Any]) -> _ModelHealth:
+    model = (model_cfg or {}).get("model") or "default"
+    with _HEALTH_LOCK:
+        health = _HEALTH.get(model)
+        if health is None:
+            cfg = model_cfg or {}
+            breaker = CircuitBreaker(
+                error_rate=cfg.get("breaker_error_rate", 0.5),
+                slow_call_s=cfg.get("breaker_slow_s"),
+                cooldown=cfg.get("breaker_cooldown_s", 30.0),
+            )
+            health = _HEALTH[model] = _ModelHealth(breaker)
+        return health
+
+
+def breaker_for(model_cfg: Dict[str, Any]) -> CircuitBreaker:
+    return _health(model_cfg).breaker
+
+
+def reset() -> None:
+    """Forget all breaker state and latency history (useful for tests)."""
+    with _HEALTH_LOCK:
+        _HEALTH.clear()
+
+
+def hedge_delay(model_cfg: Dict[str, Any]) -> float:
+    """Seconds to wait before sending a hedged duplicate request."""
+    latency = _health(model_cfg).latency
+    if latency.count >= HEDGE_MIN_SAMPLES:
+        return latency.summary()["p95"]
+    return float((model_cfg or {}).get("hedge_after_s", DEFAULT_HEDGE_AFTER))
+
+
+def _first_result(futures: list[Future]) -> Any:
+    """Return the first successful result, or re-raise the last error."""
+    error: Optional[BaseException] = None
+    for fut in futures:
+        if fut.done():
+            if fut.exception() is None:
+                return fut.result()
+            error = fut.exception()
+    if error is not None:
+        raise error
+    return None
+
+
+def invoke(call: Callable[[Optional[float]], str], model_cfg: Dict[str, Any], timeout: Optional[float], slot: Any = None) -> str:
+    """Run `call(timeout)` under the model's timeout and hedging policy.
+
+    The outcome and latency are recorded on the model's breaker; callers
+    take `breaker_for(model_cfg).allow()` first and release an unused
+    probe if the call never gets here.
+
+    `slot` (an `llm.scheduler.Slot`) is owned by this call from here on:
+    it is released when the request finishes, which may be after this
+    function raised `DeadlineExceeded`. Without a slot no hedge is sent.
+
+    Raises:
+        DeadlineExceeded: If no answer arrived within `timeout`.
+    """
+    health = _health(model_cfg)
+    hedge = bool((model_cfg or {}).get("hedge"))
+    start = time.perf_counter()
+    try:
+        if timeout is None and not hedge:
+            try:
+                result = call(None)
+            finally:
+                if slot is not None:
+                    slot.release()
+        else:
+            result = _invoke_async(call, model_cfg, timeout, hedge, slot)
+    except Exception:
+        health.breaker.record(False, time.perf_counter() - start)
+        raise
+    elapsed = time.perf_counter() - start
+    health.breaker.record(True, elapsed)
+    health.latency.observe(elapsed)
+    return result
+
+
+def _submit(call: Callable[[Optional[float]], str], timeout: Optional[float], slot: Any) -> Future:
+    """Run `call` on the executor; `slot` is released once it finishes."""
+    future = _EXECUTOR.submit(call, timeout)
+    if slot is not None:
+        future.add_done_callback(lambda _: slot.release())
+    return future
+
+
+def _cancel_losers(futures: list[Future], winner: Future) -> None:
+    for fut in futures:
+        if fut is not winner:
+            fut.cancel()  # only stops requests that have not started
+
+
+def _invoke_async(call: Callable[[Optional[float]], str], model_cfg: Dict[str, Any], timeout: Optional[float], hedge: bool, slot: Any = None) -> str:
+    start = time.monotonic()
+    futures = [_submit(call, timeout, slot)]
+    pending = set(futures)
+    if hedge and slot is not None:
+        delay = hedge_delay(model_cfg)
+        if timeout is None or delay < timeout:
+            done, pending = wait(pending, timeout=delay)
+            if not done:
+                extra = slot.try_another()
+                if extra is None:
+                    metrics.incr("llm.hedge_skipped")
+                    LOG.debug("No free slot to hedge LLM call after %.2fs", delay)
+                else:
+                    metrics.incr("llm.hedged")
+                    LOG.debug("Hedging LLM call after %.2fs", delay)
+                    remaining = None if timeout is None else timeout - (time.monotonic() - start)
+                    futures.append(_submit(call, remaining, extra))
+                    pending.add(futures[-1])
+    while pending:
+        remaining = None if timeout is None else timeout - (time.monotonic() - start)
+        if remaining is not None and remaining <= 0:
+            break
+        done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for fut in done:
+            if fut.exception() is None:
+                _cancel_losers(futures, fut)
+                return fut.result()
+    if all(f.done() for f in futures) and (timeout is None or time.monotonic() - start < timeout):
+        return _first_result(futures)
+    metrics.incr("llm.deadline_exceeded")
+    raise DeadlineExceeded(f"LLM call exceeded {timeout:.2f}s")
+
+
+__all__ = [
+    "DEFAULT_TIMEOUT_S", "Deadline", "DeadlineExceeded", "CircuitOpen", "CircuitBreaker",
+    "deadline_scope", "current_deadline", "call_timeout",
+    "breaker_for", "hedge_delay", "invoke", "reset",
+]
@@ -0,0 +1,221 @@
+"""Adaptive per-intent model routing for the mutator.
+
+A role config may list cheaper `candidates` next to its own model:
+
+    mutator:
+      model: llama3.1:8b
+      cost: 8
+      candidates:
+        - model: qwen2.5:1.5b
+          cost: 1.5
+      route_threshold: 0.9
+
+`ModelRouter` tracks, per intent type and model, how often the model's
+patch passed `engine.patch.validate_patch` and how long it took. For
+each call it tries the cheapest model whose recent success rate is at
+or above the threshold (models with fewer than `min_samples` results
+are given the benefit of the doubt), and escalates to the next more
+expensive model only when that patch fails validation. Candidates of
+equal cost are ordered by their recent mean latency for the intent
+type, fastest first.
+
+A model that fell below the threshold is probed again every
+`probe_every` routed calls for that intent type, so it can earn its way
+back after a transient bad streak. Candidates inherit the role's other
+settings (temperature, transport, ...) and override only what they set.
+
+`router_for` keeps one router per role. When the role's config changes
+(a reload or an override), the new router takes over the statistics of
+every model that is still a candidate.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 0.9
+DEFAULT_MIN_SAMPLES = 5
+DEFAULT_WINDOW = 50
+DEFAULT_PROBE_EVERY = 20
+
+
+def _cost(cfg: Dict[str, Any]) -> float:
+    return math.inf if cfg.get("cost") is None else cfg["cost"]
+
+
+class _ModelStats:
+    """Recent validation outcomes and latencies for one (intent type, model)."""
+
+    def __init__(self, window: int):
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.latencies: Deque[float] = deque(maxlen=window)
+
+    @property
+    def samples(self) -> int:
+        return len(self.outcomes)
+
+    @property
+    def success_rate(self) -> float:
+        return sum(self.outcomes) / len(self.outcomes) if self.outcomes else 1.0
+
+    @property
+    def mean_latency(self) -> float:
+        return sum(self.latencies) / len(self.latencies) if self.latencies else 0.0
+
+
+class ModelRouter:
+    """Choose the cheapest adequate model per intent type, escalating on failure.
+
+    Args:
+        candidates: Model configs; each should carry `model` and a relative `cost`.
+        threshold: Minimum recent apply-success rate for a model to be tried first.
+        min_samples: Results needed before a model's success rate is trusted.
+        window: Number of recent results kept per (intent type, model).
+        probe_every: Re-try a demoted model once every this many routed calls.
+    """
+
+    def __init__(self, candidates: List[Dict[str, Any]], threshold: float = DEFAULT_THRESHOLD, min_samples: int = DEFAULT_MIN_SAMPLES, window: int = DEFAULT_WINDOW, probe_every: int = DEFAULT_PROBE_EVERY):
+        if not candidates:
+            raise ValueError("ModelRouter needs at least one candidate")
+        # Cheapest first; unknown cost sorts last. Stable for equal costs.
+        self.candidates = sorted(candidates, key=_cost)
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.window = window
+        self.probe_every = probe_every
+        self._stats: Dict[Tuple[str, str], _ModelStats] = {}
+        self._calls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, model_cfg: Dict[str, Any]) -> Optional["ModelRouter"]:
+        """Build a router from a role config with `candidates`, or return None."""
+        extra = (model_cfg or {}).get("candidates") or []
+        if not extra:
+            return None
+        base = {k: v for k, v in model_cfg.items() if not k.startswith("route_") and k != "candidates"}
+        candidates = [base] + [{**base, **c} for c in extra]
+        return cls(
+            candidates,
+            threshold=model_cfg.get("route_threshold", DEFAULT_THRESHOLD),
+            min_samples=model_cfg.get("route_min_samples", DEFAULT_MIN_SAMPLES),
+            probe_every=model_cfg.get("route_probe_every", DEFAULT_PROBE_EVERY),
+        )
+
+    def _entry(self, intent_type: str, model: str) -> _ModelStats:
+        key = (intent_type, model)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = _ModelStats(self.window)
+        return stats
+
+    def inherit(self, other: "ModelRouter") -> None:
+        """Take over `other`'s statistics for the models that are still candidates."""
+        models = {cfg.get("model") or "" for cfg in self.candidates}
+        with other._lock:
+            stats = {key: (list(s.outcomes), list(s.latencies)) for key, s in other._stats.items() if key[1] in models}
+            calls = dict(other._calls)
+        with self._lock:
+            for key, (outcomes, latencies) in stats.items():
+                entry = self._entry(*key)
+                entry.outcomes.extend(outcomes)
+                entry.latencies.extend(latencies)
+            self._calls.update(calls)
+
+    def _adequate(self, intent_type: str, model: str) -> bool:
+        stats = self._entry(intent_type, model)
+        return stats.samples < self.min_samples or stats.success_rate >= self.threshold
+
+    def plan(self, intent_type: str) -> List[Dict[str, Any]]:
+        """Return the models to try for `intent_type`, in escalation order.
+
+        The first entry is the cheapest adequate model (or a demoted one
+        being probed); the rest are every more expensive candidate.
+        Equal-cost candidates are ordered by recent mean latency.
+        """
+        with self._lock:
+            calls = self._calls[intent_type] = self._calls.get(intent_type, 0) + 1
+            probing = self.probe_every > 0 and calls % self.probe_every == 0
+            ordered = sorted(self.candidates, key=lambda c: (_cost(c), self._entry(intent_type, c.get("model") or "").mean_latency))
+            start = len(ordered) - 1
+            for i, cfg in enumerate(ordered):
+                if probing or self._adequate(intent_type, cfg.get("model") or ""):
+                    start = i
+                    break
+            return ordered[start:]
+
+    def record(self, intent_type: str, model: str, success: bool, latency: float) -> None:
+        with self._lock:
+            stats = self._entry(intent_type, model)
+            stats.outcomes.append(bool(success))
+            stats.latencies.append(latency)
+
+    def stats(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Return success rate, mean latency and sample count per intent type and model."""
+        with self._lock:
+            out: Dict[str, Dict[str, Dict[str, float]]] = {}
+            for (intent_type, model), s in self._stats.items():
+                out.setdefault(intent_type, {})[model] = {
+                    "samples": s.samples,
+                    "success_rate": s.success_rate,
+                    "mean_latency": s.mean_latency,
+                }
+            return out
+
+
+class _RouterEntry:
+    """A role's current config, its content fingerprint and its router."""
+
+    __slots__ = ("model_cfg", "fingerprint", "router")
+
+    def __init__(self, model_cfg: Dict[str, Any], fingerprint: str, router: Optional[ModelRouter]):
+        self.model_cfg = model_cfg
+        self.fingerprint = fingerprint
+        self.router = router
+
+
+_ROUTERS: Dict[str, _RouterEntry] = {}
+_ROUTERS_LOCK = threading.Lock()
+
+
+def _fingerprint(model_cfg: Dict[str, Any]) -> str:
+    return json.dumps(model_cfg, sort_keys=True, default=str)
+
+
+def router_for(model_cfg: Dict[str, Any], role: str = "mutator") -> Optional[ModelRouter]:
+    """Return the router for `role`, rebuilding it when its config changes.
+
+    A config equal to the previous one (even as a new object) keeps the
+    router; a changed one gets a new router that inherits the statistics
+    of the models it still lists. A config without `candidates` has no
+    router.
+    """
+    with _ROUTERS_LOCK:
+        entry = _ROUTERS.get(role)
+        if entry is not None and entry.model_cfg is model_cfg:
+            return entry.router
+        fingerprint = _fingerprint(model_cfg)
+        if entry is not None and entry.fingerprint == fingerprint:
+            entry.model_cfg = model_cfg
+            return entry.router
+        router = ModelRouter.from_config(model_cfg)
+        if router is not None and entry is not None and entry.router is not None:
+            router.inherit(entry.router)
+        _ROUTERS[role] = _RouterEntry(model_cfg, fingerprint, router)
+        return router
+
+
+def reset() -> None:
+    """Forget all routers and their statistics."""
+    with _ROUTERS_LOCK:
+        _ROUTERS.clear()
+
+
+__all__ = ["ModelRouter", "router_for", "reset"]
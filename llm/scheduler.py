@@ -0,0 +1,290 @@
+"""Admission control and fair scheduling for LLM calls.
+
+Every `llm.tools.call_llm` passes through a process-wide `LLMScheduler`
+before reaching the client. The scheduler:
+
+- caps in-flight requests per model (`max_concurrency` in the model
+  config, default `DEFAULT_CONCURRENCY`);
+- queues waiting requests per priority class, serving INTERACTIVE
+  (mutator, intent) before BACKGROUND (narration, refills);
+- round-robins between sessions within a class so one busy session
+  cannot starve the others;
+- records queue wait per model (`llm.queue.<model>`) in telemetry;
+- sheds load by raising `LLMOverloaded` when a queue is too deep or a
+  request waited past its queue timeout. Callers degrade to the stub
+  mutator or rule-based narration.
+
+`hold()` returns the granted slot as a `Slot` that can outlive the
+caller: `llm.resilience` hands it to the request still running after a
+deadline, so a timed-out call counts against the cap until the model
+actually answers, and takes extra slots for hedged duplicates with
+`Slot.try_another()`.
+
+The current session and priority are carried in context variables so
+mutator signatures stay unchanged:
+
+    with session_scope("player-42"):
+        patch = mutator(intent, state)
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Any, Dict, Iterator, Optional
+
+from llm.tools import LLMUnavailable
+from telemetry import metrics
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MAX_QUEUE = 64
+DEFAULT_QUEUE_TIMEOUT = 30.0
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+class LLMOverloaded(LLMUnavailable):
+    """Raised when a request is shed instead of queued."""
+
+
+_SESSION: contextvars.ContextVar[str] = contextvars.ContextVar("llm_session", default="default")
+_PRIORITY: contextvars.ContextVar[Priority] = contextvars.ContextVar("llm_priority", default=Priority.INTERACTIVE)
+
+
+@contextmanager
+def session_scope(session_id: str) -> Iterator[None]:
+    """Attribute LLM calls made in this context to `session_id`."""
+    token = _SESSION.set(session_id)
+    try:
+        yield
+    finally:
+        _SESSION.reset(token)
+
+
+@contextmanager
+def priority_scope(priority: Priority) -> Iterator[None]:
+    """Run LLM calls made in this context at `priority`."""
+    token = _PRIORITY.set(priority)
+    try:
+        yield
+    finally:
+        _PRIORITY.reset(token)
+
+
+def current_session() -> str:
+    return _SESSION.get()
+
+
+class _Ticket:
+    __slots__ = ("session", "priority", "event", "granted")
+
+    def __init__(self, session: str, priority: Priority):
+        self.session = session
+        self.priority = priority
+        self.event = threading.Event()
+        self.granted = False
+
+
+class _ModelQueue:
+    """Waiting tickets for one model, per priority class and session."""
+
+    def __init__(self, cap: int):
+        self.cap = cap
+        self.in_flight = 0
+        self.depth = 0
+        self.classes: list[OrderedDict[str, deque[_Ticket]]] = [OrderedDict() for _ in Priority]
+
+    def push(self, ticket: _Ticket) -> None:
+        self.classes[ticket.priority].setdefault(ticket.session, deque()).append(ticket)
+        self.depth += 1
+
+    def pop_next(self) -> Optional[_Ticket]:
+        for sessions in self.classes:
+            if not sessions:
+                continue
+            session, waiting = next(iter(sessions.items()))
+            ticket = waiting.popleft()
+            # Rotate the session to the back so sessions take turns.
+            del sessions[session]
+            if waiting:
+                sessions[session] = waiting
+            self.depth -= 1
+            return ticket
+        return None
+
+    def remove(self, ticket: _Ticket) -> None:
+        sessions = self.classes[ticket.priority]
+        waiting = sessions.get(ticket.session)
+        if waiting is None or ticket not in waiting:
+            return
+        waiting.remove(ticket)
+        if not waiting:
+            del sessions[ticket.session]
+        self.depth -= 1
+
+    def queued(self, priority: Priority) -> int:
+        return sum(len(w) for w in self.classes[priority].values())
+
+
+class Slot:
+    """One granted in-flight slot for a model; `release()` is idempotent."""
+
+    __slots__ = ("scheduler", "model", "cap", "_released", "_lock")
+
+    def __init__(self, scheduler: "LLMScheduler", model: str, cap: Optional[int]):
+        self.scheduler = scheduler
+        self.model = model
+        self.cap = cap
+        self._released = False
+        self._lock = threading.Lock()
+
+    def release(self) -> None:
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self.scheduler.release(self.model)
+
+    def try_another(self) -> Optional["Slot"]:
+        """A second slot for the same model if one is free right now, else None."""
+        return self.scheduler.try_hold(self.model, self.cap)
+
+
+class LLMScheduler:
+    """Per-model concurrency cap with prioritized, session-fair queuing.
+
+    Args:
+        default_concurrency: In-flight cap for models without `max_concurrency`.
+        max_queue: Queue depth at which INTERACTIVE requests are shed.
+            BACKGROUND requests are shed at half this depth.
+        queue_timeout: Seconds a request may wait before it is shed.
+    """
+
+    def __init__(self, default_concurrency: int = DEFAULT_CONCURRENCY, max_queue: int = DEFAULT_MAX_QUEUE, queue_timeout: Optional[float] = DEFAULT_QUEUE_TIMEOUT):
+        self.default_concurrency = default_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        self._models: Dict[str, _ModelQueue] = {}
+
+    def _queue_for(self, model: str, cap: int) -> _ModelQueue:
+        queue = self._models.get(model)
+        if queue is None:
+            queue = self._models[model] = _ModelQueue(cap)
+        queue.cap = cap
+        return queue
+
+    def _dispatch(self, queue: _ModelQueue) -> None:
+        while queue.in_flight < queue.cap:
+            ticket = queue.pop_next()
+            if ticket is None:
+                return
+            queue.in_flight += 1
+            ticket.granted = True
+            ticket.event.set()
+
+    def acquire(self, model: str, cap: Optional[int] = None, session: Optional[str] = None, priority: Optional[Priority] = None, timeout: Optional[float] = None) -> None:
+        """Block until a slot for `model` is granted.
+
+        Raises:
+            LLMOverloaded: If the queue is too deep or the wait times out.
+        """
+        session = session if session is not None else _SESSION.get()
+        priority = priority if priority is not None else _PRIORITY.get()
+        timeout = timeout if timeout is not None else self.queue_timeout
+        limit = self.max_queue if priority is Priority.INTERACTIVE else self.max_queue // 2
+
+        ticket = _Ticket(session, priority)
+        start = time.perf_counter()
+        with self._lock:
+            queue = self._queue_for(model, cap or self.default_concurrency)
+            if queue.depth >= limit:
+                metrics.incr(f"llm.shed.{model}")
+                raise LLMOverloaded(f"LLM queue for {model} is full ({queue.depth} waiting)")
+            queue.push(ticket)
+            self._dispatch(queue)
+
+        if not ticket.event.wait(timeout):
+            with self._lock:
+                if not ticket.granted:
+                    queue.remove(ticket)
+                    metrics.incr(f"llm.shed.{model}")
+                    raise LLMOverloaded(f"Timed out after {timeout:.1f}s waiting for {model}")
+        metrics.observe(f"llm.queue.{model}", time.perf_counter() - start)
+
+    def try_acquire(self, model: str, cap: Optional[int] = None) -> bool:
+        """Take a slot for `model` without waiting; False if none is free or others queue."""
+        with self._lock:
+            queue = self._queue_for(model, cap or self.default_concurrency)
+            if queue.depth or queue.in_flight >= queue.cap:
+                return False
+            queue.in_flight += 1
+            return True
+
+    def hold(self, model_cfg: Dict[str, Any], priority: Optional[Priority] = None, timeout: Optional[float] = None) -> Slot:
+        """Acquire a slot for the model named in `model_cfg`; release it with `Slot.release()`."""
+        model_cfg = model_cfg or {}
+        model = model_cfg.get("model") or "default"
+        cap = model_cfg.get("max_concurrency")
+        self.acquire(model, cap=cap, priority=priority, timeout=timeout)
+        return Slot(self, model, cap)
+
+    def try_hold(self, model: str, cap: Optional[int] = None) -> Optional[Slot]:
+        return Slot(self, model, cap) if self.try_acquire(model, cap) else None
+
+    def release(self, model: str) -> None:
+        with self._lock:
+            queue = self._models[model]
+            queue.in_flight -= 1
+            self._dispatch(queue)
+
+    @contextmanager
+    def slot(self, model_cfg: Dict[str, Any], priority: Optional[Priority] = None, timeout: Optional[float] = None) -> Iterator[None]:
+        """Hold a concurrency slot for the model named in `model_cfg`."""
+        held = self.hold(model_cfg, priority=priority, timeout=timeout)
+        try:
+            yield
+        finally:
+            held.release()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Return in-flight and queued counts per model."""
+        with self._lock:
+            return {
+                model: {
+                    "in_flight": q.in_flight,
+                    "cap": q.cap,
+                    **{f"queued_{p.name.lower()}": q.queued(p) for p in Priority},
+                }
+                for model, q in self._models.items()
+            }
+
+
+_SCHEDULER = LLMScheduler()
+
+
+def get_scheduler() -> LLMScheduler:
+    return _SCHEDULER
+
+
+def set_scheduler(scheduler: LLMScheduler) -> None:
+    """Replace the process-wide scheduler (useful for tests and servers)."""
+    global _SCHEDULER
+    _SCHEDULER = scheduler
+
+
+__all__ = [
+    "Priority", "LLMOverloaded", "LLMScheduler", "Slot",
+    "session_scope", "priority_scope", "current_session",
+    "get_scheduler", "set_scheduler",
+]
@@ -0,0 +1,181 @@
+"""Fast, cached state serialization for prompts.
+
+`llm.mutate._serialize_state` used to rediscover the shape of the state
+by reflection (`to_dict`, `vars`) on every call, and `build_prompt`
+then re-encoded the whole thing to JSON every turn. This module:
+
+  - builds a field plan once per dataclass (field names, and whether
+    `None` values are omitted, as for the strict state classes), and
+    walks objects by plan instead of by reflection,
+  - caches the JSON text of the state and of each sub-state (strict,
+    vibe, and their fields) keyed by object identity, composing the
+    state text from the cached pieces.
+
+`engine.patch.apply_patch` is copy-on-write: the new state shares every
+sub-object the patch did not touch with the old one. A patch touching
+only the clock therefore re-encodes just the clock, and a turn that
+leaves the state unchanged (SHOW_CONFIG, READ_EMAIL with an empty patch)
+reuses the whole text. This relies on states not being modified in
+place once built, which no engine or game code does.
+
+The output is byte-for-byte `json.dumps(_serialize_state(state))`.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Cached JSON fragments kept alive (and so id-stable) at once.
+DEFAULT_MAX_ENTRIES = 256
+# Depth below the state whose objects get their own cache entry
+# (1: strict/vibe, 2: their fields). Deeper objects are encoded inline.
+CACHE_DEPTH = 2
+
+_PRIMITIVES = (str, int, float, bool)
+
+
+@dataclasses.dataclass(frozen=True)
+class FieldPlan:
+    """How to serialize one dataclass: its public fields, in order.
+
+    `omit_none` is set by a class attribute `_omit_none = True` (the
+    strict state classes), matching how their JSON schema treats None.
+    """
+    names: Tuple[str, ...]
+    omit_none: bool
+
+
+_PLANS: Dict[type, Optional[FieldPlan]] = {}
+
+
+def field_plan(cls: type) -> Optional[FieldPlan]:
+    """Return the cached plan for `cls`, or None if it is not a plain dataclass.
+
+    Classes with their own `to_dict` are left to the generic path.
+    """
+    try:
+        return _PLANS[cls]
+    except KeyError:
+        pass
+    plan = None
+    if dataclasses.is_dataclass(cls) and not hasattr(cls, "to_dict"):
+        names = tuple(f.name for f in dataclasses.fields(cls) if not f.name.startswith("_"))
+        plan = FieldPlan(names, omit_none=bool(getattr(cls, "_omit_none", False)))
+    _PLANS[cls] = plan
+    return plan
+
+
+def _generic(obj: Any) -> Any:
+    """The reflective fallback, as `_serialize_state` always did it."""
+    if hasattr(obj, "to_dict") and callable(obj.to_dict):
+        try:
+            return to_data(obj.to_dict())
+        except Exception:
+            pass
+    if hasattr(obj, "__dict__"):
+        try:
+            return {k: to_data(v) for k, v in vars(obj).items() if not k.startswith("_")}
+        except Exception:
+            pass
+    return str(obj)
+
+
+def _plan_items(obj: Any, plan: FieldPlan):
+    for name in plan.names:
+        value = getattr(obj, name)
+        if value is None and plan.omit_none:
+            continue
+        yield name, value
+
+
+def to_data(obj: Any) -> Any:
+    """Return a JSON-compatible copy of `obj`, using field plans for dataclasses."""
+    if obj is None or isinstance(obj, _PRIMITIVES):
+        return obj
+    if isinstance(obj, dict):
+        return {k: to_data(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [to_data(item) for item in obj]
+    plan = field_plan(type(obj))
+    if plan is not None:
+        return {name: to_data(value) for name, value in _plan_items(obj, plan)}
+    return _generic(obj)
+
+
+class StateSerializer:
+    """JSON encoder for states that caches fragments by object identity.
+
+    Args:
+        max_entries: Fragments kept; least recently used are evicted.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        # id -> (object, text); holding the object keeps its id from being reused.
+        self._cache: "OrderedDict[int, Tuple[Any, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, obj: Any) -> Optional[str]:
+        with self._lock:
+            entry = self._cache.get(id(obj))
+            if entry is None or entry[0] is not obj:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(id(obj))
+            self.hits += 1
+            return entry[1]
+
+    def _store(self, obj: Any, text: str) -> None:
+        with self._lock:
+            self._cache[id(obj)] = (obj, text)
+            self._cache.move_to_end(id(obj))
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def _encode(self, obj: Any, depth: int) -> str:
+        if obj is None or isinstance(obj, _PRIMITIVES) or depth > CACHE_DEPTH:
+            return json.dumps(to_data(obj))
+        text = self._lookup(obj)
+        if text is not None:
+            return text
+        plan = field_plan(type(obj))
+        if plan is not None:
+            parts = [f"{json.dumps(name)}: {self._encode(value, depth + 1)}" for name, value in _plan_items(obj, plan)]
+            text = "{" + ", ".join(parts) + "}"
+        else:
+            text = json.dumps(to_data(obj))
+        self._store(obj, text)
+        return text
+
+    def dumps(self, state: Any) -> str:
+        """Return `json.dumps(_serialize_state(state))`, reusing cached fragments."""
+        if field_plan(type(state)) is None:
+            # Not a state dataclass (dicts, test doubles): may be mutated, never cached.
+            return json.dumps(to_data(state) or {} if state is not None else {})
+        return self._encode(state, 0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.misses = 0
+
+
+_SERIALIZER = StateSerializer()
+
+
+def state_json(state: Any) -> str:
+    """Serialize `state` for a prompt with the shared cache."""
+    return _SERIALIZER.dumps(state)
+
+
+def get_serializer() -> StateSerializer:
+    return _SERIALIZER
+
+
+__all__ = ["FieldPlan", "StateSerializer", "field_plan", "get_serializer", "state_json", "to_data"]
@@ -0,0 +1,60 @@
+"""Background LLM summarizer for compacted vibe state.
+
+`engine.compact` folds vibe entries that overflow their limits into a
+rule-based summary. `summarize_vibe` asks a model for a terser, more
+useful memory of the same data, updating the previous `narrative`. It runs at BACKGROUND
+priority off the turn's critical path (see `game.turn.TurnScheduler`)
+and raises `LLMUnavailable` like other LLM helpers, so callers keep the
+rule-based text when the model is busy or down.
+
+The model comes from the `summarizer` entry of `config/models.dev.yaml`,
+falling back to the narrator's.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any, Dict
+
+from .registry import get_registry
+from .scheduler import Priority
+from .tools import call_llm
+from telemetry import metrics
+
+LOG = logging.getLogger(__name__)
+
+# Dropped entries beyond this many characters are cut from the prompt.
+MAX_DROPPED_CHARS = 4000
+MAX_SUMMARY_CHARS = 400
+
+
+def _config() -> tuple[Dict[str, Any], str]:
+    """Model config and prompt from one `llm.registry` snapshot (hot-reloaded)."""
+    snap = get_registry().snapshot()
+    return snap.model("summarizer") or snap.model("narrator"), snap.prompt("summarize").text
+
+
+def build_summary_prompt(summary: Dict[str, Any], dropped: Dict[str, Any], prompt_tpl: str) -> str:
+    dropped_json = json.dumps(dropped, default=str)
+    if len(dropped_json) > MAX_DROPPED_CHARS:
+        dropped_json = dropped_json[:MAX_DROPPED_CHARS] + "..."
+    summary = {k: v for k, v in summary.items() if k != "text"}
+    return prompt_tpl.replace("{summary}", json.dumps(summary, default=str)).replace("{dropped}", dropped_json)
+
+
+def summarize_vibe(summary: Dict[str, Any], dropped: Dict[str, Any]) -> str:
+    """Return a short model-written summary of compacted vibe entries.
+
+    Raises:
+        LLMUnavailable: If the model is overloaded or degraded.
+    """
+    model_cfg, prompt_tpl = _config()
+    prompt = build_summary_prompt(summary, dropped, prompt_tpl)
+    with metrics.timer("summarize.llm"):
+        raw = call_llm(prompt, model_cfg, priority=Priority.BACKGROUND)
+    text = " ".join((raw or "").split())
+    return text[:MAX_SUMMARY_CHARS]
+
+
+__all__ = ["build_summary_prompt", "summarize_vibe"]
@@ -2,65 +2,150 @@
 
 This module centralizes loading model configs, prompt templates, and
 calling the `llm.client` adapter. Keep logic small and robust so other
-modules (like `llm.mutate`) can remain focused.
+modules (like `llm.mutate`) can remain focused. The game's mutator,
+narrator and summarizer read configs and prompts through
+`llm.registry`, which hot-reloads them; the loaders here serve
+one-off reads such as the benchmarks.
 """
 
 from __future__ import annotations
 
 import logging
+import threading
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
+
+from telemetry import metrics
 
 LOG = logging.getLogger(__name__)
 
+# Config and prompts are found relative to the repository, not the CWD.
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CONFIG = REPO_ROOT / "config" / "models.dev.yaml"
+PROMPTS_DIR = REPO_ROOT / "llm" / "prompts"
+
+
+class LLMUnavailable(RuntimeError):
+    """The LLM cannot serve this call right now (overloaded, degraded).
+
+    Callers with a deterministic fallback (stub mutator, rule-based
+    narration) should catch this and degrade instead of failing the turn.
+    """
+
+
+# Parsed files keyed by path, reused while the file's mtime is unchanged.
+_FILE_CACHE: Dict[Path, Tuple[float, Any]] = {}
+_FILE_CACHE_LOCK = threading.Lock()
+
+
+def resolve_path(path: Path) -> Path:
+    """Return `path` as given if it exists, else relative to the repository root."""
+    path = Path(path)
+    if path.is_absolute() or path.exists():
+        return path
+    return REPO_ROOT / path
+
+
+def _cached_read(path: Path, parse) -> Any:
+    """Read and parse `path`, cached until its modification time changes."""
+    mtime = path.stat().st_mtime
+    with _FILE_CACHE_LOCK:
+        entry = _FILE_CACHE.get(path)
+        if entry is not None and entry[0] == mtime:
+            return entry[1]
+    value = parse(path.read_text())
+    with _FILE_CACHE_LOCK:
+        _FILE_CACHE[path] = (mtime, value)
+    return value
+
+
+def _parse_yaml(text: str) -> Any:
+    import yaml  # type: ignore  # lazily: only needed once a config is read
+
+    return yaml.safe_load(text) or {}
+
 
 # No default prompt fallback: prompt file must exist and contain usable text.
 
 
-def load_model_config(config_file: Path = Path("config") / "models.dev.yaml", key: str = "mutator") -> Dict[str, Any]:
+def load_model_config(config_file: Path = DEFAULT_CONFIG, key: str = "mutator") -> Dict[str, Any]:
+    """Return the `key` section of a model config (a fresh copy; {} if unavailable).
+
+    The parsed file is cached; relative paths fall back to the repository root.
+    """
     try:
+        config_file = resolve_path(config_file)
         if not config_file.exists():
             return {}
-        # Import yaml lazily to avoid hard dependency during quick runs.
         try:
-            import yaml  # type: ignore
-        except Exception:
+            cfg = _cached_read(config_file, _parse_yaml)
+        except ImportError:
             LOG.debug("PyYAML not installed, skipping config parse")
             return {}
-
-        cfg = yaml.safe_load(config_file.read_text()) or {}
         if isinstance(cfg, dict):
-            return cfg.get(key, {}) or {}
+            return dict(cfg.get(key, {}) or {})
     except Exception:
         LOG.debug("Failed to load model config %s", config_file, exc_info=True)
     return {}
 
 
 def load_prompt(prompt_name: str = "mutate") -> str:
-    """Load a prompt template from `llm/prompts/{prompt_name}.yml` as plain text.
-    Raises RuntimeError if no prompt file is available or read fails.
+    """Load a prompt template from `llm/prompts/{prompt_name}.txt` as plain text.
+
+    The file is cached until it changes. Raises RuntimeError if no prompt
+    file is available or read fails.
     """
-    base = Path("llm") / "prompts" / prompt_name
-    p = base.with_suffix(".txt")
+    p = PROMPTS_DIR / f"{prompt_name}.txt"
     try:
         if p.exists():
-            return p.read_text().strip()
+            return _cached_read(p, str.strip)
     except Exception:
         LOG.debug("Failed to read prompt %s", p, exc_info=True)
-    raise RuntimeError(f"Prompt template not found for '{prompt_name}' (looked for {base}.yml)")
+    raise RuntimeError(f"Prompt template not found for '{prompt_name}' (looked for {p})")
 
 
-def call_llm(prompt: str, model_cfg: Dict[str, Any]) -> Optional[str]:
+def call_llm(prompt: str, model_cfg: Dict[str, Any], priority: Optional[Any] = None, timeout: Optional[float] = None) -> Optional[str]:
     """Call the configured `llm.client.generate` and return its result.
 
     This function propagates exceptions from the client; callers may
     choose to catch them. It no longer silently returns `None` when the
     client is missing or misconfigured.
+
+    Calls are admitted through `llm.scheduler`; `priority` overrides the
+    priority of the calling context. The call is bounded by `timeout`,
+    the model's `timeout_s` and any `llm.resilience.deadline_scope`
+    budget, and may be hedged or refused by the model's circuit breaker.
+    Raises `LLMUnavailable` subclasses when shed, timed out or degraded.
+    The client call itself may be recorded or replayed (`llm.recording`).
     """
     import llm.client as client  # type: ignore
+    from llm import recording, resilience
+    from llm.scheduler import get_scheduler
 
     # Expect `generate(prompt, model_cfg)` to be present.
     if not hasattr(client, "generate"):
         raise RuntimeError("llm.client does not implement 'generate'")
 
-    return client.generate(prompt, model_cfg)
+    model = (model_cfg or {}).get("model") or "default"
+    breaker = resilience.breaker_for(model_cfg)
+    breaker.check()  # fail fast without queueing while the circuit is open
+    slot = get_scheduler().hold(model_cfg, priority=priority, timeout=resilience.call_timeout(model_cfg, timeout))
+    # The half-open probe is only taken once the call holds a slot, and
+    # is given back if the call never reaches the model (deadline spent),
+    # so a shed or expired probe cannot leave the circuit stuck.
+    probe = False
+    invoked = False
+    try:
+        probe = breaker.allow()
+        call_timeout = resilience.call_timeout(model_cfg, timeout)
+        metrics.incr(f"llm.calls.{model}")
+        with metrics.timer(f"llm.call.{model}"):
+            invoked = True
+            # `invoke` owns the slot and releases it when the request
+            # returns, which may be after a deadline already gave up on it.
+            return resilience.invoke(lambda t: recording.transport(client.generate, prompt, model_cfg, t), model_cfg, call_timeout, slot)
+    finally:
+        if not invoked:
+            slot.release()
+            if probe:
+                breaker.release()
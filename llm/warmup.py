@@ -0,0 +1,194 @@
+"""Model warmup and keep-alive at startup.
+
+The first call to a model that the server has not loaded yet pays the
+load time (several seconds for an 8B model, the outliers at the top of
+`bench_results.json`). `Warmup` moves that cost off the first turn:
+`start()` sends each distinct configured model one tiny request in a
+background thread, concurrently with the rest of startup, so by the time
+the player has typed their first command the models are resident.
+
+Each warmup request:
+
+- carries `keep_alive` (the role's own, else `DEFAULT_KEEP_ALIVE`) so the
+  server keeps the model loaded between turns,
+- asks for a single token (`num_predict: 1`),
+- sends the static prefix of the role's prompt template (everything
+  before the first placeholder) after the usual system prompt, so the
+  server's prompt cache already holds the shared prefix of real calls.
+
+Warmup never raises: a model that cannot be reached is reported as
+`failed` and the game falls back as usual on its first real call.
+Readiness is logged, timed into `llm.warmup.<model>` metrics and
+available from `status()`; `wait()` blocks until every model is done.
+Replay mode (`llm.recording`) never contacts a model, so it skips
+warmup.
+
+Usage:
+    warmup = Warmup.from_config().start()
+    ...  # other startup work
+    warmup.wait(timeout=5)
+    warmup.status()  # {"llama3.1:8b": {"state": "ready", "seconds": 4.1, ...}}
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from telemetry import metrics
+
+from .registry import compile_template, get_registry
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_KEEP_ALIVE = "30m"
+DEFAULT_TIMEOUT = 60.0
+
+# Roles warmed at startup, most latency-critical first, with the prompt
+# template whose prefix is pre-filled (None: system prompt only).
+ROLES = (
+    ("mutator", "mutate"),
+    ("narrator", None),
+    ("summarizer", "summarize"),
+)
+
+PENDING = "pending"
+READY = "ready"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+def prompt_prefix(template: str) -> str:
+    """The static part of a prompt template, up to its first placeholder."""
+    return compile_template(template).prefix
+
+
+@dataclass
+class WarmupTarget:
+    """One model to warm: the config sent and the prompt prefix to pre-fill."""
+
+    role: str
+    model_cfg: Dict[str, Any]
+    prefix: str = ""
+    state: str = PENDING
+    seconds: Optional[float] = None
+    error: Optional[str] = None
+    done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def model(self) -> str:
+        return self.model_cfg.get("model") or self.model_cfg.get("name") or "default"
+
+
+def _endpoint(cfg: Dict[str, Any]) -> tuple:
+    return (cfg.get("model") or cfg.get("name"), cfg.get("transport"), cfg.get("base_url"))
+
+
+def targets(roles=ROLES, config: Optional[Callable[[str], Dict[str, Any]]] = None, prompt: Optional[Callable[[str], str]] = None) -> List[WarmupTarget]:
+    """One target per distinct model across `roles` and mutator routing candidates."""
+    snap = get_registry().snapshot() if config is None or prompt is None else None
+    config = config or snap.model
+    prompt = prompt or (lambda name: snap.prompt(name).text)
+    found: Dict[tuple, WarmupTarget] = {}
+    for role, template in roles:
+        cfg = config(role) or {}
+        if not (cfg.get("model") or cfg.get("name")):
+            continue
+        prefix = ""
+        if template:
+            try:
+                prefix = prompt_prefix(prompt(template))
+            except RuntimeError:
+                LOG.debug("No %s prompt to pre-fill", template, exc_info=True)
+        base = {k: v for k, v in cfg.items() if k != "candidates"}
+        for candidate in [base] + [{**base, **c} for c in cfg.get("candidates") or ()]:
+            found.setdefault(_endpoint(candidate), WarmupTarget(role, candidate, prefix))
+    return list(found.values())
+
+
+class Warmup:
+    """Warm `targets` concurrently in daemon threads.
+
+    Args:
+        targets: Models to warm (see `targets()`).
+        keep_alive: Keep-alive sent for models whose config sets none.
+        timeout: Per-request timeout in seconds.
+        generate: Client call, `generate(prompt, model_cfg, timeout)`.
+    """
+
+    def __init__(self, targets: List[WarmupTarget], keep_alive: Any = DEFAULT_KEEP_ALIVE, timeout: float = DEFAULT_TIMEOUT, generate: Optional[Callable[..., str]] = None):
+        self.targets = targets
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self._generate = generate
+        self._threads: List[threading.Thread] = []
+
+    @classmethod
+    def from_config(cls, **kwargs: Any) -> "Warmup":
+        return cls(targets(), **kwargs)
+
+    def start(self) -> "Warmup":
+        from llm import recording
+
+        transport = recording.active()
+        if transport is not None and transport.mode == recording.REPLAY:
+            for target in self.targets:
+                self._finish(target, SKIPPED)
+            return self
+        for target in self.targets:
+            thread = threading.Thread(target=self._warm, args=(target,), name=f"warmup-{target.model}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def _warm(self, target: WarmupTarget) -> None:
+        generate = self._generate
+        if generate is None:
+            from llm.client import generate
+        cfg = {
+            **target.model_cfg,
+            "keep_alive": target.model_cfg.get("keep_alive", self.keep_alive),
+            "num_predict": 1,
+        }
+        cfg.pop("format", None)
+        start = time.perf_counter()
+        try:
+            generate(target.prefix or "ping", cfg, self.timeout)
+        except Exception as exc:
+            LOG.warning("Warmup of %s (%s) failed: %s", target.model, target.role, exc)
+            metrics.incr("llm.warmup.failures")
+            self._finish(target, FAILED, time.perf_counter() - start, str(exc))
+            return
+        seconds = time.perf_counter() - start
+        metrics.observe(f"llm.warmup.{target.model}", seconds)
+        LOG.info("Model %s (%s) warm after %.2fs", target.model, target.role, seconds)
+        self._finish(target, READY, seconds)
+
+    @staticmethod
+    def _finish(target: WarmupTarget, state: str, seconds: Optional[float] = None, error: Optional[str] = None) -> None:
+        target.state = state
+        target.seconds = seconds
+        target.error = error
+        target.done.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until every target is done or `timeout` passes; True if all finished."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for target in self.targets:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not target.done.wait(remaining):
+                return False
+        return True
+
+    def ready(self, model: Optional[str] = None) -> bool:
+        """Whether `model` (default: every target) finished warming successfully."""
+        return all(t.state == READY for t in self.targets if model is None or t.model == model)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {t.model: {"role": t.role, "state": t.state, "seconds": t.seconds, "error": t.error} for t in self.targets}
+
+
+__all__ = ["DEFAULT_KEEP_ALIVE", "ROLES", "Warmup", "WarmupTarget", "prompt_prefix", "targets"]
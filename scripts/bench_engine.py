@@ -0,0 +1,217 @@
+"""Offline microbenchmarks for engine and parser hot paths.
+
+Unlike `bench_mutator.py` and `bench_narrator.py` this needs no LLM. It
+times `apply_patch`, `copy_state`, `state_to_json`/`state_from_json`,
+`parse_intent`, `_extract_json`, `_serialize_state`, the cached prompt
+serializer (`state_json`: cold, and after a clock-only patch),
+`state_hash` after a clock-only patch and
+`resolve_intent_placeholders` over parametrized state sizes.
+
+Timings are divided by a fixed pure-Python calibration loop, so the
+stored baseline is comparable across machines of different speed.
+
+Usage:
+    python -m scripts.bench_engine                       # print timings
+    python -m scripts.bench_engine --check               # fail on regressions
+    python -m scripts.bench_engine --update-baseline     # rewrite baseline
+    python -m scripts.bench_engine --sizes 10 10000 --check --tolerance 0.5
+
+`--check` exits with status 1 when any case is slower than its baseline
+by more than `--tolerance` (default 30%). Cases the baseline does not
+cover are listed but not checked; add a case, then `--update-baseline`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from engine.hashing import state_hash
+from engine.patch import apply_patch
+from engine.state import Email, copy_state, create_initial_state, state_from_json, state_to_json
+from game.commands import Intent, IntentType, parse_intent
+from llm.mutate import _extract_json, _serialize_state, resolve_intent_placeholders
+from llm.serialize import StateSerializer
+from llm.tools import REPO_ROOT
+
+DEFAULT_BASELINE = REPO_ROOT / "bench_engine_baseline.json"
+DEFAULT_SIZES = [10, 1000]
+DEFAULT_TOLERANCE = 0.30
+
+COMMANDS = [
+    "show config",
+    "read email",
+    "set clock +02:00",
+    "set system time to utc-3",
+    "send email to ops@corp: please restart the service",
+    "email admin that the clock is fixed",
+    "dance wildly",
+]
+
+
+def build_state(size: int):
+    """Return a state with `size` strict emails, vibe emails and notes."""
+    state = create_initial_state()
+    state.strict.emails = [Email(recipient=f"user{i}@corp", sent_at="09:00") for i in range(size)]
+    state.vibe.emails = [{"recipient": f"user{i}@corp", "body": "status report " * 4, "sent_at": "09:00"} for i in range(size)]
+    state.vibe.notes = [f"note {i}" for i in range(size)]
+    state.vibe.system_config = {f"key{i}": {"value": i, "enabled": True} for i in range(size)}
+    return state
+
+
+def build_cases(size: int) -> List[Tuple[str, Callable[[], Any]]]:
+    state = build_state(size)
+    state_json = state_to_json(state)
+    patch = {
+        "strict": {
+            "clock": {"time": "09:30"},
+            "emails": [{"recipient": e.recipient, "sent_at": e.sent_at} for e in state.strict.emails] + [{"recipient": "ops@corp", "sent_at": "09:30"}],
+        },
+        "vibe": {"notes": state.vibe.notes + ["sent report"]},
+    }
+    llm_text = "Sure! Here is the patch:\n```json\n" + json.dumps(patch) + "\n```\nLet me know."
+    intent = Intent(IntentType.SEND_EMAIL, {"recipient": "ops@corp", "body": "hi"}, 0.9)
+    placeholder_patch = {
+        "strict": {"emails": [{"recipient": "${intent.type}", "sent_at": "09:00"}] * size},
+        "vibe": {"notes": ["${intent.confidence}"] * size},
+    }
+    commands = COMMANDS * max(1, size // len(COMMANDS))
+    serializer = StateSerializer()
+    clock_patch = {"strict": {"clock": {"time": "10:15"}}}
+
+    def state_json_clock_patch():
+        # Only the clock changed, so every other fragment is a cache hit.
+        serializer.dumps(state)
+        serializer.dumps(apply_patch(state, clock_patch).state)
+
+    def state_hash_clock_patch():
+        state_hash(state)
+        state_hash(apply_patch(state, clock_patch).state)
+
+    return [
+        (f"apply_patch[{size}]", lambda: apply_patch(state, patch)),
+        (f"copy_state[{size}]", lambda: copy_state(state)),
+        (f"state_to_json[{size}]", lambda: state_to_json(state)),
+        (f"state_from_json[{size}]", lambda: state_from_json(state_json)),
+        (f"parse_intent[{size}]", lambda: [parse_intent(c) for c in commands]),
+        (f"_extract_json[{size}]", lambda: _extract_json(llm_text)),
+        (f"_serialize_state[{size}]", lambda: _serialize_state(state)),
+        (f"state_json.cold[{size}]", lambda: StateSerializer().dumps(state)),
+        (f"state_json.clock_patch[{size}]", state_json_clock_patch),
+        (f"state_hash.clock_patch[{size}]", state_hash_clock_patch),
+        (f"resolve_intent_placeholders[{size}]", lambda: resolve_intent_placeholders(placeholder_patch, intent)),
+    ]
+
+
+def calibrate() -> float:
+    """Seconds for a fixed pure-Python workload; the unit for normalized timings."""
+    def work():
+        total = 0
+        for i in range(20000):
+            total += i * i % 7
+        return total
+    return time_call(work, min_time=0.2)
+
+
+def time_call(fn: Callable[[], Any], min_time: float = 0.1, repeat: int = 7) -> float:
+    """Return the best mean seconds per call over `repeat` batches of >= `min_time`."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / repeat or number >= 1 << 20:
+            break
+        number *= 2
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def run_suite(sizes: List[int], min_time: float = 0.1, only: List[str] | None = None, quiet: bool = False) -> Dict[str, Any]:
+    unit = calibrate()
+    cases: Dict[str, Dict[str, float]] = {}
+    for size in sizes:
+        for name, fn in build_cases(size):
+            if only is not None and name not in only:
+                continue
+            seconds = time_call(fn, min_time=min_time)
+            cases[name] = {"seconds": seconds, "normalized": seconds / unit}
+            if not quiet:
+                print(f"{name:40s} {seconds * 1e6:12.1f} us  ({seconds / unit:10.3f} units)")
+    return {"calibration_seconds": unit, "cases": cases}
+
+
+def find_regressions(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Return descriptions of cases slower than baseline by more than `tolerance`."""
+    regressions = []
+    for name, current in results["cases"].items():
+        base = baseline.get("cases", {}).get(name)
+        if not base:
+            continue
+        ratio = current["normalized"] / base["normalized"] if base["normalized"] else 1.0
+        if ratio > 1 + tolerance:
+            regressions.append(f"{name}: {ratio:.2f}x baseline (tolerance {1 + tolerance:.2f}x)")
+    return regressions
+
+
+def missing_from_baseline(results: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Return the cases `find_regressions` cannot check because the baseline lacks them."""
+    known = baseline.get("cases", {})
+    return sorted(name for name in results["cases"] if not known.get(name))
+
+
+def main(argv: List[str] | None = None) -> int:
+    p = argparse.ArgumentParser(description="Offline engine/parser microbenchmarks")
+    p.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    p.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    p.add_argument("--check", action="store_true", help="exit 1 on regressions against the baseline")
+    p.add_argument("--update-baseline", action="store_true")
+    p.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed slowdown fraction")
+    p.add_argument("--min-time", type=float, default=0.1, help="seconds to spend timing each case")
+    args = p.parse_args(argv)
+
+    results = run_suite(args.sizes, args.min_time)
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if args.check:
+        if not args.baseline.exists():
+            print(f"No baseline at {args.baseline}; run with --update-baseline first")
+            return 1
+        baseline = json.loads(args.baseline.read_text())
+        missing = missing_from_baseline(results, baseline)
+        if missing:
+            print(f"\nNot in {args.baseline} (unchecked): " + ", ".join(missing))
+        regressions = find_regressions(results, baseline, args.tolerance)
+        if regressions:
+            # Re-time flagged cases once to filter out scheduling noise.
+            flagged = [r.split(":", 1)[0] for r in regressions]
+            retry = run_suite(args.sizes, args.min_time, only=flagged, quiet=True)
+            for name, current in retry["cases"].items():
+                if current["normalized"] < results["cases"][name]["normalized"]:
+                    results["cases"][name] = current
+            regressions = find_regressions(results, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for r in regressions:
+                print(f" - {r}")
+            return 1
+        print("\nNo regressions beyond tolerance.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""Compare candidate models per role on latency, quality and cost.
+
+Runs the mutator scenarios from `bench_mutator.py` and the narrator
+scenarios from `bench_narrator.py` against each candidate model and
+prints one table row per (model, role, scenario):
+
+- cost: the relative `cost` from the model config (or `--models NAME=COST`),
+- latency p50/p90 in seconds (narrator rows also show TTFT),
+- quality: apply success rate for mutator patches (with valid-JSON and
+  expected-field rates alongside); for narration, the share of runs
+  that produced output without error.
+
+It then recommends, per role, the cheapest model whose worst-scenario
+quality is at or above `--threshold`, so roles can move to smaller
+models where that is safe.
+
+Usage:
+    python -m scripts.bench_models --runs 10
+    python -m scripts.bench_models --models qwen2.5:1.5b=1.5 llama3.1:8b=8 --roles mutator --json models.json
+
+Without `--models` the candidates are the distinct models configured in
+`config/models.dev.yaml`, including routing `candidates`. Each role
+keeps its configured parameters (temperature etc.); only the model
+fields are swapped.
+
+Important: this script does not mock the LLM. It may be slow or require
+an LLM client to be configured (see `llm.client`).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from engine.state import create_initial_state
+from llm.scheduler import LLMScheduler, set_scheduler
+from llm.tools import load_model_config
+from scripts.bench_mutator import _run_once, build_intent, latency_summary, patch_quality
+from scripts.bench_narrator import DEFAULT_INTENTS, run_benchmark as run_narrator_benchmark
+
+DEFAULT_CONFIG = Path("config") / "models.dev.yaml"
+CONFIG_ROLES = ("intent", "mutator", "narrator")
+ROLES = ("mutator", "narrator")
+MUTATOR_SCENARIOS = ("set_clock", "send_email")
+DEFAULT_THRESHOLD = 0.9
+
+
+def parse_model_spec(spec: str) -> Dict[str, Any]:
+    """Parse `NAME` or `NAME=COST` into a candidate config."""
+    name, sep, cost = spec.rpartition("=")
+    if not sep:
+        return {"model": spec}
+    return {"model": name, "cost": float(cost)}
+
+
+def load_candidates(config: Path = DEFAULT_CONFIG, models: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Return candidate model configs: `models` if given, else every configured model."""
+    if models:
+        return [parse_model_spec(m) for m in models]
+    candidates: Dict[str, Dict[str, Any]] = {}
+    for role in CONFIG_ROLES:
+        role_cfg = load_model_config(config, key=role)
+        for cfg in [role_cfg] + list(role_cfg.get("candidates") or []):
+            name = cfg.get("model")
+            if name and name not in candidates:
+                candidates[name] = {k: cfg[k] for k in ("model", "cost", "transport", "base_url") if k in cfg}
+    return list(candidates.values())
+
+
+def role_config(config: Path, role: str, candidate: Dict[str, Any]) -> Dict[str, Any]:
+    return {**load_model_config(config, key=role), **candidate}
+
+
+def bench_mutator_model(model_cfg: Dict[str, Any], runs: int, concurrency: int = 1) -> List[Dict[str, Any]]:
+    rows = []
+    base_state = create_initial_state()
+    for scenario in MUTATOR_SCENARIOS:
+        intent, expected = build_intent(scenario)
+        set_scheduler(LLMScheduler(default_concurrency=concurrency, max_queue=max(64, runs * 2), queue_timeout=None))
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(lambda i: _run_once(i, intent, base_state, model_cfg), range(1, runs + 1)))
+        wall_time = time.perf_counter() - start
+        quality = patch_quality(results, expected)
+        latency = latency_summary([r["duration"] for r in results if not r["error"]])
+        rows.append({
+            "model": model_cfg.get("model"),
+            "cost": model_cfg.get("cost"),
+            "role": "mutator",
+            "scenario": scenario,
+            "runs": runs,
+            "p50": latency["p50"],
+            "p90": latency["p90"],
+            "ttft_p50": None,
+            "requests_per_sec": runs / wall_time if wall_time > 0 else 0.0,
+            "error_rate": sum(1 for r in results if r["error"]) / runs if runs else 0.0,
+            "quality": quality["apply_success_rate"],
+            "valid_json_rate": quality["valid_json_rate"],
+            "mutated_expected_rate": quality["mutated_expected_rate"],
+        })
+    return rows
+
+
+def bench_narrator_model(model_cfg: Dict[str, Any], runs: int, concurrency: int = 1, stream: bool = False) -> List[Dict[str, Any]]:
+    report = run_narrator_benchmark(model_cfg, DEFAULT_INTENTS, runs, concurrency, stream, quiet=True)
+    rows = []
+    for scenario, s in report["scenarios"].items():
+        rows.append({
+            "model": model_cfg.get("model"),
+            "cost": model_cfg.get("cost"),
+            "role": "narrator",
+            "scenario": scenario,
+            "runs": s["runs"],
+            "p50": s["duration"].get("p50"),
+            "p90": s["duration"].get("p90"),
+            "ttft_p50": s["ttft"].get("p50"),
+            "requests_per_sec": None,
+            "error_rate": s["error_rate"],
+            "quality": 1.0 - s["error_rate"],
+            "valid_json_rate": None,
+            "mutated_expected_rate": None,
+        })
+    return rows
+
+
+def recommend(rows: List[Dict[str, Any]], threshold: float = DEFAULT_THRESHOLD) -> Dict[str, Optional[str]]:
+    """Pick, per role, the cheapest model whose worst scenario meets `threshold`.
+
+    Models without a cost sort last; ties go to the lower median latency.
+    """
+    picks: Dict[str, Optional[str]] = {}
+    for role in sorted({r["role"] for r in rows}):
+        by_model: Dict[str, List[Dict[str, Any]]] = {}
+        for r in rows:
+            if r["role"] == role:
+                by_model.setdefault(r["model"], []).append(r)
+        eligible = []
+        for model, model_rows in by_model.items():
+            if min(r["quality"] for r in model_rows) < threshold:
+                continue
+            cost = model_rows[0]["cost"]
+            p50s = [r["p50"] for r in model_rows if r["p50"] is not None]
+            eligible.append((math.inf if cost is None else cost, max(p50s) if p50s else math.inf, model))
+        picks[role] = min(eligible)[2] if eligible else None
+    return picks
+
+
+def _cell(value: Any, spec: str) -> str:
+    return format(value, spec) if value is not None else format("-", ">" + spec.split(".")[0])
+
+
+def print_table(rows: List[Dict[str, Any]]) -> None:
+    print(f"{'model':20s} {'cost':>6s} {'role':9s} {'scenario':22s} {'p50':>7s} {'p90':>7s} {'ttft':>7s} {'quality':>8s} {'json':>6s} {'err':>6s}")
+    for r in rows:
+        print(f"{str(r['model']):20s} {_cell(r['cost'], '6.1f')} {r['role']:9s} {r['scenario']:22s} "
+              f"{_cell(r['p50'], '7.2f')} {_cell(r['p90'], '7.2f')} {_cell(r['ttft_p50'], '7.2f')} "
+              f"{r['quality'] * 100:7.1f}% {_cell(r['valid_json_rate'] * 100 if r['valid_json_rate'] is not None else None, '5.1f')} "
+              f"{r['error_rate'] * 100:5.1f}%")
+
+
+def run_matrix(candidates: List[Dict[str, Any]], roles: List[str], runs: int, concurrency: int = 1, stream: bool = False, config: Path = DEFAULT_CONFIG) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    for candidate in candidates:
+        for role in roles:
+            cfg = role_config(config, role, candidate)
+            if role == "mutator":
+                rows.extend(bench_mutator_model(cfg, runs, concurrency))
+            else:
+                rows.extend(bench_narrator_model(cfg, runs, concurrency, stream))
+    return rows
+
+
+def main(argv: List[str] | None = None) -> int:
+    p = argparse.ArgumentParser(description="Per-role model latency/quality/cost matrix")
+    p.add_argument("--config", type=Path, default=DEFAULT_CONFIG)
+    p.add_argument("--models", nargs="+", default=None, help="candidate models as NAME or NAME=COST")
+    p.add_argument("--roles", nargs="+", choices=ROLES, default=list(ROLES))
+    p.add_argument("--runs", type=int, default=5, help="runs per scenario")
+    p.add_argument("--concurrency", type=int, default=1)
+    p.add_argument("--stream", action="store_true", help="stream narration to measure TTFT")
+    p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="minimum quality for a recommendation")
+    p.add_argument("--transport", default=None)
+    p.add_argument("--base-url", default=None)
+    p.add_argument("--json", type=Path, default=None, help="write rows and recommendations as JSON")
+    args = p.parse_args(argv)
+
+    candidates = load_candidates(args.config, args.models)
+    for candidate in candidates:
+        if args.transport:
+            candidate["transport"] = args.transport
+        if args.base_url:
+            candidate["base_url"] = args.base_url
+
+    rows = run_matrix(candidates, args.roles, args.runs, args.concurrency, args.stream, args.config)
+    picks = recommend(rows, args.threshold)
+    print_table(rows)
+    print(f"\nRecommended (quality >= {args.threshold * 100:.0f}% in every scenario, cheapest first):")
+    for role, model in picks.items():
+        print(f"  {role}: {model or 'no model meets the threshold'}")
+    if args.json:
+        args.json.write_text(json.dumps({"rows": rows, "recommended": picks, "threshold": args.threshold}, indent=2))
+        print(f"Results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
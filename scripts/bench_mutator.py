@@ -6,7 +6,20 @@ and `engine.patch.apply_patch` repeatedly and print a human-readable
 summary of outcomes.
 
 Usage:
-    python scripts/bench_mutator.py --intent set_clock --runs 20 --dump out.json
+    python -m scripts.bench_mutator --intent set_clock --runs 20 --dump out.json
+    python -m scripts.bench_mutator --intent send_email --runs 200 --concurrency 8 \
+        --warmup 5 --baseline send_email_bench_results.json
+
+With `--concurrency N` runs are issued from N threads at once; the
+summary then reports latency percentiles (p50/p90/p99), requests/sec
+and error rate, which is what sizing a model server for player load
+needs. `--baseline` compares against a previous `--dump` file such as
+`bench_results.json`.
+
+`--import-dump FILE --tape OUT` converts a previous `--dump` into an
+`llm.recording` tape, so runs can be replayed offline with
+`SPARROW_LLM_MODE=replay SPARROW_LLM_TAPE=OUT`. The tape is keyed by
+`--model`, by default the model the mutator routes the intent to first.
 
 Important: this script does not mock the LLM. It may be slow or require
 an LLM client to be configured (see `llm.client`).
@@ -17,6 +30,7 @@ from __future__ import annotations
 import argparse
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from dataclasses import asdict
 from pathlib import Path
@@ -25,8 +39,13 @@ from typing import Any, Dict, List
 
 from engine.state import create_initial_state, state_to_json, copy_state
 from engine.patch import apply_patch
-from llm.mutate import generate_patch
+import llm.mutate as mutate
+from llm.mutate import build_prompt, generate_patch
+from llm.recording import import_bench_results
+from llm.routing import ModelRouter
 from game.commands import Intent, IntentType
+from llm.scheduler import LLMScheduler, set_scheduler
+from telemetry.metrics import percentile
 
 # these should build proper intents using Intent
 
@@ -37,7 +56,8 @@ def build_intent_set_clock(time_str: str = "09:00", timezone: str = "UTC") -> In
 def build_intent_send_email(recipient: str = "alice@example.com", sent_at: str = "08:30") -> Intent:
     return Intent(type=IntentType.SEND_EMAIL, params={"recipient": recipient, "sent_at": sent_at}, confidence=0.9)
 
-def summarize_runs(results: List[Dict[str, Any]], expected_strict_fields: List[str]) -> None:
+def patch_quality(results: List[Dict[str, Any]], expected_strict_fields: List[str]) -> Dict[str, Any]:
+    """Count patch validity and apply outcomes over benchmark runs."""
     total = len(results)
     valid_json_count = sum(1 for r in results if r["raw_patch"])
     applied_success = sum(1 for r in results if r["apply_result"] and r["apply_result"].success)
@@ -60,15 +80,38 @@ def summarize_runs(results: List[Dict[str, Any]], expected_strict_fields: List[s
         if unexpected:
             unexpected_fields_counts += 1
 
+    def rate(count: int) -> float:
+        return count / total if total else 0.0
+
+    return {
+        "runs": total,
+        "valid_json": valid_json_count,
+        "applied": applied_success,
+        "strict_valid": strict_valid_count,
+        "mutated_expected": mutated_expected,
+        "unexpected_fields": unexpected_fields_counts,
+        "valid_json_rate": rate(valid_json_count),
+        "apply_success_rate": rate(applied_success),
+        "strict_valid_rate": rate(strict_valid_count),
+        "mutated_expected_rate": rate(mutated_expected),
+        "unexpected_fields_rate": rate(unexpected_fields_counts),
+        "avg_warnings": mean(warnings_counts) if warnings_counts else 0.0,
+    }
+
+
+def summarize_runs(results: List[Dict[str, Any]], expected_strict_fields: List[str]) -> Dict[str, Any]:
+    q = patch_quality(results, expected_strict_fields)
+    total = q["runs"]
+
     print("\nBench Mutator Summary")
     print("---------------------")
     print(f"Total runs: {total}")
-    print(f"Valid JSON (non-empty patch): {valid_json_count} ({valid_json_count/total*100:.1f}%)")
-    print(f"Apply success (no strict validation errors): {applied_success} ({applied_success/total*100:.1f}%)")
-    print(f"Strict-valid runs (no strict errors reported): {strict_valid_count} ({strict_valid_count/total*100:.1f}%)")
-    print(f"Mutated expected strict fields: {mutated_expected} ({mutated_expected/total*100:.1f}%)")
-    print(f"Runs with unexpected strict fields: {unexpected_fields_counts} ({unexpected_fields_counts/total*100:.1f}%)")
-    print(f"Average warnings per run: {mean(warnings_counts) if warnings_counts else 0:.2f}")
+    print(f"Valid JSON (non-empty patch): {q['valid_json']} ({q['valid_json_rate']*100:.1f}%)")
+    print(f"Apply success (no strict validation errors): {q['applied']} ({q['apply_success_rate']*100:.1f}%)")
+    print(f"Strict-valid runs (no strict errors reported): {q['strict_valid']} ({q['strict_valid_rate']*100:.1f}%)")
+    print(f"Mutated expected strict fields: {q['mutated_expected']} ({q['mutated_expected_rate']*100:.1f}%)")
+    print(f"Runs with unexpected strict fields: {q['unexpected_fields']} ({q['unexpected_fields_rate']*100:.1f}%)")
+    print(f"Average warnings per run: {q['avg_warnings']:.2f}")
 
     print("\nSample outputs (first 5):")
     for i, r in enumerate(results[:5], 1):
@@ -88,47 +131,145 @@ def summarize_runs(results: List[Dict[str, Any]], expected_strict_fields: List[s
                     print(f" - {w}")
         else:
             print("No apply result (empty or invalid patch)")
+    return q
+
+
+def latency_summary(durations: List[float]) -> Dict[str, float]:
+    return {
+        "mean": mean(durations) if durations else 0.0,
+        "p50": percentile(durations, 50),
+        "p90": percentile(durations, 90),
+        "p99": percentile(durations, 99),
+        "max": max(durations) if durations else 0.0,
+    }
+
+
+def summarize_load(results: List[Dict[str, Any]], wall_time: float, concurrency: int) -> Dict[str, Any]:
+    total = len(results)
+    errors = sum(1 for r in results if r.get("error"))
+    applied = sum(1 for r in results if r["apply_result"] and r["apply_result"].success)
+    summary = {
+        "runs": total,
+        "concurrency": concurrency,
+        "wall_time": wall_time,
+        "requests_per_sec": total / wall_time if wall_time > 0 else 0.0,
+        "error_rate": errors / total if total else 0.0,
+        "apply_success_rate": applied / total if total else 0.0,
+        "latency": latency_summary([r["duration"] for r in results if not r.get("error")]),
+    }
+    lat = summary["latency"]
+    print("\nLoad Summary")
+    print("------------")
+    print(f"Concurrency: {concurrency}, wall time: {wall_time:.2f}s")
+    print(f"Throughput: {summary['requests_per_sec']:.2f} req/s")
+    print(f"Error rate: {summary['error_rate']*100:.1f}%")
+    print(f"Latency: mean={lat['mean']:.3f}s p50={lat['p50']:.3f}s p90={lat['p90']:.3f}s p99={lat['p99']:.3f}s max={lat['max']:.3f}s")
+    return summary
+
+
+def load_baseline(path: Path) -> Dict[str, Any]:
+    """Load a baseline: a previous `--dump` list or a saved load summary."""
+    data = json.loads(path.read_text())
+    if isinstance(data, dict) and "latency" in data:
+        return data
+    runs = data if isinstance(data, list) else []
+    durations = [r["duration"] for r in runs if r.get("duration") is not None and not r.get("error")]
+    applied = sum(1 for r in runs if (r.get("apply_result") or {}).get("success"))
+    return {
+        "runs": len(runs),
+        "error_rate": sum(1 for r in runs if r.get("error")) / len(runs) if runs else 0.0,
+        "apply_success_rate": applied / len(runs) if runs else 0.0,
+        "latency": latency_summary(durations),
+    }
+
 
+def compare_to_baseline(summary: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    print("\nBaseline Comparison")
+    print("-------------------")
+    for key in ("p50", "p90", "p99", "mean"):
+        cur, base = summary["latency"][key], baseline["latency"][key]
+        delta = (cur - base) / base * 100 if base else 0.0
+        print(f"{key}: {cur:.3f}s vs {base:.3f}s ({delta:+.1f}%)")
+    for key in ("apply_success_rate", "error_rate"):
+        print(f"{key}: {summary[key]*100:.1f}% vs {baseline[key]*100:.1f}%")
 
-def run_benchmark(intent_name: str, runs: int, dump: Path | None) -> None:
+
+def _run_once(index: int, intent: Intent, base_state, model_cfg: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    state = deepcopy(base_state)
+    error = None
+    patch: Dict[str, Any] = {}
+    start_time = time.perf_counter()
+    try:
+        patch = generate_patch(intent, state, level_context={}, model_cfg=model_cfg)
+    except Exception as exc:  # defensive: count, never crash the harness
+        error = f"{type(exc).__name__}: {exc}"
+    duration = time.perf_counter() - start_time
+
+    apply_result = None
+    try:
+        if patch:
+            apply_result = apply_patch(state, patch)
+    except Exception as exc:  # defensive: never crash the harness
+        print(f"Warning: apply_patch raised exception on run {index}: {exc}")
+
+    return {
+        "index": index,
+        "duration": duration,
+        "raw_patch": patch,
+        "apply_result": apply_result,
+        "error": error,
+    }
+
+
+def build_intent(intent_name: str) -> tuple[Intent, List[str]]:
+    """Return the benchmark intent and its expected strict fields."""
+    if intent_name == "send_email":
+        return build_intent_send_email(), ["emails"]
+    # default: use set_clock
+    return build_intent_set_clock(), ["clock"]
+
+
+def first_routed_model(model_cfg: Dict[str, Any], intent: Intent) -> str | None:
+    """The model the mutator asks first for `intent` (the cheapest candidate when routed)."""
+    router = ModelRouter.from_config(model_cfg)
+    if router is None:
+        return model_cfg.get("model")
+    return router.plan(intent.type.name)[0].get("model")
+
+
+def run_benchmark(intent_name: str, runs: int, dump: Path | None, concurrency: int = 1, warmup: int = 0, baseline: Path | None = None, summary_out: Path | None = None) -> None:
     base_state = create_initial_state()
     results: List[Dict[str, Any]] = []
 
-    if intent_name == "set_clock":
-        intent = build_intent_set_clock()
-        expected = ["clock"]
-    elif intent_name == "send_email":
-        intent = build_intent_send_email()
-        expected = ["emails"]
-    else:
-        # default: use set_clock
-        intent = build_intent_set_clock()
-        expected = ["clock"]
-
-    print(f"Running mutator benchmark: intent={intent_name}, runs={runs}")
-    for i in range(1, runs + 1):
-        state = deepcopy(base_state)
-        start_time = time.time()
-        patch = generate_patch(intent, state, level_context={})
-        duration = time.time() - start_time
-
-        apply_result = None
-        try:
-            if patch:
-                apply_result = apply_patch(state, patch)
-        except Exception as exc:  # defensive: never crash the harness
-            print(f"Warning: apply_patch raised exception on run {i}: {exc}")
-
-        results.append({
-            "index": i,
-            "duration": duration,
-            "raw_patch": patch,
-            "apply_result": apply_result,
-        })
-
-        print(f"Run {i}/{runs}: duration={duration:.2f}s, patch_keys={list(patch.keys()) if patch else []}")
+    intent, expected = build_intent(intent_name)
+
+    # Let the benchmark, not the in-process admission control, set the load.
+    set_scheduler(LLMScheduler(default_concurrency=concurrency, max_queue=max(64, runs * 2), queue_timeout=None))
+
+    if warmup:
+        print(f"Warming up: {warmup} run(s)")
+        for i in range(warmup):
+            _run_once(-(i + 1), intent, base_state)
+
+    print(f"Running mutator benchmark: intent={intent_name}, runs={runs}, concurrency={concurrency}")
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(_run_once, i, intent, base_state) for i in range(1, runs + 1)]
+        for fut in futures:
+            r = fut.result()
+            results.append(r)
+            patch = r["raw_patch"]
+            status = f"error={r['error']}" if r["error"] else f"patch_keys={list(patch.keys()) if patch else []}"
+            print(f"Run {r['index']}/{runs}: duration={r['duration']:.2f}s, {status}")
+    wall_time = time.perf_counter() - wall_start
 
     summarize_runs(results, expected_strict_fields=expected)
+    summary = summarize_load(results, wall_time, concurrency)
+    if baseline:
+        compare_to_baseline(summary, load_baseline(baseline))
+    if summary_out:
+        summary_out.write_text(json.dumps(summary, indent=2))
+        print(f"Load summary written to {summary_out}")
 
     if dump:
         serializable = []
@@ -138,6 +279,7 @@ def run_benchmark(intent_name: str, runs: int, dump: Path | None) -> None:
                 "index": r["index"],
                 "duration": r["duration"],
                 "raw_patch": r["raw_patch"],
+                "error": r["error"],
                 "apply_result": {
                     "success": ar.success if ar else None,
                     "strict_errors": [asdict(e) for e in ar.strict_errors] if ar and ar.strict_errors else [],
@@ -153,9 +295,25 @@ def main():
     p.add_argument("--intent", choices=["set_clock", "send_email"], default="set_clock")
     p.add_argument("--runs", type=int, default=10)
     p.add_argument("--dump", type=Path, default=None)
+    p.add_argument("--concurrency", type=int, default=1, help="number of concurrent worker threads")
+    p.add_argument("--warmup", type=int, default=0, help="untimed runs before measuring")
+    p.add_argument("--baseline", type=Path, default=None, help="previous --dump or --summary file to compare against")
+    p.add_argument("--summary", type=Path, default=None, help="write the load summary as JSON")
+    p.add_argument("--import-dump", type=Path, default=None, help="convert a previous --dump into a replay tape")
+    p.add_argument("--tape", type=Path, default=Path("llm_tape.jsonl"), help="tape written by --import-dump")
+    p.add_argument("--model", default=None, help="model the --import-dump tape is keyed by (default: the first routed model)")
     args = p.parse_args()
 
-    run_benchmark(args.intent, args.runs, args.dump)
+    if args.import_dump:
+        intent, _ = build_intent(args.intent)
+        prompt = build_prompt(intent, create_initial_state(), {})
+        model_cfg = dict(mutate.MODEL_CFG)
+        model_cfg["model"] = args.model or first_routed_model(model_cfg, intent)
+        count = import_bench_results(args.import_dump, prompt, model_cfg, args.tape)
+        print(f"Imported {count} runs from {args.import_dump} into {args.tape} for model {model_cfg['model']}")
+        return
+
+    run_benchmark(args.intent, args.runs, args.dump, args.concurrency, args.warmup, args.baseline, args.summary)
 
 
 if __name__ == "__main__":
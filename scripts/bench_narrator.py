@@ -1,22 +1,63 @@
 """Benchmark utility for Narrator LLM renderer.
 
-This script benchmarks the LLM-based narration output for various outcomes.
-Run directly with Python. It will call llm.narrate.generate_narration repeatedly and print a summary.
+Narration is short, player-facing streamed text, so what matters is how
+soon the first words appear and how fast the rest follows rather than
+end-to-end latency alone. For every (intent, success) scenario this
+reports:
+
+- TTFT: seconds until the first output chunk (with `--stream`; without
+  it the whole response arrives at once and TTFT equals total latency),
+- tokens/sec: decode rate. Streamed runs over `transport: http` use the
+  server's own `eval_count`/`eval_duration`; otherwise output is counted
+  in words (after the first chunk when streaming, over the whole call
+  when not). Each result records its `token_unit`,
+- output length distribution in tokens (or words) and characters.
+
+Runs go through the `llm.scheduler` admission queue, issued from
+`--concurrency` threads at once. Non-streamed runs use `call_llm` and so
+also pass the circuit breaker, deadline and record/replay transport of
+`llm.resilience`/`llm.recording`; `--stream` calls `llm.client.stream`
+directly and bypasses all three, so it measures the raw model and cannot
+be replayed from a tape. The JSON written by `--dump` records the
+model config, so runs against each entry of `config/models.dev.yaml`
+(or `--model` overrides) can be compared with `--compare`.
 
 Usage:
-    python scripts/bench_narrator.py --intent set_clock --runs 10 --dump out.json
+    python -m scripts.bench_narrator --intent set_clock --runs 10 --dump out.json
+    python -m scripts.bench_narrator --stream --concurrency 4 --runs 20 --dump llama.json
+    python -m scripts.bench_narrator --stream --model qwen2.5:1.5b --dump qwen.json
+    python -m scripts.bench_narrator --compare llama.json qwen.json
 
-Note: This script does not mock the LLM. It may be slow or require an LLM client to be configured.
+Note: This script does not mock the LLM. It may be slow or require an LLM
+client to be configured. `python -m llm.fake_server --token-delay 0.02`
+with `--transport http --base-url http://127.0.0.1:11434` exercises the
+harness without a model.
 """
 
+from __future__ import annotations
+
 import argparse
 import json
 import time
-from pathlib import Path
-from typing import Any, Dict, List
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict
+from pathlib import Path
+from statistics import mean
+from typing import Any, Dict, List, Optional
 
-from llm.narrate import NarrationInput, generate_narration
+import llm.client as client
+from llm.narrate import NarrationInput, build_narration_prompt, clean_narration
+from llm.scheduler import LLMScheduler, Priority, get_scheduler, set_scheduler
+from llm.tools import call_llm, load_model_config
+from telemetry.metrics import percentile
+
+DEFAULT_CONFIG = Path("config") / "models.dev.yaml"
+DEFAULT_INTENTS = ["SET_CLOCK", "SEND_EMAIL", "SHOW_CONFIG", "READ_EMAIL"]
+FAILURE_ERRORS = ["Permission denied", "Malformed request"]
+SUCCESS_PATCHES: Dict[str, Dict[str, Any]] = {
+    "SET_CLOCK": {"clock": {"time": "09:00"}},
+    "SEND_EMAIL": {"emails": [{"recipient": "alice@example.com", "sent_at": "08:30"}]},
+}
 
 # Example input scenarios for benchmarking
 def build_narration_input(intent_type: str = "SET_CLOCK", success: bool = True, errors=None, patch=None) -> NarrationInput:
@@ -27,41 +68,177 @@ def build_narration_input(intent_type: str = "SET_CLOCK", success: bool = True,
         patch=patch or None,
     )
 
-def run_benchmark(intent_type: str, runs: int, dump: Path | None) -> None:
-    results: List[Dict[str, Any]] = []
-    print(f"Running narrator benchmark: intent={intent_type}, runs={runs}")
-    for i in range(1, runs + 1):
-        # Alternate between success and failure for diversity
-        success = (i % 2 == 1)
-        errors = [] if success else ["Permission denied", "Malformed request"]
-        patch = {"clock": "09:00"} if intent_type == "SET_CLOCK" and success else None
-        input_obj = build_narration_input(intent_type=intent_type, success=success, errors=errors, patch=patch)
-        start_time = time.time()
-        narration = generate_narration(input_obj)
-        duration = time.time() - start_time
-        results.append({
-            "index": i,
-            "duration": duration,
-            "input": asdict(input_obj),
-            "narration": narration,
-        })
-        print(f"Run {i}/{runs}: duration={duration:.2f}s\nInput: {input_obj}\nNarration: {narration}\n")
-    print("\nSample outputs (first 5):")
-    for r in results[:5]:
-        print(f"--- Run {r['index']} ---")
-        print("Input:", r["input"])
-        print("Narration:", r["narration"])
+def build_scenarios(intents: List[str]) -> List[NarrationInput]:
+    """Return one success and one failure input per intent type."""
+    scenarios = []
+    for intent_type in intents:
+        intent_type = intent_type.upper()
+        scenarios.append(build_narration_input(intent_type, True, patch=SUCCESS_PATCHES.get(intent_type)))
+        scenarios.append(build_narration_input(intent_type, False, errors=FAILURE_ERRORS))
+    return scenarios
+
+def scenario_name(input_obj: NarrationInput) -> str:
+    return f"{input_obj.intent_type}/{'success' if input_obj.success else 'failure'}"
+
+def distribution(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    return {
+        "mean": mean(values),
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p99": percentile(values, 99),
+        "max": max(values),
+    }
+
+def measure_once(input_obj: NarrationInput, model_cfg: Dict[str, Any], stream: bool, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Narrate `input_obj` once and return timing and size of the output."""
+    prompt = build_narration_prompt(input_obj)
+    ttft = None
+    error = None
+    text = ""
+    stats: Dict[str, Any] = {}
+    start = time.perf_counter()
+    try:
+        if stream:
+            chunks = []
+            with get_scheduler().slot(model_cfg, Priority.BACKGROUND, timeout):
+                for chunk in client.stream(prompt, model_cfg, timeout=timeout, stats=stats):
+                    if ttft is None:
+                        ttft = time.perf_counter() - start
+                    chunks.append(chunk)
+            text = clean_narration("".join(chunks))
+        else:
+            text = clean_narration(call_llm(prompt, model_cfg, priority=Priority.BACKGROUND, timeout=timeout))
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}"
+    total = time.perf_counter() - start
+    if ttft is None:
+        ttft = total
+
+    if stats.get("eval_count") and stats.get("eval_duration"):
+        token_unit = "eval_count"
+        tokens = stats["eval_count"]
+        tokens_per_sec = tokens / (stats["eval_duration"] / 1e9)
+    else:
+        token_unit = "words"
+        tokens = len(text.split())
+        decode = total - ttft if stream else total
+        counted = tokens - 1 if stream else tokens
+        tokens_per_sec = counted / decode if counted > 0 and decode > 0 else None
+    return {
+        "scenario": scenario_name(input_obj),
+        "input": asdict(input_obj),
+        "ttft": ttft,
+        "duration": total,
+        "tokens": tokens,
+        "token_unit": token_unit,
+        "chars": len(text),
+        "tokens_per_sec": tokens_per_sec,
+        "narration": text,
+        "error": error,
+    }
+
+def summarize_scenario(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    ok = [r for r in results if not r["error"]]
+    return {
+        "runs": len(results),
+        "errors": len(results) - len(ok),
+        "error_rate": (len(results) - len(ok)) / len(results) if results else 0.0,
+        "ttft": distribution([r["ttft"] for r in ok]),
+        "duration": distribution([r["duration"] for r in ok]),
+        "tokens_per_sec": distribution([r["tokens_per_sec"] for r in ok if r["tokens_per_sec"] is not None]),
+        "output_tokens": distribution([r["tokens"] for r in ok]),
+        "token_units": sorted({r["token_unit"] for r in ok}),
+        "output_chars": distribution([r["chars"] for r in ok]),
+    }
+
+def run_benchmark(model_cfg: Dict[str, Any], intents: List[str], runs: int, concurrency: int = 1, stream: bool = False, warmup: int = 0, timeout: Optional[float] = None, dump: Path | None = None, quiet: bool = False) -> Dict[str, Any]:
+    """Run every scenario `runs` times and return a JSON-serializable report."""
+    scenarios = build_scenarios(intents)
+    set_scheduler(LLMScheduler(default_concurrency=concurrency, max_queue=max(64, concurrency * len(scenarios) * runs)))
+    if not quiet:
+        print(f"Running narrator benchmark: model={model_cfg.get('model')}, scenarios={len(scenarios)}, runs={runs}, concurrency={concurrency}, stream={stream}")
+
+    for _ in range(warmup):
+        measure_once(scenarios[0], model_cfg, stream, timeout)
+
+    jobs = [s for s in scenarios for _ in range(runs)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda s: measure_once(s, model_cfg, stream, timeout), jobs))
+    wall_time = time.perf_counter() - start
+
+    by_scenario: Dict[str, List[Dict[str, Any]]] = {}
+    for r in results:
+        by_scenario.setdefault(r["scenario"], []).append(r)
+    report = {
+        "model": model_cfg.get("model"),
+        "config": model_cfg,
+        "stream": stream,
+        "concurrency": concurrency,
+        "wall_time": wall_time,
+        "requests_per_sec": len(results) / wall_time if wall_time > 0 else 0.0,
+        "scenarios": {name: summarize_scenario(rs) for name, rs in by_scenario.items()},
+        "overall": summarize_scenario(results),
+    }
+    if not quiet:
+        print_report(report)
+        print("\nSample outputs (first per scenario):")
+        for name, rs in by_scenario.items():
+            print(f"--- {name} ---")
+            print("Narration:", rs[0]["error"] or rs[0]["narration"])
     if dump:
-        dump.write_text(json.dumps(results, indent=2))
-        print(f"Raw results dumped to {dump}")
+        dump.write_text(json.dumps({**report, "results": results}, indent=2))
+        if not quiet:
+            print(f"Raw results dumped to {dump}")
+    return report
+
+def _fmt(dist: Dict[str, float], key: str, scale: float = 1.0, spec: str = "8.2f") -> str:
+    return format(dist[key] * scale, spec) if dist else format("-", ">8")
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"\nModel {report['model']} (stream={report['stream']}, concurrency={report['concurrency']}): {report['requests_per_sec']:.2f} req/s")
+    print(f"{'scenario':24s} {'ttft p50':>8s} {'ttft p90':>8s} {'tok/s':>8s} {'tokens':>8s} {'chars':>8s} {'errors':>6s}")
+    rows = list(report["scenarios"].items()) + [("overall", report["overall"])]
+    for name, s in rows:
+        print(f"{name:24s} {_fmt(s['ttft'], 'p50')} {_fmt(s['ttft'], 'p90')} {_fmt(s['tokens_per_sec'], 'p50', spec='8.1f')} "
+              f"{_fmt(s['output_tokens'], 'p50', spec='8.0f')} {_fmt(s['output_chars'], 'p50', spec='8.0f')} {s['errors']:6d}")
+
+def compare_reports(reports: List[Dict[str, Any]]) -> None:
+    """Print the overall TTFT, throughput and length of several dumps side by side."""
+    print(f"{'model':24s} {'stream':>6s} {'conc':>4s} {'ttft p50':>8s} {'ttft p90':>8s} {'tok/s':>8s} {'tokens':>8s} {'err%':>6s}")
+    for r in reports:
+        s = r["overall"]
+        print(f"{str(r['model']):24s} {str(r['stream']):>6s} {r['concurrency']:4d} {_fmt(s['ttft'], 'p50')} {_fmt(s['ttft'], 'p90')} "
+              f"{_fmt(s['tokens_per_sec'], 'p50', spec='8.1f')} {_fmt(s['output_tokens'], 'p50', spec='8.0f')} {s['error_rate'] * 100:6.1f}")
 
 def main():
     p = argparse.ArgumentParser(description="LLM Narrator benchmark harness")
-    p.add_argument("--intent", default="SET_CLOCK")
-    p.add_argument("--runs", type=int, default=10)
+    p.add_argument("--intent", nargs="+", default=DEFAULT_INTENTS, help="intent types to narrate (each as success and failure)")
+    p.add_argument("--runs", type=int, default=10, help="runs per scenario")
+    p.add_argument("--concurrency", type=int, default=1)
+    p.add_argument("--stream", action="store_true", help="stream output to measure time to first token")
+    p.add_argument("--warmup", type=int, default=0, help="untimed runs before measuring")
+    p.add_argument("--timeout", type=float, default=None)
+    p.add_argument("--config", type=Path, default=DEFAULT_CONFIG)
+    p.add_argument("--role", default="narrator", help="model config key to benchmark")
+    p.add_argument("--model", default=None, help="override the configured model name")
+    p.add_argument("--transport", default=None)
+    p.add_argument("--base-url", default=None)
     p.add_argument("--dump", type=Path, default=None)
+    p.add_argument("--compare", type=Path, nargs="+", default=None, help="print a comparison of previous --dump files and exit")
     args = p.parse_args()
-    run_benchmark(args.intent, args.runs, args.dump)
+
+    if args.compare:
+        compare_reports([json.loads(path.read_text()) for path in args.compare])
+        return
+
+    model_cfg = dict(load_model_config(args.config, key=args.role))
+    for key, value in (("model", args.model), ("transport", args.transport), ("base_url", args.base_url)):
+        if value is not None:
+            model_cfg[key] = value
+    run_benchmark(model_cfg, args.intent, args.runs, args.concurrency, args.stream, args.warmup, args.timeout, args.dump)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,152 @@
+"""Benchmark the disk-backed session store at scale.
+
+Fills a `game.session_store.SessionStore` with `--sessions` distinct
+sessions (default 100k; `--sessions 1000000` for the 1M target) through
+an LRU of `--capacity` in-memory states, then measures:
+
+- write throughput while filling (evictions write to the segment),
+- cold-load latency (p50/p90/p99/max) of `--loads` random sessions that
+  are not in memory,
+- warm-hit latency for sessions in the LRU,
+- compaction time and reclaimed bytes after rewriting `--rewrite` of
+  the sessions,
+- process RSS (current and peak) and on-disk segment/index sizes.
+
+Usage:
+    python -m scripts.bench_sessions --sessions 1000000 --capacity 10000
+    python -m scripts.bench_sessions --dir /tmp/sessions --keep --json sessions.json
+
+Needs no LLM. Without `--dir` a temporary directory is used and removed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from engine.patch import apply_patch
+from engine.state import create_initial_state
+from game.session_store import SessionStore
+from scripts.bench_narrator import distribution
+
+
+def rss_bytes() -> Dict[str, int]:
+    """Current and peak resident set size of this process."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak *= 1 if sys.platform == "darwin" else 1024
+    current = peak
+    try:
+        with open("/proc/self/statm") as fh:
+            current = int(fh.read().split()[1]) * resource.getpagesize()
+    except (OSError, IndexError, ValueError):
+        pass
+    return {"current": current, "peak": peak}
+
+
+def session_state(i: int):
+    """A small, session-specific state (clock, one email, one note)."""
+    base = create_initial_state()
+    patch = {
+        "strict": {
+            "clock": {"time": f"{i % 24:02d}:{i % 60:02d}"},
+            "emails": [{"recipient": f"user{i}@corp", "sent_at": "09:00"}],
+        },
+        "vibe": {"notes": [f"session {i}"]},
+    }
+    return apply_patch(base, patch).state
+
+
+def run_benchmark(directory: Path, sessions: int, capacity: int, loads: int, rewrite: float, seed: int = 0, quiet: bool = False) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    report: Dict[str, Any] = {"sessions": sessions, "capacity": capacity, "rss_start": rss_bytes()}
+
+    with SessionStore(directory, capacity=capacity, compact_ratio=float("inf")) as store:
+        start = time.perf_counter()
+        for i in range(sessions):
+            store.put(f"session-{i}", session_state(i))
+        store.flush()
+        fill = time.perf_counter() - start
+        report["fill"] = {"seconds": fill, "sessions_per_sec": sessions / fill if fill > 0 else 0.0}
+        if not quiet:
+            print(f"filled {sessions} sessions in {fill:.1f}s ({report['fill']['sessions_per_sec']:.0f}/s)")
+
+        cold: List[float] = []
+        cold_ids = [rng.randrange(max(1, sessions - capacity)) for _ in range(loads)]
+        for i in cold_ids:
+            t0 = time.perf_counter()
+            store.get(f"session-{i}")
+            cold.append(time.perf_counter() - t0)
+        report["cold_load"] = distribution(cold)
+
+        warm: List[float] = []
+        for _ in range(loads):
+            i = cold_ids[-1]
+            t0 = time.perf_counter()
+            store.get(f"session-{i}")
+            warm.append(time.perf_counter() - t0)
+        report["warm_hit"] = distribution(warm)
+
+        for i in rng.sample(range(sessions), int(sessions * rewrite)):
+            store.put(f"session-{i}", session_state(i + 1))
+        store.flush()
+        before = store.stats()
+        start = time.perf_counter()
+        reclaimed = store.compact()
+        report["compaction"] = {
+            "seconds": time.perf_counter() - start,
+            "reclaimed_bytes": reclaimed,
+            "garbage_bytes_before": before["garbage_bytes"],
+        }
+        report["store"] = store.stats()
+
+    report["rss_end"] = rss_bytes()
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    mb = 1024 * 1024
+    for name in ("cold_load", "warm_hit"):
+        d = report[name]
+        print(f"{name:10s} mean={d['mean'] * 1e6:8.1f}us p50={d['p50'] * 1e6:8.1f}us p90={d['p90'] * 1e6:8.1f}us p99={d['p99'] * 1e6:8.1f}us max={d['max'] * 1e6:8.1f}us")
+    c = report["compaction"]
+    print(f"compaction {c['seconds']:.2f}s, reclaimed {c['reclaimed_bytes'] / mb:.1f} MiB")
+    s = report["store"]
+    print(f"segment {s['segment_bytes'] / mb:.1f} MiB, index {s['index_bytes'] / mb:.1f} MiB, in memory {s['in_memory']} states")
+    print(f"RSS {report['rss_end']['current'] / mb:.1f} MiB (peak {report['rss_end']['peak'] / mb:.1f} MiB, start {report['rss_start']['current'] / mb:.1f} MiB)")
+
+
+def main(argv: List[str] | None = None) -> int:
+    p = argparse.ArgumentParser(description="Session store cold-load latency and RSS benchmark")
+    p.add_argument("--sessions", type=int, default=100_000)
+    p.add_argument("--capacity", type=int, default=10_000, help="states kept in memory")
+    p.add_argument("--loads", type=int, default=2000, help="random cold loads to time")
+    p.add_argument("--rewrite", type=float, default=0.25, help="fraction of sessions rewritten before compaction")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--dir", type=Path, default=None, help="store directory (default: a temporary one)")
+    p.add_argument("--keep", action="store_true", help="keep the store directory afterwards")
+    p.add_argument("--json", type=Path, default=None, help="write the report as JSON")
+    args = p.parse_args(argv)
+
+    directory = args.dir or Path(tempfile.mkdtemp(prefix="sparrow-sessions-"))
+    try:
+        report = run_benchmark(directory, args.sessions, args.capacity, args.loads, args.rewrite, args.seed)
+    finally:
+        if not args.keep:
+            shutil.rmtree(directory, ignore_errors=True)
+    print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+        print(f"Results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,103 @@
+"""Structured debug channel and deferred formatting helpers.
+
+Diagnostic output in the turn path should cost nothing unless someone
+reads it. This module offers two tools for that:
+
+- `event(name, build)` writes one JSON line per event to the debug
+  channel. The channel is off unless `SPARROW_DEBUG_CHANNEL=<path>` is
+  set (or `enable()` is called), and while it is off `event` returns
+  after one flag check without calling `build`, so callers pass the
+  expensive parts as a callable.
+- `lazy_json(obj)` wraps an object for `%s` logging arguments; it is
+  only serialized if a handler actually formats the record.
+
+Usage:
+    from telemetry import debug
+
+    LOG.debug("Proposed patch:\\n%s", debug.lazy_json(patch))
+    debug.event("turn", lambda: {"patch": patch, "strict": asdict(state.strict)})
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Optional, Union
+
+LOG = logging.getLogger(__name__)
+
+_LOCK = threading.Lock()
+_SINK: Optional[IO[str]] = None
+_OWNED: bool = False  # whether _SINK was opened here and must be closed here
+_ENABLED: bool = False
+
+
+class lazy_json:
+    """Defer `json.dumps(obj)` until the value is formatted."""
+
+    __slots__ = ("obj", "indent")
+
+    def __init__(self, obj: Any, indent: Optional[int] = 2):
+        self.obj = obj
+        self.indent = indent
+
+    def __str__(self) -> str:
+        return json.dumps(self.obj, indent=self.indent, default=str)
+
+    __repr__ = __str__
+
+
+def enabled() -> bool:
+    return _ENABLED
+
+
+def enable(target: Union[str, Path, IO[str]]) -> None:
+    """Send events to `target`, a path (appended to) or an open text stream."""
+    global _SINK, _OWNED, _ENABLED
+    with _LOCK:
+        _close_locked()
+        _OWNED = isinstance(target, (str, Path))
+        _SINK = open(target, "a", buffering=1) if _OWNED else target
+        _ENABLED = True
+
+
+def disable() -> None:
+    global _ENABLED
+    with _LOCK:
+        _ENABLED = False
+        _close_locked()
+
+
+def _close_locked() -> None:
+    global _SINK
+    if _SINK is not None and _OWNED:
+        _SINK.close()
+    _SINK = None
+
+
+def event(name: str, build: Optional[Callable[[], Dict[str, Any]]] = None, **fields: Any) -> None:
+    """Write a structured debug event; `build` is called only when the channel is on."""
+    if not _ENABLED:
+        return
+    try:
+        payload = {"ts": time.time(), "event": name, **fields}
+        if build is not None:
+            payload.update(build())
+        line = json.dumps(payload, default=str)
+    except Exception:
+        LOG.debug("Failed to build debug event %r", name, exc_info=True)
+        return
+    with _LOCK:
+        if _SINK is not None:
+            _SINK.write(line + "\n")
+
+
+if os.getenv("SPARROW_DEBUG_CHANNEL"):
+    enable(os.environ["SPARROW_DEBUG_CHANNEL"])
+
+
+__all__ = ["disable", "enable", "enabled", "event", "lazy_json"]
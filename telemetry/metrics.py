@@ -0,0 +1,267 @@
+"""Lightweight in-process metrics for turn latency instrumentation.
+
+Records per-stage timings into histograms (p50/p95/p99) and simple
+counters. Everything is a no-op until metrics are enabled, either with
+the `SPARROW_METRICS=1` environment variable or by calling `enable()`,
+so instrumented hot paths pay a single flag check when disabled.
+
+Usage:
+    from telemetry import metrics
+
+    with metrics.timer("mutate.llm"):
+        raw = call_llm(prompt, cfg)
+    metrics.incr("mutate.parse_failures")
+
+Export with `write(path)` (JSON, or Prometheus text for `.prom`/`.txt`
+paths) or expose a local endpoint with `serve(port)`.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional
+
+if TYPE_CHECKING:  # http.server is imported by `serve` only
+    from http.server import ThreadingHTTPServer
+
+LOG = logging.getLogger(__name__)
+
+# Number of most recent samples each histogram keeps for percentiles.
+RESERVOIR_SIZE = 4096
+
+_ENABLED: bool = os.getenv("SPARROW_METRICS", "").lower() not in ("", "0", "false", "no")
+
+
+def percentile(samples: Iterable[float], q: float) -> float:
+    """Return the q-th percentile (0-100) of samples using linear interpolation.
+
+    Returns 0.0 for an empty input.
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    if len(ordered) == 1:
+        return float(ordered[0])
+    rank = (len(ordered) - 1) * (q / 100.0)
+    lo = math.floor(rank)
+    hi = math.ceil(rank)
+    if lo == hi:
+        return float(ordered[lo])
+    return float(ordered[lo] + (ordered[hi] - ordered[lo]) * (rank - lo))
+
+
+class Histogram:
+    """Bounded-reservoir histogram of float observations (seconds for timers)."""
+
+    def __init__(self, size: int = RESERVOIR_SIZE):
+        self._samples: deque[float] = deque(maxlen=size)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self._samples.append(value)
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def summary(self) -> Dict[str, float]:
+        samples = list(self._samples)
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": percentile(samples, 50),
+            "p95": percentile(samples, 95),
+            "p99": percentile(samples, 99),
+            "max": self.max,
+        }
+
+
+class Registry:
+    """Thread-safe collection of named histograms and counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[str, int] = {}
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            hist = self._histograms.get(name)
+            if hist is None:
+                hist = self._histograms[name] = Histogram()
+            hist.observe(value)
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def histogram(self, name: str) -> Optional[Histogram]:
+        return self._histograms.get(name)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serializable view of all metrics."""
+        with self._lock:
+            return {
+                "stages": {name: h.summary() for name, h in sorted(self._histograms.items())},
+                "counters": dict(sorted(self._counters.items())),
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Render metrics in the Prometheus text exposition format."""
+        snap = self.snapshot()
+        lines = [
+            "# HELP sparrow_stage_seconds Per-stage turn latency.",
+            "# TYPE sparrow_stage_seconds summary",
+        ]
+        for stage, s in snap["stages"].items():
+            label = _escape_label(stage)
+            for q, key in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99")):
+                lines.append(f'sparrow_stage_seconds{{stage="{label}",quantile="{q}"}} {s[key]:.6f}')
+            lines.append(f'sparrow_stage_seconds_sum{{stage="{label}"}} {s["sum"]:.6f}')
+            lines.append(f'sparrow_stage_seconds_count{{stage="{label}"}} {s["count"]}')
+        lines.append("# HELP sparrow_events_total Event counters.")
+        lines.append("# TYPE sparrow_events_total counter")
+        for name, value in snap["counters"].items():
+            lines.append(f'sparrow_events_total{{name="{_escape_label(name)}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Path) -> None:
+        """Write metrics to `path`; `.prom`/`.txt` get Prometheus text, others JSON."""
+        path = Path(path)
+        text = self.to_prometheus() if path.suffix in (".prom", ".txt") else self.to_json()
+        path.write_text(text)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REGISTRY = Registry()
+
+
+class _Timer:
+    """Context manager observing elapsed wall time into a histogram."""
+
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        REGISTRY.observe(self.name, time.perf_counter() - self.start)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def enabled() -> bool:
+    return _ENABLED
+
+
+def enable() -> None:
+    global _ENABLED
+    _ENABLED = True
+
+
+def disable() -> None:
+    global _ENABLED
+    _ENABLED = False
+
+
+def timer(name: str):
+    """Return a context manager timing the enclosed block as stage `name`."""
+    if not _ENABLED:
+        return _NULL_TIMER
+    return _Timer(name)
+
+
+def observe(name: str, value: float) -> None:
+    if _ENABLED:
+        REGISTRY.observe(name, value)
+
+
+def incr(name: str, amount: int = 1) -> None:
+    if _ENABLED:
+        REGISTRY.incr(name, amount)
+
+
+def snapshot() -> Dict[str, Any]:
+    return REGISTRY.snapshot()
+
+
+def write(path: Path) -> None:
+    REGISTRY.write(path)
+
+
+def serve(port: int = 9464, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve metrics on a local HTTP endpoint from a daemon thread.
+
+    `GET /metrics` returns Prometheus text; `GET /metrics.json` returns JSON.
+    Returns the server so callers can `shutdown()` it.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):  # noqa: N802 - http.server naming
+            if self.path.startswith("/metrics.json"):
+                body, ctype = REGISTRY.to_json(), "application/json"
+            elif self.path.startswith("/metrics"):
+                body, ctype = REGISTRY.to_prometheus(), "text/plain; version=0.0.4"
+            else:
+                self.send_error(404)
+                return
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, fmt, *args):
+            LOG.debug("metrics endpoint: " + fmt, *args)
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    thread = threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True)
+    thread.start()
+    LOG.info("Serving metrics on http://%s:%d/metrics", host, server.server_address[1])
+    return server
+
+
+__all__ = [
+    "Histogram", "Registry", "REGISTRY", "percentile",
+    "enabled", "enable", "disable", "timer", "observe", "incr",
+    "snapshot", "write", "serve",
+]
@@ -0,0 +1,127 @@
+"""Import-time profile and cold-start budget.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter
+and reports the modules with the largest cumulative import time. Two
+budgets guard cold start:
+
+- `STARTUP_BUDGET_MS`: cumulative import time of the entry module,
+- `DEFERRED_MODULES`: heavy dependencies that must not be imported at
+  startup (they are loaded on first use instead).
+
+Usage:
+    python -m game.loop --profile-startup
+    python -m telemetry.startup game.loop --top 20 --check
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_MODULE = "game.loop"
+STARTUP_BUDGET_MS = 150.0
+DEFERRED_MODULES = (
+    "yaml",
+    "dataclasses_jsonschema",
+    "jsonschema",
+    "langchain_core",
+    "langchain_ollama",
+    "http.server",
+)
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+@dataclass
+class ImportEntry:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass
+class StartupProfile:
+    module: str
+    entries: List[ImportEntry]
+
+    @property
+    def total_ms(self) -> float:
+        """Cumulative import time of the profiled module."""
+        for e in self.entries:
+            if e.module == self.module:
+                return e.cumulative_us / 1000
+        return sum(e.self_us for e in self.entries) / 1000
+
+    @property
+    def imported(self) -> set:
+        return {e.module for e in self.entries}
+
+    def deferred_violations(self, deferred=DEFERRED_MODULES) -> List[str]:
+        return sorted(m for m in deferred if m in self.imported)
+
+    def top(self, n: int) -> List[ImportEntry]:
+        return sorted(self.entries, key=lambda e: e.cumulative_us, reverse=True)[:n]
+
+
+def parse_importtime(output: str) -> List[ImportEntry]:
+    entries = []
+    for line in output.splitlines():
+        m = _LINE.match(line)
+        if m:
+            entries.append(ImportEntry(m.group(4), int(m.group(1)), int(m.group(2)), (len(m.group(3)) - 1) // 2))
+    return entries
+
+
+def profile(module: str = DEFAULT_MODULE, runs: int = 3) -> StartupProfile:
+    """Profile importing `module` in fresh interpreters; keeps the fastest of `runs`."""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")]))}
+    best: Optional[StartupProfile] = None
+    for _ in range(max(1, runs)):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=REPO_ROOT, env=env, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"importing {module} failed:\n{proc.stderr[-2000:]}")
+        result = StartupProfile(module, parse_importtime(proc.stderr))
+        if best is None or result.total_ms < best.total_ms:
+            best = result
+    return best
+
+
+def print_report(result: StartupProfile, top: int = 15, budget_ms: float = STARTUP_BUDGET_MS) -> None:
+    print(f"import {result.module}: {result.total_ms:.1f} ms (budget {budget_ms:.0f} ms)")
+    print(f"{'cumulative':>11s} {'self':>9s}  module")
+    for e in result.top(top):
+        print(f"{e.cumulative_us / 1000:9.1f}ms {e.self_us / 1000:7.1f}ms  {'  ' * e.depth}{e.module}")
+    violations = result.deferred_violations()
+    if violations:
+        print("Imported at startup but should be deferred: " + ", ".join(violations))
+
+
+def main(argv: List[str] | None = None) -> int:
+    p = argparse.ArgumentParser(description="Import-time profile and cold-start budget")
+    p.add_argument("module", nargs="?", default=DEFAULT_MODULE)
+    p.add_argument("--top", type=int, default=15)
+    p.add_argument("--runs", type=int, default=3)
+    p.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    p.add_argument("--check", action="store_true", help="exit 1 if over budget or a deferred module is imported")
+    args = p.parse_args(argv)
+
+    result = profile(args.module, args.runs)
+    print_report(result, args.top, args.budget_ms)
+    if args.check and (result.total_ms > args.budget_ms or result.deferred_violations()):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,65 @@
+"""Tests for background session autosave and recovery."""
+
+from engine.patch import apply_patch
+from engine.state import create_initial_state, state_to_json
+from game.autosave import Autosaver, recover
+
+
+def test_marked_sessions_are_written_and_recovered(tmp_path):
+    state = create_initial_state()
+    later = apply_patch(state, {"strict": {"clock": {"time": "05:00"}}}).state
+    with Autosaver(tmp_path, interval=60) as saver:
+        saver.mark_dirty("alice", state)
+        saver.mark_dirty("alice", later)  # coalesced: only the latest is written
+        saver.mark_dirty("bob/../x", state)
+        assert saver.flush(timeout=5)
+
+    recovered = recover(tmp_path)
+    assert set(recovered) == {"alice", "bob_.._x"}
+    assert state_to_json(recovered["alice"]) == state_to_json(later)
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_recover_skips_torn_and_interrupted_writes(tmp_path):
+    (tmp_path / "good.json").write_text(state_to_json(create_initial_state()))
+    (tmp_path / "torn.json").write_text('{"strict": {')
+    (tmp_path / "good.json.tmp").write_text("partial")
+
+    recovered = recover(tmp_path)
+    assert set(recovered) == {"good"}
+    assert not (tmp_path / "good.json.tmp").exists()
+
+
+def test_close_writes_pending_sessions(tmp_path):
+    saver = Autosaver(tmp_path, interval=60, fsync=False)
+    saver.mark_dirty("carol", create_initial_state())
+    saver.close()
+    assert (tmp_path / "carol.json").exists()
+
+
+def test_failed_batch_is_retried_without_losing_newer_marks(tmp_path, monkeypatch):
+    state = create_initial_state()
+    later = apply_patch(state, {"strict": {"clock": {"time": "05:00"}}}).state
+    saver = Autosaver(tmp_path, interval=60, fsync=False)
+    write_batch = saver._write_batch
+    attempts = []
+
+    def flaky(batch):
+        attempts.append(dict(batch))
+        if len(attempts) == 1:
+            saver.mark_dirty("alice", later)  # marked while the failing write runs
+            raise OSError("disk full")
+        write_batch(batch)
+
+    monkeypatch.setattr(saver, "_write_batch", flaky)
+    saver.mark_dirty("alice", state)
+    saver.mark_dirty("bob", state)
+    assert not saver.flush(timeout=5)  # the failed pass is reported...
+    assert saver.flush(timeout=5)  # ...and the next one retries it
+    saver.close()
+
+    assert len(attempts) == 2
+    assert attempts[1]["alice"] is later
+    recovered = recover(tmp_path)
+    assert set(recovered) == {"alice", "bob"}
+    assert state_to_json(recovered["alice"]) == state_to_json(later)
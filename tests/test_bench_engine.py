@@ -0,0 +1,28 @@
+"""Smoke tests for the offline engine microbenchmark suite."""
+
+import json
+
+from scripts.bench_engine import DEFAULT_BASELINE, DEFAULT_SIZES, find_regressions, missing_from_baseline, run_suite
+
+
+def test_suite_runs_every_case():
+    results = run_suite([2], min_time=0.001, quiet=True)
+    names = set(results["cases"])
+    assert "apply_patch[2]" in names
+    assert "resolve_intent_placeholders[2]" in names
+    assert all(c["normalized"] > 0 for c in results["cases"].values())
+
+
+def test_regression_gate_respects_tolerance():
+    baseline = {"cases": {"apply_patch[10]": {"normalized": 1.0}, "copy_state[10]": {"normalized": 1.0}}}
+    results = {"cases": {"apply_patch[10]": {"normalized": 1.5}, "copy_state[10]": {"normalized": 1.2}, "new_case[10]": {"normalized": 9.0}}}
+    regressions = find_regressions(results, baseline, tolerance=0.3)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("apply_patch[10]")
+    assert missing_from_baseline(results, baseline) == ["new_case[10]"]
+
+
+def test_baseline_covers_every_default_case():
+    results = run_suite(DEFAULT_SIZES, min_time=0.001, quiet=True)
+    baseline = json.loads(DEFAULT_BASELINE.read_text())
+    assert missing_from_baseline(results, baseline) == []
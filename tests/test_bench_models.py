@@ -0,0 +1,38 @@
+"""Model matrix benchmark against the fake server."""
+
+import json
+
+import pytest
+
+from llm import resilience
+from llm.fake_server import FakeOllama
+from llm.scheduler import LLMScheduler, set_scheduler
+from scripts.bench_models import recommend, run_matrix
+
+CLOCK_PATCH = json.dumps({"strict": {"clock": {"time": "09:00"}}, "vibe": {}})
+
+
+@pytest.fixture(autouse=True)
+def fresh_llm_state():
+    resilience.reset()
+    yield
+    set_scheduler(LLMScheduler())
+
+
+def test_matrix_rows_and_recommendation():
+    flaky = lambda n: CLOCK_PATCH if n % 2 else "sorry, I cannot help"
+    with FakeOllama(response=CLOCK_PATCH) as big, FakeOllama(response=flaky) as small:
+        candidates = [
+            {"model": "big", "cost": 8, "transport": "http", "base_url": big.url},
+            {"model": "small", "cost": 1.5, "transport": "http", "base_url": small.url},
+        ]
+        rows = run_matrix(candidates, ["mutator", "narrator"], runs=2)
+
+    mutator = {(r["model"], r["scenario"]): r for r in rows if r["role"] == "mutator"}
+    assert mutator[("big", "set_clock")]["quality"] == 1.0
+    assert mutator[("small", "set_clock")]["quality"] == 0.5
+    assert mutator[("small", "set_clock")]["valid_json_rate"] == 0.5
+    assert all(r["quality"] == 1.0 for r in rows if r["role"] == "narrator")
+
+    assert recommend(rows) == {"mutator": "big", "narrator": "small"}
+    assert recommend(rows, threshold=0.5) == {"mutator": "small", "narrator": "small"}
@@ -0,0 +1,52 @@
+"""Narrator benchmark against the fake streaming server."""
+
+import pytest
+
+import llm.client as client
+from llm import resilience
+from llm.fake_server import FakeOllama
+from llm.scheduler import LLMScheduler, set_scheduler
+from scripts.bench_narrator import run_benchmark
+
+
+@pytest.fixture(autouse=True)
+def fresh_llm_state():
+    resilience.reset()
+    yield
+    set_scheduler(LLMScheduler())
+
+
+def test_client_streams_chunks():
+    with FakeOllama(response="clock set to 09:00") as server:
+        cfg = {"model": "fake", "transport": "http", "base_url": server.url}
+        stats = {}
+        chunks = list(client.stream("p", cfg, stats=stats))
+    assert chunks == ["clock ", "set ", "to ", "09:00"]
+    assert stats["eval_count"] == 4 and stats["eval_duration"] >= 0
+    assert server.requests[0]["stream"] is True
+
+
+def test_streamed_benchmark_reports_ttft_and_throughput(tmp_path):
+    dump = tmp_path / "narrator.json"
+    with FakeOllama(response="one two three four five", delay=0.02, token_delay=0.02) as server:
+        cfg = {"model": "fake", "transport": "http", "base_url": server.url}
+        report = run_benchmark(cfg, ["SET_CLOCK"], runs=2, concurrency=2, stream=True, dump=dump, quiet=True)
+
+    assert set(report["scenarios"]) == {"SET_CLOCK/success", "SET_CLOCK/failure"}
+    overall = report["overall"]
+    assert overall["runs"] == 4 and overall["errors"] == 0
+    assert overall["output_tokens"]["p50"] == 5
+    assert overall["token_units"] == ["eval_count"]
+    assert overall["ttft"]["p50"] < overall["duration"]["p50"]
+    assert 0 < overall["tokens_per_sec"]["p50"] <= 1 / 0.02
+    assert dump.exists()
+
+
+def test_unstreamed_benchmark_counts_errors():
+    with FakeOllama(response="done", fail_every=2) as server:
+        cfg = {"model": "fake", "transport": "http", "base_url": server.url}
+        report = run_benchmark(cfg, ["READ_EMAIL"], runs=1, quiet=True)
+    assert report["overall"]["runs"] == 2
+    assert report["overall"]["errors"] == 1
+    assert report["overall"]["token_units"] == ["words"]
+    assert report["overall"]["ttft"]["p50"] == report["overall"]["duration"]["p50"]
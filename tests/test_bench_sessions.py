@@ -0,0 +1,11 @@
+"""Smoke test for the session store benchmark."""
+
+from scripts.bench_sessions import run_benchmark
+
+
+def test_benchmark_reports_latency_and_memory(tmp_path):
+    report = run_benchmark(tmp_path, sessions=300, capacity=20, loads=20, rewrite=0.5, quiet=True)
+    assert report["cold_load"]["p50"] > 0
+    assert report["compaction"]["reclaimed_bytes"] > 0
+    assert report["store"]["on_disk"] == 300
+    assert report["rss_end"]["peak"] > 0
@@ -0,0 +1,77 @@
+"""Bounded vibe state and compaction summaries."""
+
+import json
+
+from engine.compact import TRUNCATED_SUFFIX, VibeLimits, compact_vibe
+from engine.state import create_initial_state, state_from_json, state_to_json
+from game.commands import Intent, IntentType
+from game.turn import TurnScheduler
+
+LIMITS = VibeLimits(max_emails=2, max_notes=2, max_config_keys=2, max_config_value_chars=20)
+
+
+def test_overflow_is_folded_into_summary():
+    vibe = create_initial_state().vibe
+    vibe.emails = [{"recipient": r} for r in ("a", "b", "a", "c")]
+    vibe.notes = ["n1", "n2", "n3"]
+    vibe.system_config = {"k1": 1, "k2": 2, "k3": "x" * 50}
+
+    result = compact_vibe(vibe, LIMITS)
+    bounded = result.vibe
+    assert bounded.emails == [{"recipient": "a"}, {"recipient": "c"}]
+    assert bounded.notes == ["n2", "n3"]
+    assert list(bounded.system_config) == ["k2", "k3"]
+    assert bounded.system_config["k3"].endswith(TRUNCATED_SUFFIX)
+    assert len(bounded.system_config["k3"]) <= LIMITS.max_config_value_chars
+    assert bounded.summary["emails_compacted"] == 2
+    assert bounded.summary["recipients"] == {"a": 1, "b": 1}
+    assert bounded.summary["recent_notes"] == ["n1"]
+    assert bounded.summary["config_keys_compacted"] == ["k1"]
+    assert "2 earlier emails" in bounded.summary["text"]
+    # Input untouched; a second pass accumulates.
+    assert len(vibe.emails) == 4
+    bounded.emails = bounded.emails + [{"recipient": "a"}]
+    assert compact_vibe(bounded, LIMITS).vibe.summary["recipients"] == {"a": 2, "b": 1}
+
+
+def test_truncation_is_idempotent():
+    vibe = create_initial_state().vibe
+    vibe.system_config = {"s": "x" * 50, "d": {"nested": "y" * 50}}
+    once = compact_vibe(vibe, LIMITS)
+    assert once.dropped["truncated_config"] == ["s", "d"]
+    twice = compact_vibe(once.vibe, LIMITS)
+    assert twice.vibe is once.vibe and not twice.compacted
+
+
+def test_within_limits_is_a_no_op():
+    vibe = create_initial_state().vibe
+    result = compact_vibe(vibe, LIMITS)
+    assert result.vibe is vibe and not result.compacted
+
+
+def test_state_json_without_summary_still_loads():
+    doc = json.loads(state_to_json(create_initial_state()))
+    del doc["vibe"]["summary"]
+    assert state_from_json(json.dumps(doc)).vibe.summary == {}
+
+
+def test_turns_stay_bounded_and_merge_background_summary():
+    def mutator(intent, state, level_context=None):
+        return {"vibe": {"notes": state.vibe.notes + [intent.params["raw"]]}}
+
+    calls = []
+
+    def summarizer(summary, dropped):
+        calls.append(dropped)
+        return "operator wrote many notes"
+
+    state = create_initial_state()
+    with TurnScheduler(mutator, narrator=lambda o: None, speculate=False, vibe_limits=LIMITS, summarizer=summarizer) as scheduler:
+        for i in range(4):
+            state = scheduler.run(Intent(IntentType.SHOW_CONFIG, {"raw": f"note {i}"}, 1.0), state).state
+            assert len(state.vibe.notes) <= 2
+            scheduler._summary_job and scheduler._summary_job.result()
+    assert calls and calls[0] == {"notes": ["note 0"]}
+    assert state.vibe.summary["notes_compacted"] == 2
+    assert state.vibe.summary["text"] == "2 earlier notes, last: note 1"
+    assert state.vibe.summary["narrative"] == "operator wrote many notes"
@@ -0,0 +1,60 @@
+"""Tests for level-gated debug rendering and the structured debug channel."""
+
+import io
+import json
+import logging
+
+from game import loop
+from telemetry import debug
+
+
+class Exploding:
+    """Fails if anything tries to read or format it."""
+
+    def __getattr__(self, name):
+        raise AssertionError(f"accessed {name} while debug output is off")
+
+
+def test_renderers_skip_work_when_debug_is_off(monkeypatch):
+    monkeypatch.setattr(loop.LOG, "isEnabledFor", lambda level: False)
+    loop.render_strict_state(Exploding())
+    loop.render_patch_result(Exploding())
+
+
+def test_lazy_json_formats_only_when_emitted(caplog):
+    calls = []
+
+    class Probe:
+        def __str__(self):
+            calls.append(1)
+            return "probe"
+
+    logger = logging.getLogger("sparrow.test.lazy")
+    logger.setLevel(logging.INFO)
+    logger.debug("%s", debug.lazy_json({"p": Probe()}))
+    assert calls == []
+    with caplog.at_level(logging.DEBUG, logger="sparrow.test.lazy"):
+        logger.debug("%s", debug.lazy_json({"p": Probe()}))
+    assert calls and '"p": "probe"' in caplog.text
+
+
+def test_event_channel_is_lazy_and_structured():
+    built = []
+
+    def build():
+        built.append(1)
+        return {"detail": [1, 2]}
+
+    debug.disable()
+    debug.event("turn", build, turn=1)
+    assert built == []
+
+    sink = io.StringIO()
+    debug.enable(sink)
+    try:
+        debug.event("turn", build, turn=2)
+    finally:
+        debug.disable()
+    record = json.loads(sink.getvalue())
+    assert record["event"] == "turn" and record["turn"] == 2 and record["detail"] == [1, 2]
+    assert built == [1]
@@ -0,0 +1,75 @@
+"""Few-shot example selection for the mutator prompt."""
+
+import json
+
+import llm.mutate as mutate
+from engine.state import create_initial_state
+from game.commands import Intent, IntentType
+from llm.examples import ExampleStore, estimate_tokens, render_example
+
+
+def clock(params):
+    return Intent(IntentType.SET_CLOCK, params, 0.9)
+
+
+def clock_patch(time):
+    return {"strict": {"clock": {"timezone": "UTC", "time": time}}, "vibe": {}}
+
+
+def test_select_prefers_same_type_and_param_shape(tmp_path):
+    store = ExampleStore(tmp_path / "ex.jsonl")
+    state = create_initial_state()
+    store.add(clock({"offset_hours": 1}), state, clock_patch("01:00"))
+    store.add(clock({"raw": "noon"}), state, clock_patch("12:00"))
+    store.add(Intent(IntentType.SEND_EMAIL, {"recipient": "a"}, 0.9), state, {"strict": {"emails": []}, "vibe": {}})
+    assert not store.add(clock({"raw": "noon"}), state, clock_patch("12:00"))
+
+    picked = store.select(clock({"offset_hours": 3}), k=1)
+    assert [e["params"] for e in picked] == [{"offset_hours": 1}]
+    assert {e["intent_type"] for e in store.select(clock({}), k=5)} == {"SET_CLOCK"}
+
+    # Persisted and reloaded, without the duplicate.
+    assert len(ExampleStore(tmp_path / "ex.jsonl")) == 3
+
+
+def test_select_respects_token_budget(tmp_path):
+    store = ExampleStore(tmp_path / "ex.jsonl")
+    for h in range(5):
+        store.add(clock({"offset_hours": h}), create_initial_state(), clock_patch(f"0{h}:00"))
+    one = estimate_tokens(render_example(store.select(clock({}), k=1)[0]))
+    assert len(store.select(clock({}), k=5, budget=one * 2)) == 2
+    assert store.select(clock({}), k=5, budget=one - 1) == []
+
+
+def test_prompt_only_contains_examples_for_the_intent_type():
+    prompt = mutate.build_prompt(clock({"offset_hours": 2}), create_initial_state(), {}, "{examples}")
+    assert "SET_CLOCK" in prompt
+    assert "SEND_EMAIL" not in prompt
+
+
+def test_validated_patches_are_recorded(tmp_path, monkeypatch):
+    path = tmp_path / "ex.jsonl"
+    cfg = {"examples_record": True, "examples_file": str(path)}
+    monkeypatch.setattr(mutate, "MODEL_CFG", cfg)
+    monkeypatch.setattr(mutate, "call_llm", lambda prompt, cfg: json.dumps(clock_patch("07:00")))
+    mutate.generate_patch(clock({"offset_hours": 7}), create_initial_state())
+    monkeypatch.setattr(mutate, "call_llm", lambda prompt, cfg: json.dumps(clock_patch(9999)))
+    mutate.generate_patch(clock({"offset_hours": 8}), create_initial_state())
+
+    recorded = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["params"] for r in recorded] == [{"offset_hours": 7}]
+
+
+def test_default_store_resolves_from_any_directory_and_records_separately(tmp_path, monkeypatch):
+    from llm import examples
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(examples, "RECORDED_PATH", tmp_path / "recorded.jsonl")
+    monkeypatch.setattr(examples, "_STORES", {})
+    seed = examples.SEED_PATH.read_text()
+    store = examples.get_store()
+    assert store.select(clock({}), k=1)
+    assert store.add(clock({"offset_hours": 11}), create_initial_state(), clock_patch("11:00"))
+    assert examples.SEED_PATH.read_text() == seed
+    assert "11:00" in (tmp_path / "recorded.jsonl").read_text()
+    assert not (tmp_path / "llm").exists()
@@ -0,0 +1,66 @@
+"""Tests for content-addressed state hashing and snapshot sharing."""
+
+from engine.hashing import _INSTANCES, SnapshotStore, cache_key, state_hash, states_equal
+from engine.patch import apply_patch
+from engine.state import Clock, Email, copy_state, create_initial_state, state_to_json
+
+
+def _state():
+    state = create_initial_state()
+    state.strict.emails = [Email("boss@corp", "09:00")]
+    state.vibe.system_config = {"b": 1, "a": [1, 2]}
+    return state
+
+
+def test_equal_content_gives_equal_hash():
+    a, b = _state(), _state()
+    b.vibe.system_config = {"a": [1, 2], "b": 1}  # different insertion order
+    assert a is not b
+    assert state_hash(a) == state_hash(b)
+    assert states_equal(a, copy_state(a))
+    assert state_hash(a.strict) != state_hash(a.vibe)
+
+
+def test_patch_rehashes_only_touched_substates():
+    state = _state()
+    before = state_hash(state)
+    result = apply_patch(state, {"strict": {"clock": {"time": "10:15"}}})
+    assert result.state.vibe is state.vibe and _INSTANCES.get(state.vibe) is not None  # shared, cached
+    assert _INSTANCES.get(result.state) is None
+    assert state_hash(result.state) != before
+    assert state_hash(state) == before
+    unchanged = apply_patch(result.state, {"strict": {"clock": {"time": "00:00"}}}).state
+    assert states_equal(unchanged, state)
+
+
+def test_copies_do_not_inherit_cached_hashes():
+    state = _state()
+    before = state_hash(state)
+    copy = copy_state(state)
+    copy.strict.clock = Clock("UTC", "23:59")
+    assert state_hash(copy) != before
+    assert not states_equal(copy, state)
+    assert state_hash(state) == before
+
+
+def test_cache_key_combines_parts():
+    state = _state()
+    assert cache_key("SET_CLOCK", state.strict) == cache_key("SET_CLOCK", copy_state(state).strict)
+    assert cache_key("SET_CLOCK", state.strict) != cache_key("SEND_EMAIL", state.strict)
+
+
+def test_snapshot_store_shares_substates(tmp_path):
+    store = SnapshotStore(tmp_path)
+    state = _state()
+    first = store.put(state)
+    patched = apply_patch(state, {"vibe": {"notes": ["hi"]}}).state
+    second = store.put(patched)
+    assert first != second
+    # two manifests, one strict state shared by both, two vibe states
+    assert len(list(tmp_path.rglob("*.json"))) == 5
+
+    fresh = SnapshotStore(tmp_path)
+    loaded = fresh.get(second)
+    assert state_to_json(loaded) == state_to_json(patched)
+    assert fresh.get(first).strict is loaded.strict
+    assert second in fresh and "0" * 32 not in fresh
@@ -0,0 +1,64 @@
+"""Tests for per-session undo/rewind history."""
+
+import pytest
+
+from engine.patch import apply_patch
+from engine.state import create_initial_state
+from game.history import SessionHistory
+from game.loop import handle_history_command
+
+
+def _play(history, turns):
+    state = create_initial_state()
+    history.record(state)
+    for i in range(turns):
+        state = apply_patch(state, {"strict": {"clock": {"time": f"{i % 24:02d}:00"}}, "vibe": {"notes": state.vibe.notes + [f"turn {i}"]}}).state
+        history.record(state, f"turn {i}")
+    return state
+
+
+def test_rewind_restores_state_and_discards_later_turns():
+    history = SessionHistory(depth=10)
+    _play(history, 5)
+    assert history.current_turn == 5
+    state = history.rewind(2)
+    assert state.strict.clock.time == "01:00"
+    assert history.current_turn == 2 and len(history) == 3
+    with pytest.raises(KeyError):
+        history.state_at(3)
+    assert history.undo().strict.clock.time == "00:00"
+
+
+def test_depth_bounds_retained_turns():
+    history = SessionHistory(depth=3)
+    _play(history, 6)
+    assert len(history) == 3
+    assert history.oldest_turn == 4
+    with pytest.raises(KeyError):
+        history.rewind(3)
+
+
+def test_memory_counts_only_unshared_objects():
+    history = SessionHistory(depth=20)
+    state = create_initial_state()
+    state.vibe.system_config = {f"key{i}": "x" * 100 for i in range(200)}
+    history.record(state)
+    for i in range(10):
+        state = apply_patch(state, {"strict": {"clock": {"time": f"{i:02d}:30"}}}).state
+        history.record(state)
+
+    usage = history.memory()
+    assert usage["turns"] == 11
+    # later turns share the large vibe config and cost far less than a full copy
+    assert max(usage["per_turn"][t] for t in range(1, 11)) * 10 < usage["full_copy_bytes"]
+    assert usage["total_bytes"] == sum(usage["per_turn"].values())
+
+
+def test_history_commands(capsys):
+    history = SessionHistory()
+    _play(history, 3)
+    assert handle_history_command("send email to ops", history) is None
+    assert handle_history_command("undo", history).strict.clock.time == "01:00"
+    assert handle_history_command("rewind to turn 1", history).strict.clock.time == "00:00"
+    assert handle_history_command("rewind 7", history) is history.state_at(1)
+    assert "Cannot rewind" in capsys.readouterr().out
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from telemetry import metrics
+
+
+@pytest.fixture
+def enabled_metrics():
+    metrics.REGISTRY.reset()
+    metrics.enable()
+    yield metrics
+    metrics.disable()
+    metrics.REGISTRY.reset()
+
+
+def test_percentile_interpolates():
+    samples = [float(i) for i in range(1, 101)]
+    assert metrics.percentile(samples, 50) == pytest.approx(50.5)
+    assert metrics.percentile(samples, 99) == pytest.approx(99.01)
+    assert metrics.percentile([], 95) == 0.0
+
+
+def test_disabled_timer_records_nothing():
+    metrics.REGISTRY.reset()
+    metrics.disable()
+    with metrics.timer("parse"):
+        pass
+    metrics.incr("turns")
+    assert metrics.snapshot() == {"stages": {}, "counters": {}}
+
+
+def test_timer_and_counters_export(enabled_metrics, tmp_path):
+    for _ in range(3):
+        with metrics.timer("mutate.llm"):
+            pass
+    metrics.incr("turns", 2)
+
+    snap = metrics.snapshot()
+    assert snap["stages"]["mutate.llm"]["count"] == 3
+    assert snap["counters"]["turns"] == 2
+
+    json_path = tmp_path / "metrics.json"
+    metrics.write(json_path)
+    assert json.loads(json_path.read_text())["counters"]["turns"] == 2
+
+    prom_path = tmp_path / "metrics.prom"
+    metrics.write(prom_path)
+    text = prom_path.read_text()
+    assert 'sparrow_stage_seconds{stage="mutate.llm",quantile="0.95"}' in text
+    assert 'sparrow_events_total{name="turns"} 2' in text
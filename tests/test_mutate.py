@@ -31,3 +31,25 @@ def test_generate_patch_with_mocked_llm(monkeypatch):
     assert isinstance(patch, dict)
     assert "strict" in patch and "vibe" in patch
     assert patch["vibe"]["message"] == "A breeze blows the curtain."
+
+
+def test_structured_mode_sends_patch_schema(monkeypatch):
+    from engine.state import create_initial_state
+    from game.commands import Intent, IntentType
+    from llm import resilience
+    from llm.fake_server import FakeOllama
+
+    resilience.reset()
+    intent = Intent(IntentType.SET_CLOCK, {"offset_hours": 2}, 0.9)
+    reply = json.dumps({"strict": {"clock": {"timezone": "UTC", "time": "02:00"}}, "vibe": {}})
+    with FakeOllama(response=reply) as server:
+        cfg = {"model": "fake", "transport": "http", "base_url": server.url, "structured": True}
+        monkeypatch.setattr(mutate, "MODEL_CFG", cfg)
+        patch = mutate.generate_patch(intent, create_initial_state())
+
+    assert patch["strict"] == {"clock": {"timezone": "UTC", "time": "02:00"}}
+    schema = server.requests[0]["format"]
+    assert schema == mutate.patch_schema(["clock"])
+    assert set(schema["properties"]["strict"]["properties"]) == {"clock"}
+    assert "$ref" not in json.dumps(schema)
+    assert mutate.patch_schema([])["properties"]["strict"]["properties"] == {}
@@ -0,0 +1,91 @@
+"""Record/replay transport tests."""
+
+import json
+import time
+
+import pytest
+
+from llm import recording, resilience
+from llm.fake_server import FakeOllama
+from llm.tools import LLMUnavailable, call_llm
+
+
+@pytest.fixture(autouse=True)
+def no_tape():
+    resilience.reset()
+    recording.disable()
+    yield
+    recording.disable()
+
+
+def test_record_then_replay_without_server(tmp_path):
+    tape_path = tmp_path / "tape.jsonl"
+    with FakeOllama(response=lambda n: f"answer {n}", delay=0.05) as server:
+        cfg = {"model": "fake", "transport": "http", "base_url": server.url}
+        recording.use_tape(tape_path, recording.RECORD)
+        assert call_llm("p1", cfg) == "answer 1"
+        assert call_llm("p1", cfg) == "answer 2"
+        assert call_llm("p2", cfg) == "answer 3"
+
+    lines = [json.loads(line) for line in tape_path.read_text().splitlines()]
+    assert len(lines) == 3
+    assert all(entry["latency"] >= 0.05 for entry in lines)
+
+    recording.use_tape(tape_path, recording.REPLAY)
+    cfg = {"model": "fake", "transport": "http", "base_url": "http://127.0.0.1:9"}
+    assert call_llm("p1", cfg) == "answer 1"
+    assert call_llm("p1", cfg) == "answer 2"
+    assert call_llm("p1", cfg) == "answer 1"
+    assert call_llm("p2", cfg) == "answer 3"
+    with pytest.raises(recording.ReplayMiss):
+        call_llm("never recorded", cfg)
+
+
+def test_replay_can_reimpose_recorded_latency(tmp_path):
+    tape_path = tmp_path / "tape.jsonl"
+    cfg = {"model": "fake"}
+    recording.Tape(tape_path).record(recording.prompt_key("p", cfg), "fake", "slow", 0.2)
+
+    recording.use_tape(tape_path, recording.REPLAY, impose_latency=True)
+    start = time.perf_counter()
+    assert call_llm("p", cfg) == "slow"
+    assert time.perf_counter() - start >= 0.2
+
+
+def test_import_bench_results(tmp_path):
+    dump = tmp_path / "dump.json"
+    dump.write_text(json.dumps([
+        {"index": 1, "duration": 1.5, "raw_patch": {"strict": {}, "vibe": {"a": 1}}},
+        {"index": 2, "duration": 2.0, "raw_patch": None},
+    ]))
+    tape_path = tmp_path / "tape.jsonl"
+    cfg = {"model": "m"}
+    assert recording.import_bench_results(dump, "prompt", cfg, tape_path) == 1
+
+    entry = recording.Tape(tape_path).lookup(recording.prompt_key("prompt", cfg))
+    assert json.loads(entry["response"]) == {"strict": {}, "vibe": {"a": 1}}
+    assert entry["latency"] == 1.5
+
+
+def test_replay_miss_escalates_to_the_next_routed_model(tmp_path, monkeypatch):
+    import llm.mutate as mutate
+    from engine.state import create_initial_state
+    from game.commands import Intent, IntentType
+    from llm import routing
+
+    assert issubclass(recording.ReplayMiss, LLMUnavailable)
+    intent = Intent(IntentType.SET_CLOCK, {"offset_hours": 9}, 0.9)
+    state = create_initial_state()
+    tape_path = tmp_path / "tape.jsonl"
+    with FakeOllama(response='{"strict": {"clock": {"time": "09:00"}}, "vibe": {}}') as server:
+        big = {"model": "big", "cost": 8, "transport": "http", "base_url": server.url}
+        monkeypatch.setattr(mutate, "MODEL_CFG", big)
+        recording.use_tape(tape_path, recording.RECORD)
+        mutate.generate_patch(intent, state)
+
+    # Only "big" is on the tape; the router asks "small" first.
+    routing.reset()
+    monkeypatch.setattr(mutate, "MODEL_CFG", {**big, "candidates": [{"model": "small", "cost": 1}], "route_probe_every": 0})
+    recording.use_tape(tape_path, recording.REPLAY)
+    assert mutate.generate_patch(intent, state)["strict"] == {"clock": {"time": "09:00"}}
+    routing.reset()
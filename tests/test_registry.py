@@ -0,0 +1,109 @@
+import os
+import threading
+
+import pytest
+
+from llm import mutate
+from llm.registry import FrozenConfig, Registry, Template, freeze
+
+
+def _write(path, text, mtime):
+    path.write_text(text)
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def files(tmp_path):
+    prompts = tmp_path / "prompts"
+    prompts.mkdir()
+    _write(tmp_path / "models.yaml", "mutator:\n  model: a\nnarrator:\n  model: n\n", 1000)
+    _write(prompts / "mutate.txt", "v1 {intent}", 1000)
+    return tmp_path / "models.yaml", prompts
+
+
+def test_template_renders_placeholders_and_keeps_other_braces():
+    tpl = Template('Out: { "strict": {} }\nintent={intent} again={intent} unknown={other}')
+    assert tpl.placeholders == {"intent", "other"}
+    assert tpl.prefix == 'Out: { "strict": {} }\nintent='
+    assert tpl.render(intent="{state}") == 'Out: { "strict": {} }\nintent={state} again={state} unknown={other}'
+
+
+def test_frozen_config_is_read_only_but_copyable():
+    cfg = freeze({"model": "a", "candidates": [{"model": "b"}]})
+    with pytest.raises(TypeError):
+        cfg["model"] = "x"
+    with pytest.raises(TypeError):
+        cfg["candidates"][0].update(model="x")
+    assert {**cfg, "model": "x"}["model"] == "x"
+    assert isinstance(cfg["candidates"], tuple) and isinstance(cfg["candidates"][0], FrozenConfig)
+
+
+def test_hot_reload_on_mtime_change_keeps_old_snapshot_intact(files):
+    config, prompts = files
+    registry = Registry(config, prompts, check_interval=0)
+    old = registry.snapshot()
+    assert old.model("mutator")["model"] == "a"
+    assert old.prompt("mutate").render(intent="i") == "v1 i"
+    assert registry.snapshot() is old  # nothing changed on disk
+
+    _write(prompts / "mutate.txt", "v2 {intent}", 2000)
+    new = registry.snapshot()
+    assert new.version == old.version + 1
+    assert new.prompt("mutate").render(intent="i") == "v2 i"
+    assert old.prompt("mutate").render(intent="i") == "v1 i"
+    # An unchanged role keeps its config object (identity-keyed router stats survive).
+    assert new.model("mutator") is old.model("mutator")
+
+    _write(config, "mutator:\n  model: b\n", 3000)
+    assert registry.snapshot().model("mutator")["model"] == "b"
+    assert registry.snapshot().model("narrator") == {}
+
+
+def test_check_interval_bounds_stat_calls(files):
+    config, prompts = files
+    registry = Registry(config, prompts, check_interval=3600)
+    first = registry.snapshot()
+    _write(prompts / "mutate.txt", "v2 {intent}", 2000)
+    assert registry.snapshot() is first
+    assert registry.reload().prompt("mutate").text == "v2 {intent}"
+
+
+def test_overrides_survive_reloads(files):
+    config, prompts = files
+    registry = Registry(config, prompts, check_interval=0)
+    registry.override("mutator", {"model": "pinned"}, "mutate", "pinned {intent}")
+    _write(config, "mutator:\n  model: b\n", 2000)
+    snap = registry.snapshot()
+    assert snap.model("mutator")["model"] == "pinned"
+    assert snap.prompt("mutate").text == "pinned {intent}"
+    registry.clear_overrides()
+    assert registry.snapshot().model("mutator")["model"] == "b"
+
+
+def test_concurrent_readers_see_consistent_snapshots(files):
+    config, prompts = files
+    registry = Registry(config, prompts, check_interval=0)
+    registry.snapshot()
+    seen, stop = [], threading.Event()
+
+    def reader():
+        while not stop.is_set():
+            snap = registry.snapshot()
+            seen.append((snap.model("mutator")["model"], snap.prompt("mutate").text))
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for i in range(20):
+        registry.override("mutator", {"model": f"m{i}"}, "mutate", f"m{i} {{intent}}")
+    stop.set()
+    for t in threads:
+        t.join()
+    assert all(text == f"{model} {{intent}}" for model, text in seen if model != "a")
+
+
+def test_mutator_prompt_matches_template_text():
+    # The mutator reads the registry unless MODEL_CFG/PROMPT_TPL are pinned.
+    model_cfg, prompt_tpl = mutate._config()
+    assert str(prompt_tpl) == mutate.PROMPT_TPL
+    assert model_cfg == mutate.MODEL_CFG
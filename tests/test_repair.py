@@ -0,0 +1,67 @@
+"""Deterministic patch repair."""
+
+from engine.patch import apply_patch
+from engine.repair import STRICT_FIELDS, normalize_time, repair_patch
+from engine.state import create_initial_state
+from game.commands import Intent, IntentType
+
+
+def test_normalize_time_formats():
+    assert normalize_time("9:05") == "09:05"
+    assert normalize_time("09:05:30") == "09:05"
+    assert normalize_time("0930") == "09:30"
+    assert normalize_time("9pm") == "21:00"
+    assert normalize_time("12:15 a.m.") == "00:15"
+    assert normalize_time("2024-01-01T21:30:00Z") == "21:30"
+    assert normalize_time("25:00") is None
+    assert normalize_time("soon") is None
+
+
+def test_repair_fills_email_fields_from_state_and_intent():
+    state = create_initial_state()
+    state.strict.clock.time = "08:15"
+    intent = Intent(IntentType.SEND_EMAIL, {"recipient": "ops@corp", "body": "hi"}, 0.9)
+    patch = {
+        "strict": {"emails": {"recipient": "${intent.recipient}", "subject": "hi"}, "inbox": []},
+        "vibe": {"notes": ["mailed ${intent.recipient}"]},
+    }
+    assert not apply_patch(state, patch).success
+
+    result = repair_patch(patch, state, intent)
+    assert result.patch == {
+        "strict": {"emails": [{"recipient": "ops@corp", "sent_at": "08:15"}]},
+        "vibe": {"notes": ["mailed ops@corp"]},
+    }
+    assert apply_patch(state, result.patch).success
+    assert any("sent_at" in c for c in result.changes)
+    assert any("inbox" in c for c in result.changes)
+    # The input patch is untouched.
+    assert patch["strict"]["emails"]["recipient"] == "${intent.recipient}"
+
+
+def test_repair_normalizes_clock_and_uses_patched_time_for_emails():
+    patch = {"strict": {"clock": {"time": "9:30 pm", "tz": "UTC"}, "emails": [{"recipient": "a@b"}]}}
+    result = repair_patch(patch, create_initial_state())
+    assert result.patch["strict"]["clock"] == {"time": "21:30"}
+    assert result.patch["strict"]["emails"] == [{"recipient": "a@b", "sent_at": "21:30"}]
+
+
+def test_valid_patch_is_unchanged():
+    patch = {"strict": {"clock": {"time": "09:00"}}, "vibe": {"anything": 1}}
+    result = repair_patch(patch, create_initial_state())
+    assert result.patch == patch
+    assert not result.repaired
+
+
+def test_strict_fields_follow_the_state_dataclasses():
+    assert STRICT_FIELDS == {"clock": {"timezone", "time"}, "emails": {"recipient", "sent_at"}}
+
+
+def test_invalid_clock_is_repaired_from_offset_and_current_clock():
+    state = create_initial_state()
+    state.strict.clock.time = "22:30"
+    intent = Intent(IntentType.SET_CLOCK, {"offset_hours": 3}, 0.9)
+    patch = {"strict": {"clock": {"time": "${intent.time}", "timezone": "${intent.timezone}"}}}
+    result = repair_patch(patch, state, intent)
+    assert result.patch == {"strict": {"clock": {"time": "01:30", "timezone": "UTC"}}}
+    assert apply_patch(state, result.patch).success
@@ -0,0 +1,173 @@
+"""Deadline, hedging and circuit breaker tests against a local fake server."""
+
+import time
+
+import pytest
+
+from engine.state import create_initial_state
+from game.commands import parse_intent
+from game.mutate import with_stub_fallback
+import llm.mutate as mutate
+from llm import resilience
+from llm.fake_server import FakeOllama
+from llm.tools import call_llm
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers():
+    resilience.reset()
+    yield
+    resilience.reset()
+
+
+def _cfg(server, **extra):
+    return {"model": "fake", "transport": "http", "base_url": server.url, **extra}
+
+
+def test_call_returns_fake_response():
+    with FakeOllama(response="hello") as server:
+        assert call_llm("hi", _cfg(server)) == "hello"
+        assert server.requests[0]["messages"][-1]["content"] == "hi"
+
+
+def test_deadline_bounds_stalled_server():
+    with FakeOllama(response="late", delay=1.0) as server:
+        start = time.perf_counter()
+        with resilience.deadline_scope(0.2):
+            with pytest.raises(resilience.DeadlineExceeded):
+                call_llm("hi", _cfg(server))
+        assert time.perf_counter() - start < 0.6
+
+
+def test_exhausted_deadline_fails_before_calling():
+    with FakeOllama(response="x") as server:
+        with resilience.deadline_scope(0.0):
+            with pytest.raises(resilience.DeadlineExceeded):
+                call_llm("hi", _cfg(server))
+        assert server.requests == []
+
+
+def test_hedged_request_wins_over_slow_first_attempt():
+    with FakeOllama(response=lambda n: f"reply {n}", delay=lambda n: 1.0 if n == 1 else 0.0) as server:
+        start = time.perf_counter()
+        result = call_llm("hi", _cfg(server, hedge=True, hedge_after_s=0.1, timeout_s=2.0))
+        assert result == "reply 2"
+        assert time.perf_counter() - start < 0.8
+        assert len(server.requests) == 2
+
+
+def test_breaker_opens_on_errors_and_mutator_degrades_to_stub(monkeypatch):
+    with FakeOllama(response="{}", fail_every=1) as server:
+        cfg = _cfg(server)
+        for _ in range(5):
+            with pytest.raises(RuntimeError):
+                call_llm("hi", cfg)
+        with pytest.raises(resilience.CircuitOpen):
+            call_llm("hi", cfg)
+        assert len(server.requests) == 5
+
+        monkeypatch.setattr(mutate, "MODEL_CFG", cfg)
+        mutator = with_stub_fallback(mutate.generate_patch)
+        patch = mutator(parse_intent("set clock +1"), create_initial_state())
+        assert patch == {"strict": {"clock": {"time": "01:00"}}}
+        assert len(server.requests) == 5
+
+
+def test_breaker_opens_on_slow_calls_and_recovers():
+    breaker = resilience.CircuitBreaker(min_calls=2, slow_call_s=0.1, slow_rate=1.0, cooldown=0.05)
+    breaker.record(True, 0.5)
+    breaker.record(True, 0.5)
+    with pytest.raises(resilience.CircuitOpen):
+        breaker.allow()
+    time.sleep(0.06)
+    breaker.allow()  # half-open probe
+    with pytest.raises(resilience.CircuitOpen):
+        breaker.allow()
+    breaker.record(True, 0.01)
+    assert breaker.state == resilience.CircuitBreaker.CLOSED
+
+
+def _half_open_breaker(cfg):
+    breaker = resilience.breaker_for(cfg)
+    breaker.cooldown = 0.0
+    breaker._open()
+    return breaker
+
+
+def test_expired_probe_does_not_wedge_half_open_breaker():
+    with FakeOllama(response="ok") as server:
+        cfg = _cfg(server)
+        breaker = _half_open_breaker(cfg)
+        with resilience.deadline_scope(0.0):
+            with pytest.raises(resilience.DeadlineExceeded):
+                call_llm("hi", cfg)
+        assert call_llm("hi", cfg) == "ok"
+        assert breaker.state == resilience.CircuitBreaker.CLOSED
+
+
+def test_shed_probe_does_not_wedge_half_open_breaker(monkeypatch):
+    from llm import scheduler
+
+    with FakeOllama(response="ok") as server:
+        cfg = _cfg(server)
+        breaker = _half_open_breaker(cfg)
+        sched = scheduler.get_scheduler()
+        real_acquire = sched.acquire
+
+        def shed(*args, **kwargs):
+            raise scheduler.LLMOverloaded("queue full")
+
+        monkeypatch.setattr(sched, "acquire", shed)
+        with pytest.raises(scheduler.LLMOverloaded):
+            call_llm("hi", cfg)
+        monkeypatch.setattr(sched, "acquire", real_acquire)
+        assert call_llm("hi", cfg) == "ok"
+        assert breaker.state == resilience.CircuitBreaker.CLOSED
+
+
+def test_calls_are_bounded_without_timeout_config():
+    assert resilience.call_timeout({"model": "m"}) == resilience.DEFAULT_TIMEOUT_S
+    assert resilience.call_timeout({"model": "m", "timeout_s": 5}) == 5
+    assert resilience.call_timeout({"model": "m", "timeout_s": None}) is None
+
+
+def _in_flight(sched, model="fake"):
+    return sched.stats().get(model, {}).get("in_flight", 0)
+
+
+def _wait_idle(sched, timeout=2.0):
+    deadline = time.time() + timeout
+    while _in_flight(sched) and time.time() < deadline:
+        time.sleep(0.01)
+    return _in_flight(sched) == 0
+
+
+def test_timed_out_call_holds_its_slot_until_it_returns():
+    from llm.scheduler import LLMScheduler, set_scheduler
+
+    sched = LLMScheduler()
+    set_scheduler(sched)
+    try:
+        with FakeOllama(response="late", delay=0.5) as server:
+            cfg = _cfg(server, max_concurrency=1, timeout_s=0.1)
+            with pytest.raises(resilience.DeadlineExceeded):
+                call_llm("hi", cfg)
+            assert _in_flight(sched) == 1  # still running on the server
+            assert _wait_idle(sched)
+    finally:
+        set_scheduler(LLMScheduler())
+
+
+def test_hedge_is_skipped_without_a_free_slot():
+    from llm.scheduler import LLMScheduler, set_scheduler
+
+    sched = LLMScheduler()
+    set_scheduler(sched)
+    try:
+        with FakeOllama(response="slow", delay=0.3) as server:
+            cfg = _cfg(server, max_concurrency=1, hedge=True, hedge_after_s=0.05, timeout_s=2.0)
+            assert call_llm("hi", cfg) == "slow"
+            assert len(server.requests) == 1
+        assert _wait_idle(sched)
+    finally:
+        set_scheduler(LLMScheduler())
@@ -0,0 +1,92 @@
+"""Adaptive mutator model routing."""
+
+import json
+
+import pytest
+
+import llm.mutate as mutate
+from engine.patch import apply_patch, validate_patch
+from engine.state import create_initial_state
+from game.commands import Intent, IntentType
+from llm import resilience, routing
+from llm.fake_server import FakeOllama
+from llm.routing import ModelRouter
+
+GOOD = json.dumps({"strict": {"clock": {"time": "09:00"}}, "vibe": {}})
+BAD = json.dumps({"strict": {"clock": {"time": 2599}}, "vibe": {}})
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    resilience.reset()
+    routing.reset()
+    yield
+    routing.reset()
+
+
+def test_router_prefers_cheapest_adequate_model():
+    router = ModelRouter([{"model": "big", "cost": 8}, {"model": "small", "cost": 1}], min_samples=2, probe_every=0)
+    assert [c["model"] for c in router.plan("SET_CLOCK")] == ["small", "big"]
+
+    router.record("SET_CLOCK", "small", False, 0.1)
+    router.record("SET_CLOCK", "small", False, 0.1)
+    assert [c["model"] for c in router.plan("SET_CLOCK")] == ["big"]
+    # Other intent types keep their own statistics.
+    assert router.plan("SEND_EMAIL")[0]["model"] == "small"
+
+
+def test_router_probes_demoted_model():
+    router = ModelRouter([{"model": "big", "cost": 8}, {"model": "small", "cost": 1}], min_samples=1, probe_every=3)
+    router.record("SET_CLOCK", "small", False, 0.1)
+    firsts = [router.plan("SET_CLOCK")[0]["model"] for _ in range(3)]
+    assert firsts == ["big", "big", "small"]
+
+
+def test_generate_patch_escalates_on_invalid_patch(monkeypatch):
+    intent = Intent(IntentType.SET_CLOCK, {"offset_hours": 9}, 0.9)
+    state = create_initial_state()
+    with FakeOllama(response=GOOD) as big, FakeOllama(response=BAD) as small:
+        cfg = {
+            "model": "big", "cost": 8, "transport": "http", "base_url": big.url,
+            "candidates": [{"model": "small", "cost": 1, "base_url": small.url}],
+            "route_min_samples": 2, "route_probe_every": 0,
+        }
+        monkeypatch.setattr(mutate, "MODEL_CFG", cfg)
+        for _ in range(3):
+            assert mutate.generate_patch(intent, state)["strict"] == {"clock": {"time": "09:00"}}
+
+    # Two failed tries demote the small model; the third call goes straight to big.
+    assert len(small.requests) == 2
+    assert len(big.requests) == 3
+    stats = routing.router_for(cfg).stats()["SET_CLOCK"]
+    assert stats["small"]["success_rate"] == 0.0
+    assert stats["big"]["success_rate"] == 1.0
+
+
+def test_router_orders_equal_cost_candidates_by_latency():
+    router = ModelRouter([{"model": "a", "cost": 1}, {"model": "b", "cost": 1}, {"model": "big", "cost": 8}], min_samples=1, probe_every=0)
+    router.record("SET_CLOCK", "a", True, 2.0)
+    router.record("SET_CLOCK", "b", True, 0.5)
+    assert [c["model"] for c in router.plan("SET_CLOCK")] == ["b", "a", "big"]
+    assert router.plan("SEND_EMAIL")[0]["model"] == "a"
+
+
+def test_router_for_keeps_stats_across_config_edits():
+    cfg = {"model": "big", "cost": 8, "candidates": [{"model": "small", "cost": 1}]}
+    router = routing.router_for(cfg)
+    router.record("SET_CLOCK", "small", False, 0.1)
+    router.record("SET_CLOCK", "big", True, 0.3)
+
+    # An equal config (a reload that changed nothing) keeps the router.
+    assert routing.router_for(dict(cfg)) is router
+    # An edited config gets a new router with the surviving models' stats.
+    edited = routing.router_for({**cfg, "temperature": 0.2, "candidates": [{"model": "tiny", "cost": 0.5}]})
+    assert edited is not router
+    assert edited.stats()["SET_CLOCK"] == {"big": {"samples": 1, "success_rate": 1.0, "mean_latency": 0.3}}
+    assert len(routing._ROUTERS) == 1
+
+
+def test_validate_patch_agrees_with_apply_patch():
+    state = create_initial_state()
+    for patch in (json.loads(GOOD), json.loads(BAD), {"strict": {"emails": [{"recipient": "a@b"}]}}, {"vibe": {"x": 1}}):
+        assert (not validate_patch(patch)) == apply_patch(state, patch).success
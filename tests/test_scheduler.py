@@ -0,0 +1,119 @@
+"""Tests for LLM admission control and fair scheduling."""
+
+import threading
+import time
+
+import pytest
+
+from llm.scheduler import LLMOverloaded, LLMScheduler, Priority
+
+
+def _hold(scheduler, model, order, label, hold=0.05, **kwargs):
+    scheduler.acquire(model, **kwargs)
+    order.append(label)
+    time.sleep(hold)
+    scheduler.release(model)
+
+
+def _start(target, *args, **kwargs):
+    t = threading.Thread(target=target, args=args, kwargs=kwargs)
+    t.start()
+    return t
+
+
+def _wait_queued(scheduler, model, n):
+    deadline = time.time() + 2
+    while time.time() < deadline:
+        stats = scheduler.stats().get(model, {})
+        if stats.get("queued_interactive", 0) + stats.get("queued_background", 0) >= n:
+            return
+        time.sleep(0.005)
+    raise AssertionError("requests never queued")
+
+
+def test_concurrency_cap_is_enforced():
+    scheduler = LLMScheduler(default_concurrency=2)
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def worker():
+        scheduler.acquire("m")
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        scheduler.release("m")
+
+    threads = [_start(worker) for _ in range(8)]
+    for t in threads:
+        t.join()
+    assert peak[0] == 2
+
+
+def test_interactive_served_before_background_and_sessions_alternate():
+    scheduler = LLMScheduler(default_concurrency=1)
+    order = []
+    blocker = _start(_hold, scheduler, "m", order, "blocker", hold=0.2)
+    time.sleep(0.02)
+
+    threads = []
+    for label, session, priority in [
+        ("bg", "s1", Priority.BACKGROUND),
+        ("a1", "a", Priority.INTERACTIVE),
+        ("a2", "a", Priority.INTERACTIVE),
+        ("b1", "b", Priority.INTERACTIVE),
+    ]:
+        threads.append(_start(_hold, scheduler, "m", order, label, hold=0.01, session=session, priority=priority))
+        _wait_queued(scheduler, "m", len(threads))
+
+    for t in [blocker] + threads:
+        t.join()
+    assert order == ["blocker", "a1", "b1", "a2", "bg"]
+
+
+def test_sheds_when_queue_is_full():
+    scheduler = LLMScheduler(default_concurrency=1, max_queue=1)
+    order = []
+    blocker = _start(_hold, scheduler, "m", order, "blocker", hold=0.2)
+    time.sleep(0.02)
+    waiter = _start(_hold, scheduler, "m", order, "waiter", hold=0.0)
+    _wait_queued(scheduler, "m", 1)
+
+    with pytest.raises(LLMOverloaded):
+        scheduler.acquire("m")
+    blocker.join()
+    waiter.join()
+
+
+def test_sheds_after_queue_timeout():
+    scheduler = LLMScheduler(default_concurrency=1)
+    order = []
+    blocker = _start(_hold, scheduler, "m", order, "blocker", hold=0.2)
+    time.sleep(0.02)
+    with pytest.raises(LLMOverloaded):
+        scheduler.acquire("m", timeout=0.01)
+    blocker.join()
+    assert scheduler.stats()["m"]["queued_interactive"] == 0
+
+
+def test_shed_calls_degrade_to_stub_and_rules(monkeypatch):
+    from engine.state import create_initial_state
+    from game.commands import parse_intent
+    from game.mutate import with_stub_fallback
+    from game.narrate import narrate
+    from game.turn import Outcome
+    import llm.narrate
+
+    def overloaded(*args, **kwargs):
+        raise LLMOverloaded("queue full")
+
+    mutator = with_stub_fallback(overloaded)
+    patch = mutator(parse_intent("set clock +3"), create_initial_state())
+    assert patch == {"strict": {"clock": {"time": "03:00"}}}
+
+    monkeypatch.setattr(llm.narrate, "call_llm", overloaded)
+    narration = narrate(Outcome("SET_CLOCK", 0.9, patch, True, []))
+    assert narration.source == "rules"
+    assert narration.text == "clock: time set to 03:00"
@@ -0,0 +1,56 @@
+"""Tests for the cached prompt state serializer."""
+
+import json
+
+from engine.patch import apply_patch
+from engine.state import Email, create_initial_state
+from llm.mutate import _serialize_state, build_prompt
+from llm.serialize import StateSerializer, field_plan
+
+
+def _state():
+    state = create_initial_state()
+    state.strict.emails = [Email("boss@corp", "09:00"), Email("ops@corp")]
+    state.vibe.notes = ["hello"]
+    state.vibe.system_config = {"theme": "dark", "nested": {"a": [1, None]}}
+    return state
+
+
+def test_output_matches_reflective_serialization():
+    state = _state()
+    assert StateSerializer().dumps(state) == json.dumps(_serialize_state(state))
+    # None fields are omitted for the strict state classes
+    assert '"sent_at"' not in json.dumps(json.loads(StateSerializer().dumps(state))["strict"]["emails"][1])
+    assert field_plan(type(state)).names == ("strict", "vibe")
+
+
+def test_unchanged_state_reuses_cached_text():
+    serializer = StateSerializer()
+    state = _state()
+    first = serializer.dumps(state)
+    misses = serializer.misses
+    assert serializer.dumps(state) is first
+    assert serializer.misses == misses
+
+
+def test_patch_reencodes_only_touched_parts():
+    serializer = StateSerializer()
+    state = _state()
+    serializer.dumps(state)
+    result = apply_patch(state, {"strict": {"clock": {"time": "10:15"}}})
+    assert result.success
+    assert result.state.vibe is state.vibe  # copy-on-write sharing
+    assert result.state.strict.emails is state.strict.emails
+
+    hits = serializer.hits
+    text = serializer.dumps(result.state)
+    assert text == json.dumps(_serialize_state(result.state))
+    assert json.loads(text)["strict"]["clock"]["time"] == "10:15"
+    assert serializer.hits - hits == 2  # vibe and strict.emails
+    assert state.strict.clock.time == "00:00"  # input untouched
+
+
+def test_build_prompt_uses_serialized_state():
+    state = _state()
+    prompt = build_prompt(None, state, prompt_tpl="S={state}", examples="")
+    assert prompt == "S=" + json.dumps(_serialize_state(state))
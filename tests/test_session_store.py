@@ -0,0 +1,103 @@
+"""Tests for the disk-backed session store."""
+
+from engine.patch import apply_patch
+from engine.state import create_initial_state, state_to_json
+from game.session_store import INDEX, SessionStore
+
+
+def _state(i):
+    return apply_patch(create_initial_state(), {"strict": {"clock": {"time": f"{i % 24:02d}:{i % 60:02d}"}}}).state
+
+
+def test_evicted_sessions_page_back_in(tmp_path):
+    with SessionStore(tmp_path, capacity=10) as store:
+        for i in range(200):
+            store.put(f"s{i}", _state(i))
+        assert store.stats()["in_memory"] == 10
+        assert len(store) == 200
+        assert store.get("s7").strict.clock.time == "07:07"
+        assert store.get("missing") is None
+        assert "s150" in store and "nope" not in store
+
+    with SessionStore(tmp_path, capacity=10) as reopened:
+        assert reopened.get("s199").strict.clock.time == "07:19"
+        assert len(reopened) == 200
+
+
+def test_compaction_reclaims_superseded_snapshots(tmp_path):
+    with SessionStore(tmp_path, capacity=1, compact_ratio=10.0) as store:
+        for rnd in range(5):
+            for i in range(50):
+                store.put(f"s{i}", _state(i + rnd))
+        store.flush()
+        before = store.stats()
+        assert before["garbage_bytes"] > 0
+        reclaimed = store.compact()
+        after = store.stats()
+        assert reclaimed > 0 and after["garbage_bytes"] == 0
+        assert after["on_disk"] == 50
+        assert state_to_json(store.get("s3")) == state_to_json(_state(3 + 4))
+
+
+def test_index_is_rebuilt_from_segment(tmp_path):
+    with SessionStore(tmp_path, capacity=2) as store:
+        for i in range(20):
+            store.put(f"s{i}", _state(i))
+        store.put("s5", _state(23))
+        assert store.delete("s6")
+    (tmp_path / INDEX).unlink()
+    with SessionStore(tmp_path) as store:
+        assert store.get("s5").strict.clock.time == "23:23"
+        assert store.get("s19").strict.clock.time == "19:19"
+        assert "s6" not in store and store.get("s6") is None
+        assert len(store) == 19
+        store.compact()  # drops the tombstone along with the deleted record
+        assert "s6" not in store and len(store) == 19
+
+
+def test_unclean_exit_keeps_evicted_sessions(tmp_path):
+    import subprocess
+    import sys
+
+    script = (
+        "import os, sys\n"
+        "from tests.test_session_store import _state\n"
+        "from game.session_store import SessionStore\n"
+        "store = SessionStore(sys.argv[1], capacity=2)\n"
+        "for i in range(6):\n"
+        "    store.put(f's{i}', _state(i))\n"
+        "os._exit(0)\n"
+    )
+    subprocess.run([sys.executable, "-c", script, str(tmp_path)], check=True)
+    with SessionStore(tmp_path, capacity=2) as store:
+        assert len(store) == 4  # the 4 evicted sessions; the 2 in memory were never written
+        assert store.get("s0").strict.clock.time == "00:00"
+        assert store.get("s3").strict.clock.time == "03:03"
+
+
+def test_stale_index_over_truncated_segment_is_rebuilt(tmp_path):
+    with SessionStore(tmp_path, capacity=1) as store:
+        for i in range(5):
+            store.put(f"s{i}", _state(i))
+    (tmp_path / "segment.dat").write_bytes(b"")
+    with SessionStore(tmp_path, capacity=1) as store:
+        assert len(store) == 0
+        assert store.get("s1") is None
+        store.put("s9", _state(9))
+    with SessionStore(tmp_path, capacity=1) as store:
+        assert store.get("s9").strict.clock.time == "09:09"
+
+
+def test_torn_tail_record_is_cut_off(tmp_path):
+    with SessionStore(tmp_path, capacity=1) as store:
+        for i in range(3):
+            store.put(f"s{i}", _state(i))
+    segment = tmp_path / "segment.dat"
+    segment.write_bytes(segment.read_bytes()[:-5])
+    with SessionStore(tmp_path, capacity=1) as store:
+        assert len(store) == 2 and store.get("s2") is None
+        store.put("s7", _state(7))
+        store.put("s8", _state(8))
+    with SessionStore(tmp_path, capacity=1) as store:
+        assert store.get("s0").strict.clock.time == "00:00"
+        assert store.get("s7").strict.clock.time == "07:07"
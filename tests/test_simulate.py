@@ -0,0 +1,48 @@
+"""Tests for the headless simulation runner."""
+
+import json
+
+from game.simulate import Playthrough, generate_scripts, load_scripts, play, run_batch
+
+WINNING = Playthrough("win", [
+    "show config",
+    "set clock +05:00",
+    "send email to ops@corp: clock fixed",
+    "read email",
+])
+
+
+def test_play_reaches_win_condition_with_stub():
+    result = play(WINNING, mutator="stub")
+    assert result.error is None
+    assert result.won
+    assert result.won_at_turn == 3
+    assert result.turns == 3
+
+
+def test_play_without_win():
+    result = play(Playthrough("lose", ["read email", "dance"]), mutator="stub", narrator="rules")
+    assert not result.won
+    assert result.turns == 2
+
+
+def test_load_scripts_text_and_json(tmp_path):
+    txt = tmp_path / "level1.txt"
+    txt.write_text("# level 1\nset clock +1\n\nsend email to ops@corp: hi\n")
+    js = tmp_path / "level2.json"
+    js.write_text(json.dumps({"name": "two", "commands": ["inbox"]}))
+
+    scripts = load_scripts([txt, js])
+    assert [s.name for s in scripts] == ["level1", "two"]
+    assert scripts[0].commands == ["set clock +1", "send email to ops@corp: hi"]
+
+
+def test_run_batch_over_process_pool():
+    scripts = [WINNING] + generate_scripts(6, length=4, seed=7)
+    report = run_batch(scripts, mutator="stub", workers=2)
+    assert len(report.results) == 7
+    assert all(r.error is None for r in report.results)
+    assert report.results[0].won
+    assert report.total_turns > 0
+    assert report.turns_per_sec > 0
+    assert 0 < report.win_rate <= 1
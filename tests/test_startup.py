@@ -0,0 +1,21 @@
+from telemetry import startup
+
+
+def test_parse_importtime():
+    out = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     json.decoder\n"
+        "import time:       300 |        420 |   json\n"
+        "import time:      1000 |       1420 | game.loop\n"
+    )
+    entries = startup.parse_importtime(out)
+    assert [(e.module, e.depth) for e in entries] == [("json.decoder", 2), ("json", 1), ("game.loop", 0)]
+    result = startup.StartupProfile("game.loop", entries)
+    assert result.total_ms == 1.42
+    assert result.top(1)[0].module == "game.loop"
+
+
+def test_game_loop_cold_start_within_budget():
+    result = startup.profile("game.loop", runs=3)
+    assert result.deferred_violations() == []
+    assert result.total_ms < startup.STARTUP_BUDGET_MS
@@ -0,0 +1,76 @@
+"""Tests for the columnar transcript store."""
+
+from engine.state import create_initial_state
+from game.commands import parse_intent
+from game.mutate_stub import generate_patch as stub_gen
+from game.narrate import NarrationResult
+from game.transcript import TranscriptReader, TranscriptWriter, turn_record
+from game.turn import TurnScheduler
+
+
+def _record(i):
+    return {
+        "session": f"s{i % 3}", "turn": i, "ts": 1000.0 + i, "raw_input": "show config",
+        "intent_type": "SHOW_CONFIG", "intent_params": {"n": i}, "confidence": 0.9,
+        "patch": {"vibe": {"notes": [i]}} if i % 2 else None, "success": bool(i % 2),
+        "errors": [], "warnings": [], "narration": "ok", "narration_source": "rules",
+        "mutate_s": 0.01 * i, "apply_patch_s": 0.0, "narrate_s": 0.0, "turn_s": 0.02,
+    }
+
+
+def test_round_trip_in_batches(tmp_path):
+    path = tmp_path / "turns.sprw"
+    with TranscriptWriter(path, batch_size=7) as writer:
+        for i in range(20):
+            writer.append(_record(i))
+    with TranscriptWriter(path, batch_size=7) as writer:  # reopening appends
+        writer.append(_record(20))
+
+    reader = TranscriptReader(path)
+    records = list(reader)
+    assert len(records) == reader.count() == 21
+    assert records[5] == _record(5)
+    assert len(list(reader.blocks())) == 4
+
+
+def test_projection_reads_only_requested_columns(tmp_path):
+    path = tmp_path / "turns.sprw"
+    with TranscriptWriter(path, batch_size=8) as writer:
+        for i in range(16):
+            writer.append(_record(i))
+    rows = list(TranscriptReader(path).records(["turn", "success"]))
+    assert rows[3] == {"turn": 3, "success": True}
+
+
+def test_torn_tail_block_is_ignored(tmp_path):
+    path = tmp_path / "turns.sprw"
+    with TranscriptWriter(path, batch_size=4) as writer:
+        for i in range(8):
+            writer.append(_record(i))
+    data = path.read_bytes()
+    path.write_bytes(data[:-5])
+    assert TranscriptReader(path).count() == 4
+
+
+def test_appending_after_a_torn_block_keeps_new_blocks_readable(tmp_path):
+    path = tmp_path / "turns.sprw"
+    with TranscriptWriter(path, batch_size=4) as writer:
+        for i in range(6):
+            writer.append(_record(i))
+    path.write_bytes(path.read_bytes()[:-5])  # crash mid-way through the second block
+    with TranscriptWriter(path, batch_size=4) as writer:
+        for i in range(4, 8):
+            writer.append(_record(i))
+    assert [r["turn"] for r in TranscriptReader(path).records(["turn"])] == list(range(8))
+
+
+def test_turn_record_from_scheduler(tmp_path):
+    narrator = lambda outcome: NarrationResult(text="done", source="rules")
+    with TurnScheduler(stub_gen, narrator=narrator) as scheduler:
+        turn = scheduler.run(parse_intent("set clock +02:00"), create_initial_state())
+    record = turn_record(turn, "set clock +02:00", turn_number=1)
+    assert record["intent_type"] == "SET_CLOCK" and record["success"]
+    assert record["mutate_s"] >= 0 and "narrate" in turn.timings
+    with TranscriptWriter(tmp_path / "t.sprw") as writer:
+        writer.append(record)
+    assert next(iter(TranscriptReader(tmp_path / "t.sprw")))["patch"] == turn.patch
@@ -0,0 +1,83 @@
+"""Tests for the turn scheduler."""
+
+import threading
+
+from engine.state import create_initial_state
+from game.commands import parse_intent
+from game.mutate_stub import generate_patch as stub_gen
+from game.narrate import NarrationResult
+from game.turn import TurnScheduler
+
+# Mutator and narrator both wait here; it only releases when they run concurrently.
+OVERLAP_TIMEOUT = 5.0
+
+
+def narrator(calls, barrier=None):
+    def _narrate(outcome):
+        calls.append(outcome)
+        if barrier is not None:
+            barrier.wait()
+        return NarrationResult(text=f"{outcome.intent_type} ok={outcome.success}", source="rules")
+    return _narrate
+
+
+def stub(barrier=None):
+    def _mutate(intent, state, level_context=None):
+        if barrier is not None:
+            barrier.wait()
+        return stub_gen(intent, state, level_context)
+    return _mutate
+
+
+def test_noop_intent_overlaps_mutator_and_narrator():
+    calls = []
+    barrier = threading.Barrier(2, timeout=OVERLAP_TIMEOUT)
+    with TurnScheduler(stub(barrier), narrator=narrator(calls, barrier)) as scheduler:
+        turn = scheduler.run(parse_intent("show config"), create_initial_state())
+
+    assert not barrier.broken
+    assert turn.narration.text == "SHOW_CONFIG ok=False"
+    assert not turn.outcome.success
+    assert calls == [turn.outcome]
+
+
+def test_speculative_narration_is_reused_when_prediction_holds():
+    calls = []
+    barrier = threading.Barrier(2, timeout=OVERLAP_TIMEOUT)
+    with TurnScheduler(stub(barrier), narrator=narrator(calls, barrier)) as scheduler:
+        turn = scheduler.run(parse_intent("set clock +5"), create_initial_state())
+
+    assert not barrier.broken
+    assert turn.state.strict.clock.time == "05:00"
+    assert turn.outcome.success
+    assert len(calls) == 1
+
+
+def test_speculative_narration_discarded_when_outcome_differs():
+    calls = []
+
+    def rejecting_mutator(intent, state, level_context=None):
+        return {"strict": {"clock": {"time": "99:99"}}}
+
+    with TurnScheduler(rejecting_mutator, narrator=narrator(calls)) as scheduler:
+        turn = scheduler.run(parse_intent("set clock +5"), create_initial_state())
+
+    assert not turn.outcome.success
+    assert turn.state.strict.clock.time == "00:00"
+    assert turn.narration.text == "SET_CLOCK ok=False"
+    assert [c.success for c in calls] == [True, False]
+
+
+def test_noop_intent_is_renarrated_when_a_vibe_patch_applies():
+    calls = []
+
+    def vibe_mutator(intent, state, level_context=None):
+        return {"vibe": {"system_config": {"theme": "dark"}}}
+
+    with TurnScheduler(vibe_mutator, narrator=narrator(calls)) as scheduler:
+        turn = scheduler.run(parse_intent("show config"), create_initial_state())
+
+    assert turn.outcome.success
+    assert turn.narration.text == "SHOW_CONFIG ok=True"
+    assert [c.success for c in calls] == [False, True]
+    assert calls[-1].patch == {"vibe": {"system_config": {"theme": "dark"}}}
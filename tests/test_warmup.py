@@ -0,0 +1,55 @@
+from llm import recording
+from llm.fake_server import FakeOllama
+from llm.warmup import FAILED, READY, SKIPPED, Warmup, prompt_prefix, targets
+
+
+def test_prompt_prefix_stops_at_first_placeholder():
+    assert prompt_prefix("Rules first.\n- intent: {intent}\n- state: {state}") == "Rules first.\n- intent:"
+    assert prompt_prefix("no placeholders ") == "no placeholders"
+
+
+def test_targets_dedupe_models_across_roles_and_candidates():
+    configs = {
+        "mutator": {"model": "big", "temperature": 0.3, "candidates": [{"model": "small"}]},
+        "narrator": {"model": "big", "temperature": 0.8},
+        "summarizer": {"model": "small"},
+    }
+    found = targets(config=configs.get, prompt=lambda name: "Static {intent}")
+    assert [(t.role, t.model, t.prefix) for t in found] == [("mutator", "big", "Static"), ("mutator", "small", "Static")]
+    assert found[1].model_cfg["temperature"] == 0.3
+    assert "candidates" not in found[0].model_cfg
+
+
+def test_warmup_preloads_with_keep_alive_and_prefix():
+    with FakeOllama(response="ok") as server:
+        cfg = {"model": "fake", "transport": "http", "base_url": server.url, "format": "json"}
+        found = targets(roles=(("mutator", "mutate"),), config=lambda key: cfg, prompt=lambda name: "You mutate.\n{intent}")
+        warmup = Warmup(found, keep_alive="10m").start()
+        assert warmup.wait(timeout=5)
+    assert warmup.ready() and warmup.status()["fake"]["state"] == READY
+    body = server.requests[0]
+    assert body["keep_alive"] == "10m"
+    assert body["options"]["num_predict"] == 1
+    assert "format" not in body
+    assert body["messages"][-1]["content"] == "You mutate."
+
+
+def test_warmup_failure_is_reported_not_raised():
+    def boom(prompt, cfg, timeout):
+        raise RuntimeError("connection refused")
+
+    warmup = Warmup(targets(roles=(("narrator", None),), config=lambda key: {"model": "m"}), generate=boom).start()
+    assert warmup.wait(timeout=5)
+    assert not warmup.ready()
+    assert warmup.status()["m"]["state"] == FAILED
+
+
+def test_warmup_skipped_in_replay_mode(tmp_path):
+    calls = []
+    recording.use_tape(tmp_path / "tape.jsonl", recording.REPLAY)
+    try:
+        warmup = Warmup(targets(roles=(("narrator", None),), config=lambda key: {"model": "m"}), generate=lambda *a: calls.append(a)).start()
+    finally:
+        recording.disable()
+    assert warmup.wait(timeout=1)
+    assert warmup.status()["m"]["state"] == SKIPPED and not calls